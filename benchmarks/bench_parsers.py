@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Time every show-output parser in the repo against synthetic stacks.
+
+Outputs come from netlib.synthetic at 48 (one switch), 384 (8-member
+stack) and 4000 ports. Results go to a JSON file; with --baseline the run
+is compared to an earlier file and exits 1 if any parser got slower than
+REGRESSION_FACTOR times its baseline.
+
+    python3 benchmarks/bench_parsers.py
+    python3 benchmarks/bench_parsers.py --output new.json --baseline bench_parsers.json
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from netlib import parsers
+from netlib.facts import parse_ports, parse_version
+from netlib.runconfig import RunningConfig
+from netlib.synthetic import GENERATORS, generate
+
+# Stack sizes to generate (ports)
+SIZES = (48, 384, 4000)
+# Timing runs per case; the best one is reported
+REPEAT = 5
+SEED = 0
+OUTPUT = "bench_parsers.json"
+# A parser is flagged when best time > baseline best * REGRESSION_FACTOR
+REGRESSION_FACTOR = 1.5
+
+# Scripts whose own parsing helpers are timed too
+SCRIPTS = {
+    "tdr4-1": "test-cable-tdr4-1/test-cable-tdr4-1.py",
+    "tdr5": "test-cable-tdr5/test-cable-tdr5.py",
+}
+
+
+class CannedConnection:
+    """Stands in for a netmiko connection: every command returns the same output"""
+
+    def __init__(self, output):
+        self.output = output
+
+    def send_command(self, command, **kwargs):
+        return self.output
+
+
+def load_script(name, path):
+    """Import a script by path, or None if its own dependencies are missing"""
+    spec = importlib.util.spec_from_file_location(f"bench_{name.replace('-', '_')}", os.path.join(ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        print(f"[SKIP] {path}: {e}")
+        return None
+    return module
+
+
+def cases():
+    """(name, command, function taking the output)"""
+    covered = set()
+    for command in GENERATORS:
+        func = parsers.parser_for(command)
+        if func:
+            covered.add(func)
+            yield f"parsers.{func.__name__}", command, func
+    for _, func in parsers.REGISTRY:
+        if func not in covered:
+            print(f"[SKIP] parsers.{func.__name__}: no synthetic output for it in netlib.synthetic")
+    yield "facts.parse_ports", "show interfaces status", parse_ports
+    yield "facts.parse_version", "show version", parse_version
+    yield "runconfig.RunningConfig", "show running-config", RunningConfig
+
+    for name, path in SCRIPTS.items():
+        module = load_script(name, path)
+        if module is None:
+            continue
+        yield (f"{name}._get_connected_copper_ports", "show interfaces status",
+               lambda output, m=module: m._get_connected_copper_ports(CannedConnection(output)))
+        yield f"{name}._parse_speed_from_tdr", "show cable-diagnostics tdr", module._parse_speed_from_tdr
+        yield f"{name}._parse_pairs_status", "show cable-diagnostics tdr", module._parse_pairs_status
+
+
+def count_records(result):
+    if isinstance(result, tuple) and not hasattr(result, "_fields"):
+        # (records, flag) helpers like _parse_pairs_status
+        result = result[0]
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 0 if result is None else 1
+
+
+def time_case(func, output, repeat):
+    """Best seconds per call of func(output)"""
+    timer = timeit.Timer(lambda: func(output))
+    # Scripts print every command they send; keep that out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        number, _ = timer.autorange()
+        runs = timer.repeat(repeat, number)
+    return min(runs) / number, number
+
+
+def run(sizes, repeat, seed):
+    results = []
+    outputs = {}
+    for name, command, func in cases():
+        for size in sizes:
+            key = (command, size)
+            if key not in outputs:
+                outputs[key] = generate(command, size, seed)
+            output = outputs[key]
+            with contextlib.redirect_stdout(io.StringIO()):
+                records = count_records(func(output))
+            best, number = time_case(func, output, repeat)
+            results.append({
+                "parser": name,
+                "command": command,
+                "ports": size,
+                "bytes": len(output),
+                "records": records,
+                "best_ms": round(best * 1000, 4),
+                "us_per_port": round(best * 1e6 / size, 3),
+                "loops": number,
+            })
+            print(f"[BENCH] {name:<40} {size:>5} ports {len(output):>9} bytes "
+                  f"{records:>6} records {best * 1000:>10.3f} ms")
+    return results
+
+
+def compare(results, baseline_path, factor):
+    """Print regressions against an earlier results file; returns how many"""
+    with open(baseline_path) as f:
+        baseline = {(r["parser"], r["ports"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    for result in results:
+        before = baseline.get((result["parser"], result["ports"]))
+        if not before or not before["best_ms"]:
+            continue
+        ratio = result["best_ms"] / before["best_ms"]
+        if ratio > factor:
+            regressions += 1
+            print(f"[REGRESSION] {result['parser']} at {result['ports']} ports: "
+                  f"{before['best_ms']} ms -> {result['best_ms']} ms ({ratio:.2f}x)")
+    if not regressions:
+        print(f"[OK] No parser slower than {factor}x its baseline ({baseline_path})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the IOS output parsers on synthetic stacks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), metavar="PORTS")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", default=OUTPUT)
+    parser.add_argument("--baseline", default=None, help="earlier results file to compare against")
+    parser.add_argument("--factor", type=float, default=REGRESSION_FACTOR)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.seed)
+    report = {
+        "benchmark": "parsers",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\n[SAVE] {len(results)} results written to {args.output}")
+
+    if args.baseline and compare(results, args.baseline, args.factor):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Time the TDR history store at years of nightly runs.
+
+Fills a fresh netlib.tdr_store file with NIGHTS nightly runs on PORTS
+ports (48 per switch): every length jitters by a meter from run to run,
+and a few cables a night really change (a pair goes Open, or gets
+longer after a re-patch). Reports how long recording a night takes and
+how long the history queries take on the full file.
+
+    python3 benchmarks/bench_tdr_store.py
+    python3 benchmarks/bench_tdr_store.py --ports 5000 --nights 1095 --output bench_tdr_store.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from netlib.parsers import TdrPair
+from netlib.tdr import TdrResult
+from netlib.tdr_store import DAY, TdrStore
+
+PORTS = 2000
+NIGHTS = 3 * 365
+PORTS_PER_SWITCH = 48
+# Share of ports whose cable really changes on a given night
+CHANGE_RATE = 0.0005
+# Query timing runs; the best one is reported
+REPEAT = 5
+SEED = 0
+OUTPUT = "bench_tdr_store.json"
+
+
+def fleet(ports, rng):
+    """{(switch, interface): [speed, {pair: [status, length]}]}"""
+    cables = {}
+    for i in range(ports):
+        switch = f"10.{20 + i // PORTS_PER_SWITCH // 250}.{i // PORTS_PER_SWITCH % 250}.1"
+        interface = f"Gi1/0/{i % PORTS_PER_SWITCH + 1}"
+        length = rng.randint(2, 90)
+        speed = "100M" if rng.random() < 0.1 else "1000M"
+        cables[(switch, interface)] = [speed, {pair: ["Normal", 0 if speed == "100M" and pair in "CD" else length]
+                                               for pair in "ABCD"}]
+    return cables
+
+
+def night(cables, rng):
+    """{switch: {interface: TdrResult}} for one run, changing a few cables first"""
+    for speed, pairs in cables.values():
+        if rng.random() < CHANGE_RATE:
+            pair = rng.choice("ABCD")
+            if rng.random() < 0.5:
+                pairs[pair][0] = "Open"
+            else:
+                pairs[pair][1] += rng.randint(5, 30)
+    runs = {}
+    for (switch, interface), (speed, pairs) in cables.items():
+        tdr_pairs = [TdrPair(interface, speed, pair, max(0, length + rng.randint(-1, 1)) if length else 0,
+                             4, f"Pair {pair}", status)
+                     for pair, (status, length) in pairs.items()]
+        runs.setdefault(switch, {})[interface] = TdrResult(interface, "", tdr_pairs, True, True, 3.0)
+    return runs
+
+
+def best(func, repeat=REPEAT):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark netlib.tdr_store on years of nightly TDR runs")
+    parser.add_argument("--ports", type=int, default=PORTS)
+    parser.add_argument("--nights", type=int, default=NIGHTS)
+    parser.add_argument("--path", default=None, help="store file to fill (default: a temp file)")
+    parser.add_argument("--output", default=OUTPUT)
+    args = parser.parse_args()
+
+    rng = random.Random(SEED)
+    cables = fleet(args.ports, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.path or os.path.join(tmp, "tdr.sqlite")
+        store = TdrStore(path)
+        now = time.time()
+        first = now - args.nights * DAY
+        record_times = []
+        print(f"[FILL] {args.nights} nights x {args.ports} ports...")
+        for n in range(args.nights):
+            runs = night(cables, rng)
+            started = time.perf_counter()
+            for switch, results in runs.items():
+                store.record(switch, results, tested=first + n * DAY)
+            record_times.append(time.perf_counter() - started)
+            if (n + 1) % 100 == 0:
+                print(f"[FILL] night {n + 1}/{args.nights}, {record_times[-1]:.2f}s to record")
+
+        queries = {
+            "changed_ports pair C length 90d": lambda: store.changed_ports("C", "length", 90),
+            "changes status all pairs 365d": lambda: store.changes("status", None, now - 365 * DAY),
+            "history one port 365d": lambda: store.history(*next(iter(cables)), since=now - 365 * DAY),
+            "ports of one switch": lambda: store.ports(next(iter(cables))[0]),
+        }
+        results = {
+            "python": platform.python_version(),
+            "ports": args.ports,
+            "nights": args.nights,
+            "size_mb": round(os.path.getsize(path) / 1e6, 1),
+            "record_night_s": round(sorted(record_times)[len(record_times) // 2], 3),
+            "queries_ms": {},
+        }
+        for name, query in queries.items():
+            seconds, rows = best(query)
+            results["queries_ms"][name] = round(seconds * 1000, 2)
+            print(f"[BENCH] {name:<34} {seconds * 1000:8.2f} ms  {len(rows)} rows")
+        store.close()
+
+    print(f"[BENCH] recording one night: {results['record_night_s']}s (median), file {results['size_mb']} MB")
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=1)
+    print(f"\n[SAVE] results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Time whole workflows end to end against a simulated fleet.
+
+Each workflow script is imported, pointed at a fleet of N simulated access
+switches (netlib.simulator) and run once serially (MAX_WORKERS = 1) and once
+in parallel. Every run gets a fresh fleet and facts cache, so configs and
+discovery start from the same state. Recorded per run: total wall time,
+time per switch, commands the fleet answered and commands per second.
+
+Results go to a JSON file; with --baseline the run is compared to an
+earlier file and exits 1 if any run got slower than REGRESSION_FACTOR
+times its baseline.
+
+    python3 benchmarks/bench_workflows.py
+    python3 benchmarks/bench_workflows.py --sizes 5 50 --workflows vtp_config remove_loopback
+    python3 benchmarks/bench_workflows.py --output new.json --baseline bench_workflows.json
+"""
+import argparse
+import builtins
+import contextlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from netlib.broker import BROKER_ENV
+from netlib.facts import FACTS_ENV
+from netlib.simulator import PORTS, SIMULATOR_ENV, TDR_SECONDS, Fleet, Simulator, parse_latency
+from netlib.tdr_store import TDR_STORE_ENV
+
+# Access switches per run
+SIZES = (5, 50, 500)
+MODES = ("serial", "parallel")
+OUTPUT = "bench_workflows.json"
+# A run is flagged when wall time > baseline wall time * REGRESSION_FACTOR
+REGRESSION_FACTOR = 1.5
+
+
+def switch_ips(count):
+    """10.30.0.1, 10.30.0.2, ... for count simulated access switches"""
+    return [f"10.30.{i // 250}.{i % 250 + 1}" for i in range(count)]
+
+
+# Each setup points the imported script at the fleet and returns its entry point
+def setup_port_channel5(module, switches):
+    module.ACCESS_SWITCHES = {ip: 11 + i % 100 for i, ip in enumerate(switches)}
+    return module.main
+
+
+def setup_tdr_via_jump(module, switches):
+    module.switch_list = list(switches)
+    return module.run_tdr_via_jump
+
+
+def setup_ssh_domain(module, switches):
+    module.SWITCH_IPS = list(switches)
+    return module.main
+
+
+def setup_vtp(module, switches):
+    module.ACCESS_SWITCHES = list(switches)
+    return module.main
+
+
+def setup_clock_banner(module, switches):
+    module.ACCESS_SWITCHES = {ip: 11 + i % 100 for i, ip in enumerate(switches)}
+    return module.main
+
+
+def setup_loopback(module, switches):
+    module.ACCESS_SWITCHES = list(switches)
+    module.LOOPBACK_IPS = {ip: f"5.5.{i // 250}.{i % 250 + 1}" for i, ip in enumerate(switches)}
+    return module.main
+
+
+def setup_remove_loopback(module, switches):
+    module.ACCESS_SWITCHES = list(switches)
+    return module.main
+
+
+WORKFLOWS = {
+    "port_channel5": ("port_channel5/port_channel5.py", setup_port_channel5),
+    "tdr5": ("test-cable-tdr5/test-cable-tdr5.py", setup_tdr_via_jump),
+    "tdr4-1": ("test-cable-tdr4-1/test-cable-tdr4-1.py", setup_tdr_via_jump),
+    "configure_ssh_domain": ("configure_ssh_domain/configure_ssh_domain.py", setup_ssh_domain),
+    "vtp_config": ("vtp_config/vtp_config.py", setup_vtp),
+    "configure_clock_banner": ("configure_clock_banner/configure_clock_banner.py", setup_clock_banner),
+    "configure_loopback2": ("configure_loopback2/configure_loopback2.py", setup_loopback),
+    "remove_loopback": ("remove_loopback/remove_loopback.py", setup_remove_loopback),
+}
+
+
+def load_script(name, path):
+    """Import a workflow script by path, or None if its own dependencies are missing"""
+    spec = importlib.util.spec_from_file_location(f"bench_{name.replace('-', '_')}", os.path.join(ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        print(f"[SKIP] {path}: {e}")
+        return None
+    return module
+
+
+def run_once(name, size, workers, fleet_options, workdir):
+    """Run one workflow against a fresh fleet of size switches; returns the result row"""
+    path, setup = WORKFLOWS[name]
+    module = load_script(name, path)
+    if module is None:
+        return None
+    entry = setup(module, switch_ips(size))
+    module.MAX_WORKERS = workers or module.MAX_WORKERS
+
+    fleet = Fleet(**fleet_options)
+    output = io.StringIO()
+    with Simulator(fleet, port=0) as simulator:
+        os.environ[SIMULATOR_ENV] = simulator.write_map(os.path.join(workdir, "simulator.json"))
+        os.environ[FACTS_ENV] = os.path.join(workdir, f"facts-{name}-{size}-{workers}.json")
+        os.environ[TDR_STORE_ENV] = os.path.join(workdir, "tdr.sqlite")
+        # Scripts wait for Enter at the end and print every step
+        real_input, builtins.input = builtins.input, lambda prompt="": ""
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                entry()
+        except Exception as e:
+            print(f"[ERROR] {name} at {size} switches: {e}")
+        finally:
+            elapsed = time.perf_counter() - start
+            builtins.input = real_input
+
+    errors = output.getvalue().count("[ERROR]")
+    return {
+        "workflow": name,
+        "mode": "serial" if module.MAX_WORKERS == 1 else "parallel",
+        "workers": module.MAX_WORKERS,
+        "switches": size,
+        "wall_s": round(elapsed, 3),
+        "s_per_switch": round(elapsed / size, 4),
+        "commands": fleet.commands,
+        "commands_per_s": round(fleet.commands / elapsed, 2) if elapsed else 0,
+        "errors": errors,
+    }
+
+
+def run(workflows, sizes, modes, workers, fleet_options):
+    results = []
+    # The runs own the simulator; a running broker would hand out real switch sessions
+    os.environ.pop(BROKER_ENV, None)
+    # netmiko hangs up without closing its channel; keep the server's resets out of the report
+    logging.getLogger("paramiko.transport").setLevel(logging.CRITICAL)
+    with tempfile.TemporaryDirectory(prefix="bench_workflows") as workdir:
+        for name in workflows:
+            for size in sizes:
+                for mode in modes:
+                    result = run_once(name, size, 1 if mode == "serial" else workers, fleet_options, workdir)
+                    if result is None:
+                        break
+                    results.append(result)
+                    print(f"[BENCH] {name:<24} {size:>4} switches {result['mode']:<8} x{result['workers']:<3} "
+                          f"{result['wall_s']:>9.2f} s {result['s_per_switch']:>7.3f} s/switch "
+                          f"{result['commands_per_s']:>8.1f} cmd/s {result['errors']:>4} errors")
+    return results
+
+
+def speedups(results):
+    """Print parallel vs serial wall time for every workflow and size run both ways"""
+    serial = {(r["workflow"], r["switches"]): r for r in results if r["mode"] == "serial"}
+    for result in results:
+        before = serial.get((result["workflow"], result["switches"]))
+        if result["mode"] == "parallel" and before and result["wall_s"]:
+            print(f"[SPEEDUP] {result['workflow']:<24} {result['switches']:>4} switches: "
+                  f"{before['wall_s'] / result['wall_s']:.2f}x with {result['workers']} workers")
+
+
+def compare(results, baseline_path, factor):
+    """Print regressions against an earlier results file; returns how many"""
+    with open(baseline_path) as f:
+        baseline = {(r["workflow"], r["mode"], r["switches"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    for result in results:
+        before = baseline.get((result["workflow"], result["mode"], result["switches"]))
+        if not before or not before["wall_s"]:
+            continue
+        ratio = result["wall_s"] / before["wall_s"]
+        if ratio > factor:
+            regressions += 1
+            print(f"[REGRESSION] {result['workflow']} {result['mode']} at {result['switches']} switches: "
+                  f"{before['wall_s']} s -> {result['wall_s']} s ({ratio:.2f}x)")
+    if not regressions:
+        print(f"[OK] No workflow slower than {factor}x its baseline ({baseline_path})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the workflow scripts against a simulated fleet")
+    parser.add_argument("--workflows", nargs="+", default=list(WORKFLOWS), choices=list(WORKFLOWS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), metavar="SWITCHES")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--workers", type=int, default=None, help="parallel workers (default: the script's MAX_WORKERS)")
+    parser.add_argument("--ports", type=int, default=PORTS, help="ports per simulated switch")
+    parser.add_argument("--latency", action="append", default=[], metavar="COMMAND=SECONDS",
+                        help="simulated seconds per command, as in netlib.simulator")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--tdr-seconds", type=float, default=TDR_SECONDS)
+    parser.add_argument("--output", default=OUTPUT)
+    parser.add_argument("--baseline", default=None, help="earlier results file to compare against")
+    parser.add_argument("--factor", type=float, default=REGRESSION_FACTOR)
+    args = parser.parse_args()
+
+    fleet_options = {
+        "ports": args.ports,
+        "latency": parse_latency(args.latency),
+        "jitter": args.jitter,
+        "tdr_seconds": args.tdr_seconds,
+    }
+    results = run(args.workflows, args.sizes, args.modes, args.workers, fleet_options)
+    speedups(results)
+    report = {
+        "benchmark": "workflows",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "fleet": fleet_options,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\n[SAVE] {len(results)} results written to {args.output}")
+
+    if args.baseline and compare(results, args.baseline, args.factor):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
-import paramiko
-import time
-import socket
 import re
 from datetime import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netlib import SAVE_TIMEOUT, enable, core_session, push_config, run_parallel, running_config, send_command, show
 
 # Core switch for SSH hopping
 CORE_IP = "10.20.39.20"
@@ -20,6 +22,9 @@ ACCESS_SWITCHES = {
     "10.20.39.26": 16
 }
 
+# How many switches to configure at the same time (1 = one after another)
+MAX_WORKERS = 4
+
 # MOTD Banner configuration
 MOTD_BANNER = """***********************************************************************
 *                                                                     *
@@ -35,37 +40,6 @@ MOTD_BANNER = """***************************************************************
 *                                                                     *
 ***********************************************************************"""
 
-def read_shell_output(shell, timeout=2):
-    """Read available output from shell"""
-    output = ""
-    shell.settimeout(timeout)
-    try:
-        while True:
-            if shell.recv_ready():
-                data = shell.recv(4096).decode('utf-8', errors='ignore')
-                output += data
-                print(data, end='')
-            else:
-                break
-    except socket.timeout:
-        pass
-    return output
-
-def send_command(shell, command, delay=1.5, expect_enable=False):
-    """Send command and return output"""
-    print(f"\n[COMMAND] {command}")
-    shell.send(f"{command}\n")
-    
-    # Handle enable mode if needed
-    if expect_enable and "Password:" in read_shell_output(shell, 1):
-        # Some switches might ask for enable password
-        shell.send("\n")  # Send empty (no password)
-        time.sleep(1)
-    
-    time.sleep(delay)
-    output = read_shell_output(shell)
-    return output
-
 def configure_clock_and_banner(shell, switch_ip):
     """Configure clock and MOTD banner on switch"""
     print(f"\n{'~'*50}")
@@ -80,7 +54,10 @@ def configure_clock_and_banner(shell, switch_ip):
         
         # Step 2: Check current clock
         print("\n[CHECK] Current clock status:")
-        output = send_command(shell, "show clock", delay=2)
+        clock = show(shell, "show clock")
+        if clock:
+            print(f"[INFO] {clock.time} {clock.zone} {clock.weekday} {clock.month} {clock.day} {clock.year}"
+                  f"{'' if clock.authoritative else ' (not authoritative)'}")
         
         # Step 3: Configure clock (GMT+3)
         print("\n[CONFIG] Setting clock to GMT+3...")
@@ -90,20 +67,13 @@ def configure_clock_and_banner(shell, switch_ip):
         current_year = now.year
         
         # Set timezone to GMT+3 (AST - Arabia Standard Time)
-        clock_commands = [
-            "configure terminal",
-            "clock timezone AST 3 0",  # GMT+3 hours, 0 minutes
-            "end",
-            f"clock set {current_year} {now.month} {now.day} {now.hour:02d}:{now.minute:02d}:{now.second:02d}",
-            "show clock"
-        ]
-        
-        for cmd in clock_commands:
-            output = send_command(shell, cmd, delay=2)
+        push_config(shell, ["clock timezone AST 3 0"])  # GMT+3 hours, 0 minutes
+        # 'clock set' is an exec command, so it goes after the config block
+        send_command(shell, f"clock set {current_year} {now.month} {now.day} {now.hour:02d}:{now.minute:02d}:{now.second:02d}")
         
         # Verify clock setting
-        output = send_command(shell, "show clock", delay=2)
-        if "AST" in output or "+03" in output:
+        clock = show(shell, "show clock")
+        if clock and clock.zone in ("AST", "+03"):
             print("✅ Clock configured successfully")
             results['clock'] = "SUCCESS"
         else:
@@ -113,27 +83,17 @@ def configure_clock_and_banner(shell, switch_ip):
         # Step 4: Configure MOTD Banner
         print("\n[CONFIG] Configuring MOTD banner...")
         
-        banner_commands = [
-            "configure terminal",
-            "no banner motd",  # Clear any existing banner
-        ]
-        
-        # Add each line of the banner
+        # Banner text lines get no prompt back, so the whole banner is one
+        # entry of the block and ends at the config prompt after the closing '^'
         banner_lines = MOTD_BANNER.split('\n')
-        banner_commands.append("banner motd ^")
-        
-        for line in banner_lines:
-            banner_commands.append(line)
-        
-        banner_commands.append("^")
-        banner_commands.append("end")
-        banner_commands.append("show banner motd")
-        
-        for cmd in banner_commands:
-            output = send_command(shell, cmd, delay=1)
+        banner_text = "\n".join(["banner motd ^"] + banner_lines + ["^"])
+        push_config(shell, [
+            "no banner motd",  # Clear any existing banner
+            banner_text,
+        ])
         
         # Verify banner
-        output = send_command(shell, "show banner motd", delay=2)
+        output = send_command(shell, "show banner motd")
         if "AUTHORIZED ACCESS ONLY" in output or "HLNSPC-NADEC" in output:
             print("✅ MOTD banner configured successfully")
             results['banner'] = "SUCCESS"
@@ -153,7 +113,7 @@ def configure_clock_and_banner(shell, switch_ip):
         
         saved = False
         for save_cmd in save_attempts:
-            output = send_command(shell, save_cmd, delay=3)
+            output = send_command(shell, save_cmd, timeout=SAVE_TIMEOUT)
             if "OK" in output or "Building configuration" in output or "[OK]" in output:
                 print("✅ Configuration saved successfully")
                 saved = True
@@ -170,12 +130,15 @@ def configure_clock_and_banner(shell, switch_ip):
         verify_commands = [
             "show clock",
             "show banner motd",
-            "show running-config | include clock timezone",
-            "show running-config | include banner motd"
         ]
         
         for cmd in verify_commands:
-            send_command(shell, cmd, delay=1.5)
+            send_command(shell, cmd)
+        
+        # Both running-config checks from one pull
+        config = running_config(shell)
+        for pattern in ("clock timezone", "banner motd"):
+            print(f"\n[RUNNING-CONFIG] {pattern}:\n{config.include(pattern)}")
         
         return results
         
@@ -187,33 +150,40 @@ def handle_enable_mode(shell, switch_ip):
     """Handle enable mode if required"""
     print(f"\n[CHECK] Checking if enable mode is required on {switch_ip}...")
     
-    # Send enable command
-    shell.send("enable\n")
-    time.sleep(2)
-    
-    output = read_shell_output(shell)
-    
-    if "Password:" in output:
-        print("[INFO] Switch requires enable password")
-        # Try empty password (some switches have no enable secret)
-        shell.send("\n")
-        time.sleep(2)
-        output = read_shell_output(shell)
-        
-        if "Password:" in output or "Access denied" in output:
-            # Try the same password as login
-            shell.send(f"{PASSWORD}\n")
-            time.sleep(2)
-            output = read_shell_output(shell)
-    
-    # Check if we're in enable mode
-    if "#" in output:
+    # Tries an empty enable secret first, then the login password
+    if enable(shell, PASSWORD):
         print("✅ Successfully entered enable mode")
         return True
     else:
         print("⚠️ Not in enable mode, may have limited privileges")
         return False
 
+def configure_switch(core, switch_ip):
+    """Hop to one access switch on its own core channel and configure it"""
+    print(f"\n{'='*70}")
+    print(f"CONFIGURING: {switch_ip}")
+    print(f"{'='*70}")
+    
+    # SSH to access switch; a failed hop raises ConnectionError
+    print(f"\n[SSH] Connecting to {switch_ip}...")
+    with core.hop(switch_ip) as shell:
+        # Handle enable mode if needed
+        in_enable = handle_enable_mode(shell, switch_ip)
+        
+        # Configure clock and banner
+        results = configure_clock_and_banner(shell, switch_ip)
+        
+        print(f"\n✅ Completed configuration on {switch_ip}")
+        
+        # Exit switch
+        print(f"\n[SSH] Exiting {switch_ip}...")
+    
+    return {
+        "status": "COMPLETED",
+        "in_enable_mode": in_enable,
+        "results": results
+    }
+
 def main():
     print("="*70)
     print("ACCESS SWITCH CLOCK & BANNER CONFIGURATION SCRIPT")
@@ -224,74 +194,16 @@ def main():
     print("3. Save configuration")
     print("="*70)
     
-    all_results = {}
-    
     try:
-        # Connect to core switch
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(CORE_IP, username=USERNAME, password=PASSWORD, timeout=20)
-        print("✓ Connected to Core Switch")
-        
-        shell = ssh.invoke_shell()
-        shell.settimeout(10)
-        time.sleep(3)
-        
-        # Read initial banner
-        read_shell_output(shell)
-        
-        for switch_ip, po_group in ACCESS_SWITCHES.items():
-            print(f"\n{'='*70}")
-            print(f"CONFIGURING: {switch_ip}")
-            print(f"{'='*70}")
-            
-            try:
-                # SSH to access switch
-                print(f"\n[SSH] Connecting to {switch_ip}...")
-                shell.send(f"ssh -l {USERNAME} {switch_ip}\n")
-                time.sleep(3)
-                output = read_shell_output(shell)
-                
-                # Check if SSH connection was successful
-                if "refused" in output.lower() or "failed" in output.lower():
-                    print(f"❌ Cannot connect to {switch_ip}")
-                    all_results[switch_ip] = {"status": "CONNECTION_FAILED"}
-                    continue
-                
-                # Send password
-                print(f"\n[SSH] Sending password...")
-                shell.send(f"{PASSWORD}\n")
-                time.sleep(3)
-                read_shell_output(shell)
-                
-                # Handle enable mode if needed
-                in_enable = handle_enable_mode(shell, switch_ip)
-                
-                # Configure clock and banner
-                results = configure_clock_and_banner(shell, switch_ip)
-                
-                # Store results
-                all_results[switch_ip] = {
-                    "status": "COMPLETED",
-                    "in_enable_mode": in_enable,
-                    "results": results
-                }
-                
-                print(f"\n✅ Completed configuration on {switch_ip}")
-                
-            except Exception as e:
-                print(f"❌ Error on {switch_ip}: {e}")
-                all_results[switch_ip] = {"status": "ERROR", "error": str(e)}
-            
-            finally:
-                # Exit switch
-                print(f"\n[SSH] Exiting {switch_ip}...")
-                shell.send("exit\n")
-                time.sleep(2)
-                read_shell_output(shell)
-        
-        shell.close()
-        ssh.close()
+        # One core login (or warm broker sessions); each switch gets its own channel, MAX_WORKERS at a time
+        with core_session(CORE_IP, USERNAME, PASSWORD, max_channels=MAX_WORKERS, echo=MAX_WORKERS == 1) as core:
+            all_results = run_parallel(lambda switch_ip: configure_switch(core, switch_ip), ACCESS_SWITCHES, MAX_WORKERS)
+        all_results = {
+            ip: {"status": "CONNECTION_FAILED"} if isinstance(r, ConnectionError)
+            else {"status": "ERROR", "error": str(r)} if isinstance(r, Exception)
+            else r
+            for ip, r in all_results.items()
+        }
         
         # Final summary
         print(f"\n{'='*70}")
@@ -0,0 +1,67 @@
+"""
+Shared helpers for the network-automation scripts.
+
+'from netlib import connect, send_command' works for every name below, but
+each submodule is only imported the first time one of its names is used.
+A script pulls in what it needs, and 'python3 -m netlib.broker' (or any
+other submodule) does not load that module once as netlib.broker and again
+as __main__.
+"""
+import importlib
+import sys
+import types
+
+# submodule -> the names it exports from the package
+_EXPORTS = {
+    "batch": ("ConfigResult", "push_config", "send_batch", "split_on_prompt"),
+    "broker": ("BROKER_ENV", "BrokerClient", "core_session"),
+    "expect": ("COMMAND_TIMEOUT", "ERROR_MARKERS", "PROMPTS", "ExpectResult", "expect", "find_errors",
+               "match_prompt"),
+    "facts": ("FACTS_ENV", "FactsCache", "device_facts", "shared_cache"),
+    "hostmap": ("SIMULATOR_ENV", "resolve"),
+    "latency": ("LATENCY_ENV", "LatencyModel", "shared_model"),
+    "parallel": ("MAX_WORKERS", "Pool", "run_parallel"),
+    "parsers": ("Clock", "EtherChannel", "Interface", "InterfaceStatus", "TdrPair", "VtpStatus", "parse",
+                "parser_for", "show"),
+    "query": ("Filter", "begin", "exclude", "filter_lines", "include", "pushdown", "query", "section", "select"),
+    "reactor": ("MuxChannel", "Reactor", "expect_all"),
+    "reconcile": ("Delta", "PortChannelIntent", "ReconcileResult", "plan", "reconcile"),
+    "runconfig": ("RunningConfig", "running_config"),
+    "session": ("MAX_CHANNELS", "JumpHost"),
+    "showcache": ("ShowCache", "interfaces_in"),
+    "simulator": ("Fleet", "Simulator"),
+    "tdr": ("TDR_TIMEOUT", "TdrResult", "poll_tdr", "run_tdr", "start_tdr"),
+    "tdr_store": ("COUNTER_LINES", "MAX_AGE_DAYS", "TDR_STORE_ENV", "TdrStore", "port_counters", "shared_store"),
+    "transcript": ("RECORD_ENV", "REPLAY_ENV", "Recorder", "Replayer", "shared_transcript"),
+    "transport": ("SAVE_TIMEOUT", "Shell", "connect", "enable", "exit_hop", "hop", "read_shell_output",
+                  "send_command"),
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULES)
+
+
+class _Package(types.ModuleType):
+    """Loading netlib.query must not replace netlib's query() (same for expect and reconcile)"""
+
+    def __setattr__(self, name, value):
+        # The import system binds each loaded submodule on the package; an exported name wins
+        if isinstance(value, types.ModuleType) and name in _MODULES:
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module 'netlib' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f"netlib.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
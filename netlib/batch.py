@@ -0,0 +1,140 @@
+"""
+Pipelined commands: one write, one wait, per-command output.
+
+send_batch() writes every command in a single send and reads until the
+device prompt has come back once per command. The stream is then split on
+that prompt (learned from the previous read, e.g. 'SW01#') and the echoed
+command line is dropped, so each command gets exactly its own output back.
+Meant for exec-mode commands that do not change the prompt.
+
+push_config() does the same for a configuration block: 'configure terminal',
+the lines and 'end' go out in one write, the prompts are counted in any
+mode (SW01(config-if)#), and '% Invalid input' style errors are pinned to
+the line that caused them.
+"""
+import re
+import time
+from collections import namedtuple
+
+from netlib.expect import COMMAND_TIMEOUT, find_errors
+
+# (line, error) pairs for every line IOS rejected
+ConfigResult = namedtuple("ConfigResult", "output errors")
+
+
+# Empty lines sent to get a prompt out of a shell that has not shown one yet
+PROMPT_PROBES = 2
+
+
+def learn_prompt(shell, timeout=COMMAND_TIMEOUT, probes=PROMPT_PROBES):
+    """
+    Device prompt (e.g. 'SW01#'), asking the device if not known yet.
+
+    Raises ConnectionError if no device prompt shows up after probes tries:
+    batches are cut on the prompt, so there is nothing to pipeline against.
+    """
+    for _ in range(probes):
+        if shell.prompt:
+            break
+        shell.send("\n")
+        shell.expect(timeout=timeout)
+    if not shell.prompt:
+        raise ConnectionError(f"{getattr(shell, 'host', None) or 'device'}: no prompt after "
+                              f"{probes} probes, cannot send a batch")
+    return shell.prompt
+
+
+def read_prompts(shell, prompt, count, timeout):
+    """
+    Read until the prompt regex has shown up count times at a line start.
+    Returns (output, prompts seen); stops early on timeout or silence.
+    """
+    prompt_re = re.compile(r"(?:^|[\r\n])" + prompt)
+    chunks = []
+    seen = 0
+    deadline = time.monotonic() + timeout
+    while seen < count:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        result = shell.expect(timeout=remaining)
+        if not result.output:
+            break
+        chunks.append(result.output)
+        seen = len(prompt_re.findall("".join(chunks)))
+    return "".join(chunks), seen
+
+
+def split_on_prompt(output, prompt, commands):
+    """Cut a pipelined stream into one output per command, echo removed"""
+    # The prompt (a regex) only counts at the start of a line
+    parts = re.split(r"(?:^|(?<=[\r\n]))" + prompt, output)
+    outputs = []
+    for command, part in zip(commands, parts):
+        lines = part.lstrip("\r\n").split("\n", 1)
+        if lines[0].strip() == command.split("\n", 1)[0].strip():
+            part = lines[1] if len(lines) > 1 else ""
+        outputs.append(part.strip("\r\n"))
+    # Commands whose prompt never came back get no output
+    outputs.extend("" for _ in range(len(commands) - len(outputs)))
+    return outputs
+
+
+def send_batch(shell, commands, timeout=COMMAND_TIMEOUT):
+    """
+    Send several show commands in one write and return their outputs.
+
+    Returns a list in the same order as commands. timeout covers the whole
+    batch; commands still running when it expires get '' and a warning.
+    """
+    commands = list(commands)
+    if not commands:
+        return []
+    prompt = learn_prompt(shell, timeout)
+
+    if shell.echo:
+        print(f"\n[BATCH] {len(commands)} commands: {'; '.join(commands)}")
+    for command in commands:
+        shell.show_cache.sent(shell.host, command)
+    shell.send("".join(f"{command}\n" for command in commands))
+
+    output, seen = read_prompts(shell, re.escape(prompt), len(commands), timeout)
+    outputs = split_on_prompt(output, re.escape(prompt), commands)
+    for command, output in zip(commands, outputs):
+        for error in find_errors(output):
+            print(f"\n[ERROR] {shell.host}: {command}: {error}")
+    if seen < len(commands):
+        print(f"\n[WARNING] {shell.host}: only {seen}/{len(commands)} prompts after {timeout}s")
+    return outputs
+
+
+def push_config(shell, lines, timeout=COMMAND_TIMEOUT):
+    """
+    Push a configuration block in one write and report rejected lines.
+
+    lines go between 'configure terminal' and 'end'. An entry may span
+    several lines when the device gives no prompt in between (a banner).
+    Returns ConfigResult(output, [(line, error), ...]).
+    """
+    lines = list(lines)
+    block = ["configure terminal"] + lines + ["end"]
+    # 'SW01#' -> any mode of SW01: SW01#, SW01(config)#, SW01(config-if)# ...
+    hostname = re.sub(r"(?:\([\w.\-]+\))?[#>]$", "", learn_prompt(shell, timeout))
+    prompt = re.escape(hostname) + r"(?:\([\w.\-]+\))?[#>]"
+
+    if shell.echo:
+        print(f"\n[CONFIG] Pushing {len(lines)} lines to {shell.host}")
+    shell.show_cache.configured(shell.host, lines)
+    shell.send("".join(f"{line}\n" for line in block))
+    output, seen = read_prompts(shell, prompt, len(block), timeout)
+
+    errors = []
+    for line, line_output in zip(block, split_on_prompt(output, prompt, block)):
+        for error in find_errors(line_output):
+            print(f"\n[ERROR] {shell.host}: {line.splitlines()[0]}: {error}")
+            errors.append((line, error))
+    if seen < len(block):
+        print(f"\n[WARNING] {shell.host}: config block not finished after {timeout}s "
+              f"({seen}/{len(block)} prompts)")
+        errors.append((None, "timeout"))
+    return ConfigResult(output, errors)
@@ -0,0 +1,404 @@
+"""
+Local session broker: keeps core and access-switch sessions warm between runs.
+
+Every script used to pay connect -> banner -> enable -> terminal length 0 ->
+nested ssh -> password for each switch, even when vtp_config.py,
+configure_clock_banner.py and configure_loopback2.py run back to back
+against the same switches. The broker is a long-running process that owns
+JumpHost logins to the core plus already-hopped access-switch channels,
+pings them with keepalives, and lends them to scripts over a Unix socket.
+
+Start it once:
+
+    python3 -m netlib.broker            # listens on ~/.netlib-broker.sock
+    export NETLIB_BROKER=~/.netlib-broker.sock
+
+Scripts call core_session() instead of JumpHost(); with NETLIB_BROKER set
+and the broker running, core.hop(ip) returns a warm session in milliseconds,
+otherwise it falls back to a normal JumpHost login.
+
+Protocol: one Unix connection per borrowed session, one JSON object per
+line each way. Requests are {"op": "open" | "send" | "expect" | "close" |
+"ping", ...}; every reply carries "ok" and, on failure, "error".
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+
+from netlib.expect import COMMAND_TIMEOUT, PROMPTS, ExpectResult
+from netlib.latency import shared_model
+from netlib.showcache import ShowCache
+from netlib.session import MAX_CHANNELS, JumpHost
+from netlib.transport import HOP_TIMEOUT, exit_hop, hop, last_line
+
+BROKER_ENV = "NETLIB_BROKER"
+DEFAULT_SOCKET = os.path.expanduser("~/.netlib-broker.sock")
+
+# Seconds between keepalives on idle sessions
+KEEPALIVE_INTERVAL = 30
+# Idle access-switch sessions are logged out after this many seconds
+WARM_TTL = 15 * 60
+# How often a borrower waiting for a channel looks for warm ones to evict
+EVICT_POLL = 0.2
+# How long a ping may take before the session is considered dead
+PING_TIMEOUT = 5
+
+
+class Broker:
+    """Pool of core logins and warm, already-hopped access-switch sessions"""
+
+    def __init__(self, max_channels=MAX_CHANNELS, keepalive=KEEPALIVE_INTERVAL, ttl=WARM_TTL):
+        self.max_channels = max_channels
+        self.keepalive = keepalive
+        self.ttl = ttl
+
+        # (core, username) -> (password, JumpHost)
+        self._cores = {}
+        # (core, username, host) -> [(idle_since, shell), ...]
+        self._warm = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _core(self, core_ip, username, password, enable_password=None):
+        """JumpHost for this core login, created on first use"""
+        key = (core_ip, username)
+        with self._lock:
+            entry = self._cores.get(key)
+            if entry is None:
+                core = JumpHost(core_ip, username, password, max_channels=self.max_channels,
+                                enable_password=enable_password, echo=False,
+                                keepalive=self.keepalive)
+                self._cores[key] = (password, core)
+            elif entry[0] != password:
+                raise PermissionError(f"wrong password for {username}@{core_ip}")
+            else:
+                core = entry[1]
+        try:
+            return core.open()
+        except Exception:
+            # Forget a core whose first login failed, or a mistyped password would stick
+            with self._lock:
+                if self._cores.get(key, (None, None))[1] is core:
+                    del self._cores[key]
+            raise
+
+    def _ping(self, shell):
+        """True if shell still answers at an exec prompt (leaves config mode)"""
+        try:
+            shell.send("\n")
+            result = shell.expect(timeout=PING_TIMEOUT)
+            if result.prompt == "device" and "(config" in last_line(result.output):
+                shell.send("end\n")
+                result = shell.expect(timeout=PING_TIMEOUT)
+            return result.prompt == "device"
+        except OSError:
+            return False
+
+    def _take_warm(self, key):
+        """Most recently used live warm session for key, or None"""
+        core = self._cores[key[:2]][1]
+        while True:
+            with self._lock:
+                sessions = self._warm.get(key)
+                if not sessions:
+                    return None
+                _, shell = sessions.pop()
+            if self._ping(shell):
+                return shell
+            core.release(shell, reuse=False)
+
+    def _evict_one(self, ckey):
+        """Log out of the longest-idle warm session on this core; False if none"""
+        with self._lock:
+            oldest = None
+            for key, sessions in self._warm.items():
+                if key[:2] == ckey and sessions and (oldest is None or sessions[0][0] < oldest[0]):
+                    oldest = (sessions[0][0], key)
+            if oldest is None:
+                return False
+            _, shell = self._warm[oldest[1]].pop(0)
+        self._retire(ckey, shell)
+        return True
+
+    def _retire(self, ckey, shell):
+        """Leave the access switch and hand the channel back to its core"""
+        core = self._cores[ckey][1]
+        try:
+            exit_hop(shell)
+            core.release(shell)
+        except OSError:
+            core.release(shell, reuse=False)
+
+    def borrow(self, request):
+        """
+        Warm session for the requested switch, hopping there if needed.
+        host=None borrows a channel at the core's own prompt.
+        """
+        core_ip, username, host = request["core"], request["username"], request["host"]
+        core = self._core(core_ip, username, request["password"], request.get("enable_password"))
+        key = (core_ip, username, host)
+        if host is None:
+            return key, core.acquire()
+
+        shell = self._take_warm(key)
+        if shell is not None:
+            return key, shell
+
+        # Free a channel held by another switch's warm session if all are
+        # taken; busy ones may turn warm while we wait, so look again
+        shell = core.acquire(blocking=False)
+        while shell is None:
+            if self._evict_one(key[:2]):
+                shell = core.acquire(blocking=False)
+            else:
+                shell = core.acquire(timeout=EVICT_POLL)
+
+        hop_username = request.get("hop_username")
+        hop_username = username if hop_username is None else hop_username
+        hop_password = request.get("hop_password") or request["password"]
+        if not hop(shell, host, hop_username, hop_password, request.get("timeout", HOP_TIMEOUT)):
+            core.release(shell)
+            raise ConnectionError(f"could not hop to {host}")
+        return key, shell
+
+    def give_back(self, key, shell, reuse=True):
+        """Keep a returned session warm, or drop it if its state is unknown"""
+        if key[2] is None:
+            # Core channels go straight back to the JumpHost's own pool
+            self._cores[key[:2]][1].release(shell, reuse and self._ping(shell))
+        elif reuse and self._ping(shell):
+            with self._lock:
+                self._warm.setdefault(key, []).append((time.monotonic(), shell))
+        else:
+            self._cores[key[:2]][1].release(shell, reuse=False)
+
+    def keepalive_loop(self):
+        """Ping idle sessions and log out of the ones idle longer than ttl"""
+        while not self._stop.wait(self.keepalive):
+            now = time.monotonic()
+            with self._lock:
+                idle = [(key, entry) for key, sessions in self._warm.items() for entry in sessions]
+                self._warm = {}
+            for key, (since, shell) in idle:
+                if now - since > self.ttl:
+                    self._retire(key[:2], shell)
+                elif self._ping(shell):
+                    with self._lock:
+                        self._warm.setdefault(key, []).append((since, shell))
+                else:
+                    print(f"[BROKER] {key[2]}: session dropped")
+                    self._cores[key[:2]][1].release(shell, reuse=False)
+
+    def close(self):
+        """Log out of every switch and the core"""
+        self._stop.set()
+        with self._lock:
+            idle = [(key, shell) for key, sessions in self._warm.items() for _, shell in sessions]
+            self._warm = {}
+        for key, shell in idle:
+            self._retire(key[:2], shell)
+        for _, core in self._cores.values():
+            core.close()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One borrowed session per connection"""
+
+    def handle(self):
+        broker = self.server.broker
+        key = shell = None
+        reuse = False
+        try:
+            for line in self.rfile:
+                request = json.loads(line)
+                op = request.get("op")
+                reply = {"ok": True}
+                try:
+                    if op == "open":
+                        key, shell = broker.borrow(request)
+                    elif op == "send":
+                        shell.send(request["data"])
+                    elif op == "expect":
+                        names = request.get("prompts")
+                        prompts = None if names is None else {n: PROMPTS[n] for n in names}
+                        result = shell.expect(prompts, request.get("timeout", COMMAND_TIMEOUT))
+                        reply.update(result._asdict())
+                    elif op == "close":
+                        reuse = request.get("reuse", True)
+                    elif op != "ping":
+                        raise ValueError(f"unknown op {op!r}")
+                except ConnectionError as e:
+                    reply = {"ok": False, "error": str(e), "kind": "connection"}
+                except Exception as e:
+                    reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                self.wfile.write(json.dumps(reply).encode() + b"\n")
+                if op == "close":
+                    break
+        finally:
+            if shell is not None:
+                broker.give_back(key, shell, reuse)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path=DEFAULT_SOCKET, max_channels=MAX_CHANNELS, keepalive=KEEPALIVE_INTERVAL, ttl=WARM_TTL):
+    """Run the broker on a Unix socket only the current user can open"""
+    if os.path.exists(path):
+        os.unlink(path)
+    old_umask = os.umask(0o077)
+    try:
+        server = _Server(path, _Handler)
+    finally:
+        os.umask(old_umask)
+    os.chmod(path, 0o600)
+
+    server.broker = Broker(max_channels, keepalive, ttl)
+    threading.Thread(target=server.broker.keepalive_loop, daemon=True).start()
+    print(f"[BROKER] Listening on {path} (max {max_channels} channels per core)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[BROKER] Shutting down...")
+    finally:
+        server.server_close()
+        server.broker.close()
+        os.unlink(path)
+
+
+class _Connection:
+    """Client end of one broker connection"""
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.rfile = self.sock.makefile("rb")
+
+    def call(self, **request):
+        self.sock.sendall(json.dumps(request).encode() + b"\n")
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("broker closed the connection")
+        reply = json.loads(line)
+        if not reply["ok"]:
+            if reply.get("kind") == "connection":
+                raise ConnectionError(reply["error"])
+            raise RuntimeError(f"broker: {reply['error']}")
+        return reply
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+
+class BrokerShell:
+    """Shell look-alike whose channel lives in the broker"""
+
+    def __init__(self, connection, host, echo=True):
+        self._connection = connection
+        self.host = host
+        self.echo = echo
+        self.latency = shared_model()
+        self.show_cache = ShowCache()
+        self.hops = []
+        self.prompt = None
+
+    def send(self, data):
+        self._connection.call(op="send", data=data)
+
+    def expect(self, prompts=None, timeout=COMMAND_TIMEOUT):
+        """Read until a prompt shows up, on the broker side"""
+        names = None if prompts is None else [name for name in PROMPTS if name in prompts]
+        reply = self._connection.call(op="expect", prompts=names, timeout=timeout)
+        result = ExpectResult(reply["output"], reply["prompt"], reply["errors"], reply["elapsed"])
+        if self.echo:
+            print(result.output, end="")
+        if result.prompt == "device":
+            self.prompt = last_line(result.output)
+        return result
+
+    def close(self):
+        pass
+
+
+class BrokerClient:
+    """Same interface as JumpHost, but borrows warm sessions from the broker"""
+
+    def __init__(self, path, host, username, password, enable_password=None, echo=True):
+        self.path = path
+        self.host = host
+        self.username = username
+        self.password = password
+        self.enable_password = enable_password
+        self.echo = echo
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    @contextmanager
+    def _borrow(self, host, **request):
+        connection = _Connection(self.path)
+        reuse = True
+        try:
+            connection.call(op="open", core=self.host, username=self.username,
+                            password=self.password, enable_password=self.enable_password,
+                            host=host, **request)
+            if self.echo:
+                print(f"\n[BROKER] Borrowed session to {host or self.host}")
+            try:
+                yield BrokerShell(connection, host or self.host, self.echo)
+            except Exception:
+                reuse = False
+                raise
+            connection.call(op="close", reuse=reuse)
+        finally:
+            connection.close()
+
+    def shell(self):
+        """Warm channel at the core's own prompt"""
+        return self._borrow(None)
+
+    def hop(self, host, username=None, password=None, timeout=HOP_TIMEOUT):
+        """Warm shell on host; handed back to the broker afterwards"""
+        return self._borrow(host, hop_username=username, hop_password=password, timeout=timeout)
+
+
+def core_session(host, username, password, max_channels=MAX_CHANNELS, enable_password=None,
+                 echo=True):
+    """
+    Broker-backed core session if NETLIB_BROKER points at a running broker,
+    otherwise a direct JumpHost login. Both hand out shells via .hop(ip).
+    """
+    path = os.environ.get(BROKER_ENV)
+    if path:
+        path = os.path.expanduser(path)
+        try:
+            _Connection(path).close()
+            return BrokerClient(path, host, username, password, enable_password, echo=echo)
+        except OSError as e:
+            print(f"[WARNING] Session broker at {path} not reachable ({e}), logging in directly")
+    return JumpHost(host, username, password, max_channels=max_channels,
+                    enable_password=enable_password, echo=echo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep switch sessions warm for the netlib scripts")
+    parser.add_argument("socket", nargs="?", default=os.environ.get(BROKER_ENV, DEFAULT_SOCKET))
+    parser.add_argument("--max-channels", type=int, default=MAX_CHANNELS)
+    parser.add_argument("--keepalive", type=int, default=KEEPALIVE_INTERVAL)
+    parser.add_argument("--ttl", type=int, default=WARM_TTL)
+    args = parser.parse_args()
+    serve(os.path.expanduser(args.socket), args.max_channels, args.keepalive, args.ttl)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Prompt-aware reader for interactive IOS shells.
+
+Instead of sleeping a fixed delay and draining whatever recv_ready() has,
+expect() reads until the device shows a prompt (hostname#, (config-if)#,
+Password:, [yes/no] ...) and returns straight away. Error markers such as
+'% Invalid input' are picked up in the same pass. The timeout is only the
+hard safety net for commands that never give the prompt back.
+"""
+import re
+import socket
+import time
+from collections import namedtuple
+
+RECV_SIZE = 65535
+COMMAND_TIMEOUT = 10
+
+# Only the tail of the buffer can hold the prompt we are waiting for
+PROMPT_WINDOW = 256
+
+# Prompts we stop reading on, checked in this order against the buffer tail
+PROMPTS = {
+    # SW01#  SW01>  SW01(config)#  SW01(config-if-range)#
+    "device": re.compile(rb"(?:^|[\r\n])[A-Za-z0-9][\w.\-]*(?:\([\w.\-]+\))?[#>]\s*$"),
+    "password": re.compile(rb"(?:[Pp]assword|Pass):\s*$"),
+    "username": re.compile(rb"(?:[Uu]sername|[Ll]ogin):\s*$"),
+    # [yes/no]:  (yes/no/[fingerprint])?  [confirm]  Destination filename [startup-config]?
+    "confirm": re.compile(rb"(?:\[yes/no\]|\(yes/no(?:/\[fingerprint\])?\)\?|\[confirm\]|\[[^\]\r\n]*\]\?)\s*:?\s*$"),
+}
+
+# IOS error lines, matched anywhere in the output
+ERROR_MARKERS = re.compile(
+    rb"^\s*(% ?(?:Invalid input|Incomplete command|Ambiguous command|Unknown command"
+    rb"|Bad (?:passwords|secrets)|Access denied|Authentication failed"
+    rb"|Connection refused|Connection timed out|Destination unreachable"
+    rb"|Unrecognized host)[^\r\n]*)",
+    re.MULTILINE,
+)
+
+ExpectResult = namedtuple("ExpectResult", "output prompt errors elapsed")
+
+
+def match_prompt(buffer, prompts=None):
+    """Return the name of the prompt at the end of buffer, or None"""
+    tail = bytes(buffer[-PROMPT_WINDOW:])
+    for name, pattern in (prompts or PROMPTS).items():
+        if pattern.search(tail):
+            return name
+    return None
+
+
+def find_errors(data):
+    """Return every IOS error line found in data (bytes or str)"""
+    if isinstance(data, str):
+        data = data.encode("utf-8", errors="ignore")
+    return [m.group(1).decode("utf-8", errors="ignore").strip() for m in ERROR_MARKERS.finditer(data)]
+
+
+def expect(shell, prompts=None, timeout=COMMAND_TIMEOUT, echo=True):
+    """
+    Read from shell until one of the prompts shows up or timeout expires.
+
+    Returns ExpectResult(output, prompt, errors, elapsed). prompt is the
+    name of the matched prompt, or None if we gave up on the timeout.
+    """
+    buffer = bytearray()
+    prompt = None
+    start = time.monotonic()
+    deadline = start + timeout
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        # Block in recv() until data arrives instead of polling recv_ready()
+        shell.settimeout(remaining)
+        try:
+            data = shell.recv(RECV_SIZE)
+        except socket.timeout:
+            break
+        if not data:
+            # Channel closed by the far end
+            break
+        buffer += data
+        if echo:
+            print(data.decode("utf-8", errors="ignore"), end="")
+        prompt = match_prompt(buffer, prompts)
+        if prompt:
+            break
+
+    output = buffer.decode("utf-8", errors="ignore")
+    return ExpectResult(output, prompt, find_errors(buffer), time.monotonic() - start)
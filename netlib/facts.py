@@ -0,0 +1,205 @@
+"""
+Device facts cached on disk: platform, interface naming, ports and media types.
+
+port_channel2/3/5 used to rediscover the interface naming (Gi / Te /
+GigabitEthernet) with a full 'show ip interface brief' or 'show interfaces
+status' on every run. device_facts() gathers those facts once and keeps
+them per switch IP in a JSON file. Later runs only send one short
+'show version' to check that it is still the same box: same serial and the
+same boot time (now - uptime). A different serial, a reload, an expired TTL
+or an explicit invalidate sends it back to discovery.
+
+    python3 -m netlib.facts                      # list cached switches
+    python3 -m netlib.facts --invalidate 10.20.39.22
+    python3 -m netlib.facts --clear
+
+Only facts that config changes do not touch are kept; link state (connected /
+notconnect) is always read live.
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+
+from netlib.parsers import parse_interfaces_status
+from netlib.transport import send_command
+
+FACTS_ENV = "NETLIB_FACTS"
+DEFAULT_PATH = "~/.netlib-facts.json"
+# Rediscover at least once a day even if the switch looks unchanged
+FACTS_TTL = 24 * 3600
+# Boot times computed from 'uptime is ...' only have minute resolution
+BOOT_TOLERANCE = 300
+
+VERSION_COMMAND = "show version"
+PORTS_COMMAND = "show interfaces status"
+
+UPTIME_UNITS = {
+    "year": 365 * 86400,
+    "week": 7 * 86400,
+    "day": 86400,
+    "hour": 3600,
+    "minute": 60,
+    "second": 1,
+}
+
+
+def parse_uptime(output):
+    """'uptime is 1 year, 2 weeks, 4 hours, 5 minutes' -> seconds, or None"""
+    match = re.search(r"uptime is ([^\r\n]+)", output)
+    if not match:
+        return None
+    return sum(int(count) * UPTIME_UNITS[unit]
+               for count, unit in re.findall(r"(\d+)\s+(year|week|day|hour|minute|second)", match.group(1)))
+
+
+def parse_version(output):
+    """Serial, boot time and platform out of 'show version'"""
+    serial = re.search(r"System [Ss]erial [Nn]umber\s*:\s*(\S+)", output) \
+        or re.search(r"Processor board ID (\S+)", output)
+    platform = re.search(r"Model [Nn]umber\s*:\s*(\S+)", output) \
+        or re.search(r"^cisco (\S+)", output, re.MULTILINE)
+    uptime = parse_uptime(output)
+    return {
+        "serial": serial.group(1) if serial else None,
+        "boot": round(time.time() - uptime) if uptime is not None else None,
+        "platform": platform.group(1) if platform else None,
+    }
+
+
+def parse_ports(output):
+    """Physical ports and their media type from 'show interfaces status' (no Po/Vlan)"""
+    return {row.port: row.type for row in parse_interfaces_status(output)
+            if not row.port.startswith(("Po", "Vl"))}
+
+
+def naming(ports):
+    """Short interface prefixes in use, e.g. ['Gi', 'Te']"""
+    return sorted({re.match(r"[A-Za-z]+", port).group(0) for port in ports if re.match(r"[A-Za-z]+", port)})
+
+
+def same_device(cached, current):
+    """True if current (from parse_version) is the box the facts were taken on"""
+    if not current["serial"] or current["serial"] != cached.get("serial"):
+        return False
+    if current["boot"] is None or cached.get("boot") is None:
+        return False
+    return abs(current["boot"] - cached["boot"]) <= BOOT_TOLERANCE
+
+
+class FactsCache:
+    """switch IP -> facts, in a JSON file shared by every script"""
+
+    def __init__(self, path=None, ttl=FACTS_TTL):
+        self.path = os.path.expanduser(path or os.environ.get(FACTS_ENV, DEFAULT_PATH))
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def get(self, host):
+        """Cached facts for host, or None if missing or older than the TTL"""
+        with self._lock:
+            facts = self._entries.get(host)
+        if facts and time.time() - facts.get("collected", 0) < self.ttl:
+            return facts
+        return None
+
+    def put(self, host, facts):
+        with self._lock:
+            self._entries[host] = facts
+            self._save()
+
+    def invalidate(self, host=None):
+        """Forget one switch, or every switch when host is None"""
+        with self._lock:
+            if host is None:
+                self._entries = {}
+            else:
+                self._entries.pop(host, None)
+            self._save()
+
+    def hosts(self):
+        with self._lock:
+            return dict(self._entries)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """Process-wide cache at $NETLIB_FACTS (default ~/.netlib-facts.json)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FactsCache()
+        return _shared
+
+
+def gather_facts(shell, version_output=None):
+    """Discover the facts of the switch shell is on"""
+    if version_output is None:
+        version_output = send_command(shell, VERSION_COMMAND)
+    facts = parse_version(version_output)
+    facts["ports"] = parse_ports(send_command(shell, PORTS_COMMAND))
+    facts["naming"] = naming(facts["ports"])
+    facts["collected"] = time.time()
+    return facts
+
+
+def device_facts(shell, cache=None, refresh=False):
+    """
+    Facts for the switch shell is on, from the cache when it is still the same box.
+
+    Costs one 'show version' on a hit; refresh=True always rediscovers.
+    """
+    cache = cache or shared_cache()
+    cached = None if refresh else cache.get(shell.host)
+    version_output = send_command(shell, VERSION_COMMAND)
+    if cached and same_device(cached, parse_version(version_output)):
+        print(f"\n[FACTS] {shell.host}: cached ({cached['platform']}, {len(cached['ports'])} ports)")
+        return cached
+
+    facts = gather_facts(shell, version_output)
+    print(f"\n[FACTS] {shell.host}: discovered {facts['platform']}, {len(facts['ports'])} ports, "
+          f"naming {'/'.join(facts['naming']) or '?'}")
+    cache.put(shell.host, facts)
+    return facts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or reset the netlib device facts cache")
+    parser.add_argument("--path", default=None)
+    parser.add_argument("--invalidate", nargs="+", metavar="IP", default=[])
+    parser.add_argument("--clear", action="store_true")
+    args = parser.parse_args()
+
+    cache = FactsCache(args.path)
+    if args.clear:
+        cache.invalidate()
+    for host in args.invalidate:
+        cache.invalidate(host)
+    for host, facts in sorted(cache.hosts().items()):
+        age = (time.time() - facts.get("collected", 0)) / 3600
+        print(f"{host}: {facts.get('platform')} serial {facts.get('serial')}, "
+              f"{len(facts.get('ports', {}))} ports, naming {'/'.join(facts.get('naming', []))}, "
+              f"{age:.1f}h old")
+
+
+if __name__ == "__main__":
+    main()
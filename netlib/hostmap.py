@@ -0,0 +1,25 @@
+"""
+Where to open an SSH connection for a host.
+
+connect() and JumpHost go to the host itself unless $NETLIB_SIMULATOR
+points at a host map written by netlib.simulator, in which case the hosts
+in it (and '*' for any other host) go to the simulator's local ports.
+"""
+import json
+import os
+
+SIMULATOR_ENV = "NETLIB_SIMULATOR"
+
+
+def resolve(host, port):
+    """(address, port) to connect to for host: the simulator's when it serves host"""
+    path = os.environ.get(SIMULATOR_ENV)
+    if not path:
+        return host, port
+    try:
+        with open(os.path.expanduser(path)) as f:
+            hosts = json.load(f)["hosts"]
+    except (OSError, ValueError, KeyError):
+        return host, port
+    target = hosts.get(host) or hosts.get("*")
+    return tuple(target) if target else (host, port)
@@ -0,0 +1,130 @@
+"""
+Per-device, per-command read deadlines learned from the run itself.
+
+A prompt-aware read returns as soon as the prompt is back, so the timeout
+only decides how long we sit on a command that never answers. One fixed
+value is too long for a local switch and too short for a loaded or remote
+one. LatencyModel records how long each (host, command class) took and,
+once it has a few samples, hands out p99 * margin as the next deadline,
+clamped to [MIN_DEADLINE, max(MAX_DEADLINE, caller's default)]. A timeout
+the caller passed explicitly (write memory's SAVE_TIMEOUT) is a floor: a
+learned deadline never cuts it short.
+
+The command class is the normalized command without its interface names,
+so 'show interfaces Gi1/0/1 status' and 'show interfaces status' share
+samples while a full 'show interfaces' or 'show running-config' does not
+share them with its one-interface form.
+
+send_command() uses the process-wide model from shared_model(). Point
+NETLIB_LATENCY at a JSON file to keep the samples between runs, so the
+next run starts calibrated:
+
+    export NETLIB_LATENCY=~/.netlib-latency.json
+"""
+import atexit
+import json
+import os
+import threading
+from collections import deque
+
+from netlib.showcache import INTERFACE, interfaces_in, normalize
+
+LATENCY_ENV = "NETLIB_LATENCY"
+
+# Samples kept per (host, command class); older ones drop off
+MAX_SAMPLES = 100
+# Below this many samples the caller's own timeout is used unchanged
+MIN_SAMPLES = 5
+PERCENTILE = 99
+MARGIN = 2.0
+# Seconds added on top, so a 50 ms command does not get a 100 ms deadline
+SLACK = 1.0
+MIN_DEADLINE = 2
+MAX_DEADLINE = 60
+
+
+def command_class(command):
+    """'show interfaces Gi1/0/1 status' -> 'show interfaces status', 'sh run int Po11' -> 'sh run int'"""
+    def drop(match):
+        return (match.group(1) or "") if interfaces_in(match.group(0)) else match.group(0)
+    return " ".join(INTERFACE.sub(drop, normalize(command)).split())
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class LatencyModel:
+    """Response times per device and command class, turned into read deadlines"""
+
+    def __init__(self, path=None, margin=MARGIN, min_samples=MIN_SAMPLES):
+        self.path = os.path.expanduser(path) if path else None
+        self.margin = margin
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+        if self.path:
+            self.load()
+
+    def _bucket(self, host, command):
+        key = (host or "", command_class(command))
+        if key not in self._samples:
+            self._samples[key] = deque(maxlen=MAX_SAMPLES)
+        return self._samples[key]
+
+    def record(self, host, command, elapsed):
+        """Remember how long command took on host (a timeout counts as its full wait)"""
+        with self._lock:
+            self._bucket(host, command).append(round(elapsed, 3))
+
+    def deadline(self, host, command, default, minimum=0):
+        """Read deadline for command on host; default until there are enough samples, never below minimum"""
+        with self._lock:
+            samples = list(self._samples.get((host or "", command_class(command)), ()))
+        if len(samples) < self.min_samples:
+            return max(default, minimum)
+        learned = percentile(samples, PERCENTILE) * self.margin + SLACK
+        return max(min(max(learned, MIN_DEADLINE), max(MAX_DEADLINE, default)), minimum)
+
+    def load(self):
+        """Merge samples saved by an earlier run; a missing or bad file is ignored"""
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            for host, classes in saved.items():
+                for name, samples in classes.items():
+                    self._bucket(host, name).extend(samples)
+
+    def save(self):
+        """Write the samples to path (atomically, so a killed run cannot truncate it)"""
+        if not self.path:
+            return
+        with self._lock:
+            saved = {}
+            for (host, name), samples in self._samples.items():
+                saved.setdefault(host, {})[name] = list(samples)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(saved, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_model():
+    """Process-wide model, persisted to $NETLIB_LATENCY on exit if it is set"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LatencyModel(os.environ.get(LATENCY_ENV))
+            if _shared.path:
+                atexit.register(_shared.save)
+        return _shared
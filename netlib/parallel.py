@@ -0,0 +1,116 @@
+"""
+Bounded-concurrency fan-out over a list of switches.
+
+run_parallel() calls a per-switch function on a small thread pool. Each
+call gets its own session, so one switch timing out or raising does not
+stop the others; its exception is reported and kept as its result.
+
+Pool keeps the sessions between calls. The netmiko jump-host scripts log
+in to the core once per worker instead of once per switch: a worker
+borrows a jump connection, hops to its switch, exits back to the core and
+returns the connection for the next switch.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+# Keep this below the VTY lines free on the core switch
+MAX_WORKERS = 4
+
+
+def run_parallel(func, items, max_workers=MAX_WORKERS):
+    """
+    Call func(item) for every item on up to max_workers threads.
+
+    Returns {item: result} in the order of items. If func raises, the
+    exception is printed and stored as that item's result.
+    """
+    items = list(items)
+    results = {}
+
+    def run_one(item):
+        try:
+            return func(item)
+        except Exception as e:
+            print(f"\n[ERROR] {item}: {e}")
+            return e
+
+    if max_workers <= 1:
+        for item in items:
+            results[item] = run_one(item)
+        return results
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(run_one, item): item for item in items}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    return {item: results[item] for item in items}
+
+
+class Pool:
+    """Up to size connections made by open_connection(), reused across run_parallel() calls"""
+
+    def __init__(self, open_connection, close_connection, size=MAX_WORKERS, reusable=None):
+        self.open_connection = open_connection
+        self.close_connection = close_connection
+        self.size = size
+        # reusable(connection) -> False closes a returned connection (e.g. not back at the core prompt)
+        self.reusable = reusable
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection, opening one if none is idle.
+
+        Blocks while size connections are out. If the caller raises, the
+        connection is closed instead of reused: it may be left on the switch.
+        """
+        self._slots.acquire()
+        connection = None
+        try:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            connection = connection or self.open_connection()
+            yield connection
+        except Exception:
+            if connection is not None:
+                self._discard(connection)
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                if self._check(connection):
+                    with self._lock:
+                        self._idle.append(connection)
+                else:
+                    self._discard(connection)
+            self._slots.release()
+
+    def _check(self, connection):
+        try:
+            return self.reusable is None or self.reusable(connection)
+        except Exception:
+            return False
+
+    def _discard(self, connection):
+        try:
+            self.close_connection(connection)
+        except Exception as e:
+            print(f"\n[WARNING] closing a pooled connection failed: {e}")
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._discard(connection)
@@ -0,0 +1,228 @@
+"""
+Structured parsers for the IOS show commands the scripts read.
+
+Every script used to pick its own substrings out of the same outputs
+('connected' in line.lower(), f"Po{group}" in line, parts[2] ...). Each
+parser here walks the text once with precompiled patterns and returns
+namedtuple records, and the registry maps a command (abbreviations and
+'| include' filters allowed) to its parser:
+
+    records = show(shell, "show interfaces status")
+    connected = [r.port for r in records if r.status == "connected"]
+
+    records = parse("show etherchannel summary", output)
+
+Table outputs give a list of records; 'show vtp status' and 'show clock'
+give one record, or None if nothing matched.
+"""
+import re
+from collections import namedtuple
+
+from netlib.transport import send_command
+
+InterfaceStatus = namedtuple("InterfaceStatus", "port name status vlan duplex speed type")
+EtherChannel = namedtuple("EtherChannel", "group port_channel flags protocol members")
+EtherChannelMember = namedtuple("EtherChannelMember", "interface flags")
+TdrPair = namedtuple("TdrPair", "interface speed pair length tolerance remote_pair status")
+Interface = namedtuple(
+    "Interface",
+    "name admin_status protocol description duplex speed media input_errors crc output_errors resets",
+)
+VtpStatus = namedtuple("VtpStatus", "version domain mode pruning revision vlans")
+Clock = namedtuple("Clock", "time zone weekday month day year authoritative")
+
+# (command pattern, parser), first match wins
+REGISTRY = []
+
+
+def register(pattern):
+    """Decorator: use the function for commands matching pattern"""
+    def wrap(func):
+        REGISTRY.append((re.compile(pattern, re.IGNORECASE), func))
+        return func
+    return wrap
+
+
+def parser_for(command):
+    """Parser function for command, or None"""
+    command = " ".join(command.split())
+    for pattern, func in REGISTRY:
+        if pattern.match(command):
+            return func
+    return None
+
+
+def parse(command, output):
+    """Records for the output of command; raises KeyError if no parser knows it"""
+    func = parser_for(command)
+    if func is None:
+        raise KeyError(f"no parser for '{command}'")
+    return func(output)
+
+
+def show(shell, command, timeout=None):
+    """Send a show command and return its parsed records"""
+    output = send_command(shell, command) if timeout is None else send_command(shell, command, timeout)
+    return parse(command, output)
+
+
+# Gi1/0/1  AP floor 2  connected  10  a-full  a-1000  10/100/1000BaseTX
+# The Name column may hold spaces, so the status keyword anchors the row; Vlan,
+# Duplex and Speed only take their IOS values, so a description with the word
+# 'connected' in it is not read as the status
+STATUS_ROW = re.compile(
+    r"^(?P<port>[A-Za-z][\w\-]*\d+(?:/\d+)*(?:\.\d+)?)[ \t]+(?P<name>.*?)[ \t]*"
+    r"(?P<status>connected|notconnect(?:ed)?|disabled|err-disabled|inactive|monitoring|suspended|faulty|sfpAbsent)[ \t]+"
+    r"(?P<vlan>\d+|trunk|routed|unassigned)[ \t]+(?P<duplex>(?:a-)?(?:full|half)|auto)[ \t]+"
+    r"(?P<speed>(?:a-)?\d+[MG]?|auto)[ \t]*(?P<type>[^\r\n]*?)[ \t]*\r?$",
+    re.MULTILINE,
+)
+
+
+@register(r"sh(ow)? int(erfaces?)?( \S+)? status\b")
+def parse_interfaces_status(output):
+    """'show interfaces [X] status' -> [InterfaceStatus]"""
+    return [InterfaceStatus(**m.groupdict()) for m in STATUS_ROW.finditer(output)]
+
+
+# 11     Po11(SU)        LACP        Gi1/1/3(P)  Gi1/1/4(P)
+ETHERCHANNEL_ROW = re.compile(r"^(\d+)\s+(Po\d+)\(([A-Za-z]+)\)\s+(\S+)(.*)$")
+# Long member lists wrap onto lines with nothing but members
+MEMBER = re.compile(r"([A-Za-z][\w\-]*\d+(?:/\d+)*)\(([A-Za-z]+)\)")
+
+
+@register(r"sh(ow)? eth(erchannel)? summ(ary)?\b")
+def parse_etherchannel_summary(output):
+    """'show etherchannel summary' -> [EtherChannel] with their members"""
+    channels = []
+    for line in output.splitlines():
+        row = ETHERCHANNEL_ROW.match(line.strip())
+        if row:
+            group, port_channel, flags, protocol, rest = row.groups()
+            channels.append(EtherChannel(int(group), port_channel, flags, protocol,
+                                         [EtherChannelMember(*m) for m in MEMBER.findall(rest)]))
+        elif channels and line[:1].isspace() and MEMBER.search(line):
+            channels[-1].members.extend(EtherChannelMember(*m) for m in MEMBER.findall(line))
+    return channels
+
+
+# Gi1/0/1   1000M Pair A     3    +/- 1  meters Pair A      Normal
+#                 Pair B     3    +/- 1  meters Pair B      Normal
+TDR_ROW = re.compile(
+    r"^(?:(?P<interface>[A-Za-z][\w\-]*\d+(?:/\d+)*)\s+(?P<speed>\S+)\s+)?\s*"
+    r"Pair\s+(?P<pair>[A-D])\s+(?P<length>\d+|N/A|-)\s*(?:\+/-\s*(?P<tolerance>\d+)\s*meters?)?\s+"
+    r"(?P<remote_pair>Pair\s+[A-D]|N/A|-)\s+(?P<status>.+?)\s*$",
+    re.IGNORECASE,
+)
+
+
+@register(r"sh(ow)? cable-diag(nostics)? tdr\b")
+def parse_cable_diagnostics_tdr(output):
+    """
+    'show cable-diagnostics tdr [interface X]' -> [TdrPair], one per pair.
+
+    Empty when the port does not support TDR (fiber/SFP) or has no result.
+    length is an int in meters, or None when the switch prints N/A.
+    """
+    pairs = []
+    interface = speed = None
+    for line in output.splitlines():
+        row = TDR_ROW.match(line)
+        if not row:
+            continue
+        if row.group("interface"):
+            interface, speed = row.group("interface"), row.group("speed")
+        length = row.group("length")
+        pairs.append(TdrPair(
+            interface,
+            speed,
+            row.group("pair").upper(),
+            int(length) if length.isdigit() else None,
+            int(row.group("tolerance")) if row.group("tolerance") else None,
+            row.group("remote_pair"),
+            row.group("status"),
+        ))
+    return pairs
+
+
+INTERFACE_HEADER = re.compile(
+    r"^(\S+) is (administratively down|up|down)(?:\s*\([^)]*\))?, line protocol is (\w+)", re.MULTILINE
+)
+DESCRIPTION = re.compile(r"^\s+Description: (.*?)\s*$", re.MULTILINE)
+DUPLEX_SPEED = re.compile(
+    r"^\s+(\S+?)[- ]duplex, ([^,]+?)(?:, link type is [^,]+)?(?:, media type is (.+?))?\s*$",
+    re.MULTILINE | re.IGNORECASE,
+)
+INPUT_ERRORS = re.compile(r"(\d+) input errors, (\d+) CRC")
+OUTPUT_ERRORS = re.compile(r"(\d+) output errors")
+# Counts link flaps on IOS switch ports
+RESETS = re.compile(r"(\d+) interface resets")
+
+
+def _search(pattern, text, group=1, default=None):
+    match = pattern.search(text)
+    return match.group(group) if match else default
+
+
+@register(r"sh(ow)? int(erfaces?)?( [A-Za-z][\w\-]*\s?\d+(/\d+)*(\.\d+)?)?$")
+def parse_interfaces(output):
+    """'show interfaces [X]' -> [Interface], one per interface block"""
+    headers = list(INTERFACE_HEADER.finditer(output))
+    interfaces = []
+    for i, header in enumerate(headers):
+        block = output[header.end():headers[i + 1].start() if i + 1 < len(headers) else len(output)]
+        admin = "down" if header.group(2) == "administratively down" else "up"
+        duplex = DUPLEX_SPEED.search(block)
+        errors = INPUT_ERRORS.search(block)
+        interfaces.append(Interface(
+            header.group(1),
+            admin,
+            header.group(3),
+            _search(DESCRIPTION, block, default=""),
+            duplex.group(1) if duplex else None,
+            duplex.group(2) if duplex else None,
+            duplex.group(3) if duplex else None,
+            int(errors.group(1)) if errors else 0,
+            int(errors.group(2)) if errors else 0,
+            int(_search(OUTPUT_ERRORS, block, default=0)),
+            int(_search(RESETS, block, default=0)),
+        ))
+    return interfaces
+
+
+KEY_VALUE = re.compile(r"^[ \t]*([^:\r\n]+?)[ \t]*:[ \t]*([^\r\n]*?)[ \t]*\r?$", re.MULTILINE)
+
+
+@register(r"sh(ow)? vtp status\b")
+def parse_vtp_status(output):
+    """'show vtp status' -> VtpStatus, or None"""
+    fields = {key.lower(): value for key, value in KEY_VALUE.findall(output)}
+    if not any(key.startswith("vtp") for key in fields):
+        return None
+    revision = fields.get("configuration revision", "")
+    vlans = fields.get("number of existing vlans", "")
+    return VtpStatus(
+        fields.get("vtp version running") or fields.get("vtp version"),
+        fields.get("vtp domain name") or None,
+        (fields.get("vtp operating mode") or "").lower() or None,
+        (fields.get("vtp pruning mode") or "").lower() == "enabled",
+        int(revision) if revision.isdigit() else None,
+        int(vlans) if vlans.isdigit() else None,
+    )
+
+
+# *10:15:30.123 AST Mon Jan 5 2026   ('*' = not authoritative, '.' = not synced)
+CLOCK = re.compile(
+    r"^\s*([*.]?)(\d{1,2}:\d{2}:\d{2}(?:\.\d+)?)\s+(\S+)\s+(\w{3})\s+(\w{3})\s+(\d{1,2})\s+(\d{4})",
+    re.MULTILINE,
+)
+
+
+@register(r"sh(ow)? clock\b")
+def parse_clock(output):
+    """'show clock' -> Clock, or None"""
+    match = CLOCK.search(output)
+    if not match:
+        return None
+    flag, clock_time, zone, weekday, month, day, year = match.groups()
+    return Clock(clock_time, zone, weekday, month, int(day), int(year), flag == "")
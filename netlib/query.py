@@ -0,0 +1,156 @@
+"""
+Show queries with their filter pushed down to the device when it is safe.
+
+Most scripts pulled a whole 'show interfaces status' and kept a handful of
+rows in Python; on a 4000-port stack that is hundreds of KB over the hop
+and through the parser for two lines. query() takes the command plus the
+filters the caller wants and sends the first one as '| include',
+'| exclude', '| begin' or '| section' when the device can evaluate it the
+same way Python would. The remaining filters, and everything else, run
+locally on the same lines:
+
+    rows = select(shell, "show interfaces status", include("connected"))
+    text = query(shell, "show running-config", section("^interface Port-channel"))
+
+A pattern is only pushed down if it uses the regex subset IOS and Python
+agree on (no backslash escapes, no '_'). Output already in the session's
+show cache is filtered locally instead of asking again. When the device
+rejects a filter (old images without '| section'), the full output is
+filtered locally and that filter is not pushed to that host again.
+"""
+import re
+import threading
+from collections import namedtuple
+
+from netlib.expect import find_errors
+from netlib.parsers import parse
+from netlib.transport import send_command
+
+Filter = namedtuple("Filter", "kind pattern")
+
+# Characters whose regex meaning is the same for IOS and Python ('_' is a delimiter in IOS)
+PUSHABLE = re.compile(r"^[A-Za-z0-9./:\-\[\]|*+?^$()][A-Za-z0-9 ./:\-\[\]|*+?^$()]*(?<! )$")
+KINDS = ("include", "exclude", "begin", "section")
+
+# (host, kind) the device refused as a filter
+_unsupported = set()
+_unsupported_lock = threading.Lock()
+
+
+def include(pattern):
+    """Lines matching pattern"""
+    return Filter("include", pattern)
+
+
+def exclude(pattern):
+    """Lines not matching pattern"""
+    return Filter("exclude", pattern)
+
+
+def begin(pattern):
+    """Everything from the first line matching pattern on"""
+    return Filter("begin", pattern)
+
+
+def section(pattern):
+    """Whole sections (a top-level line and its indented lines) with a line matching pattern"""
+    return Filter("section", pattern)
+
+
+def pushable(flt, host=None):
+    """True if the device can apply flt exactly as filter_lines() would"""
+    with _unsupported_lock:
+        if (host, flt.kind) in _unsupported:
+            return False
+    return flt.kind in KINDS and bool(PUSHABLE.match(flt.pattern))
+
+
+def pushdown(command, filters, host=None):
+    """(command to send, filters left to apply locally); only the first filter can go to the device"""
+    filters = list(filters)
+    if filters and pushable(filters[0], host):
+        return f"{command} | {filters[0].kind} {filters[0].pattern}", filters[1:]
+    return command, filters
+
+
+def filter_lines(output, filters):
+    """Apply filters to output locally, in order, like the IOS pipe would"""
+    lines = output.splitlines()
+    for flt in filters:
+        pattern = re.compile(flt.pattern)
+        if flt.kind == "include":
+            lines = [line for line in lines if pattern.search(line)]
+        elif flt.kind == "exclude":
+            lines = [line for line in lines if not pattern.search(line)]
+        elif flt.kind == "begin":
+            start = next((i for i, line in enumerate(lines) if pattern.search(line)), len(lines))
+            lines = lines[start:]
+        elif flt.kind == "section":
+            kept, block = [], []
+            for line in lines + [""]:
+                if not line[:1].isspace() and block:
+                    if any(pattern.search(b) for b in block):
+                        kept += block
+                    block = []
+                if line:
+                    block.append(line)
+            lines = kept
+        else:
+            raise ValueError(f"unknown filter '{flt.kind}'")
+    return "\n".join(lines)
+
+
+def body(output, sent, prompt):
+    """Output without the echoed command line and the trailing prompt"""
+    lines = output.strip("\r\n").splitlines()
+    if lines and lines[0].strip() == sent.strip():
+        lines = lines[1:]
+    if lines and prompt and lines[-1].strip() == prompt:
+        lines = lines[:-1]
+    return "\n".join(lines)
+
+
+def is_netlib_shell(shell):
+    """True for a netlib Shell or broker-backed BrokerShell (both read with expect()), False for netmiko"""
+    return hasattr(shell, "expect") and hasattr(shell, "show_cache")
+
+
+def command_sender(shell, send=None, timeout=None):
+    """send if given, else a function sending one command on a netlib Shell or netmiko connection"""
+    if send is not None:
+        return send
+    if is_netlib_shell(shell):
+        return lambda text: send_command(shell, text, timeout)
+    return shell.send_command
+
+
+def query(shell, command, *filters, send=None, timeout=None):
+    """
+    Output of command narrowed by filters, echo and prompt removed.
+
+    shell is a netlib Shell or BrokerShell; for anything else (a netmiko connection) pass
+    send, a function that takes the command text and returns its output.
+    """
+    host = getattr(shell, "host", None)
+    prompt = getattr(shell, "prompt", None)
+    send = command_sender(shell, send, timeout)
+
+    cached = shell.show_cache.get(host, command) if is_netlib_shell(shell) else None
+    if cached is not None:
+        return filter_lines(body(cached, command, prompt), filters)
+
+    sent, local = pushdown(command, filters, host)
+    output = send(sent)
+    if sent != command and find_errors(output):
+        kind = filters[0].kind
+        print(f"\n[QUERY] {host}: '| {kind}' refused, filtering '{command}' locally")
+        with _unsupported_lock:
+            _unsupported.add((host, kind))
+        sent, local = command, list(filters)
+        output = send(sent)
+    return filter_lines(body(output, sent, getattr(shell, "prompt", prompt)), local)
+
+
+def select(shell, command, *filters, send=None, timeout=None):
+    """Parsed records (netlib.parsers) of the lines of command that pass filters"""
+    return parse(command, query(shell, command, *filters, send=send, timeout=timeout))
@@ -0,0 +1,144 @@
+"""
+One reader thread for every open channel instead of one blocked recv() each.
+
+Reactor waits on all registered paramiko channels at once with selectors
+(epoll on Linux) and appends whatever arrives to that channel's buffer.
+register() hands back a MuxChannel with the same send/recv/settimeout
+surface as a paramiko Channel, so Shell and expect() use it unchanged: a
+recv() on it just waits for the reactor to fill its buffer.
+
+Because the reads happen in the background, one thread can drive many
+sessions: send to all of them, then expect_all() them in turn. The total
+wait is the slowest device, not the sum:
+
+    with Reactor() as reactor, JumpHost(..., reactor=reactor) as core:
+        for shell in shells:
+            shell.send("show version\\n")
+        results = expect_all(shells)
+"""
+import selectors
+import socket
+import threading
+import time
+
+from netlib.expect import COMMAND_TIMEOUT, RECV_SIZE
+
+
+class MuxChannel:
+    """Channel registered with a Reactor; recv() reads from its buffer"""
+
+    def __init__(self, reactor, channel):
+        self._reactor = reactor
+        self.channel = channel
+        self.buffer = bytearray()
+        self.eof = False
+        self.timeout = None
+
+    @property
+    def closed(self):
+        return self.channel.closed
+
+    def send(self, data):
+        return self.channel.send(data)
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def recv(self, size=RECV_SIZE):
+        """Buffered bytes, waiting up to the timeout; b'' once the far end closed"""
+        with self._reactor.ready:
+            if not self._reactor.ready.wait_for(lambda: self.buffer or self.eof, self.timeout):
+                raise socket.timeout()
+            data = bytes(self.buffer[:size])
+            del self.buffer[:size]
+            return data
+
+    def close(self):
+        self._reactor.unregister(self)
+        self.channel.close()
+
+
+class Reactor:
+    """Selector loop that reads every registered channel from one thread"""
+
+    def __init__(self):
+        self.ready = threading.Condition()
+        self._selector = selectors.DefaultSelector()
+        # Writing to this wakes select() so (un)registrations apply at once
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="netlib-reactor", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+
+    def register(self, channel):
+        """Start reading channel in the background; returns its MuxChannel"""
+        mux = MuxChannel(self, channel)
+        self._selector.register(channel, selectors.EVENT_READ, mux)
+        self._wake()
+        return mux
+
+    def unregister(self, mux):
+        try:
+            self._selector.unregister(mux.channel)
+        except (KeyError, ValueError):
+            pass
+        self._wake()
+
+    def _loop(self):
+        while self._running:
+            for key, _ in self._selector.select(timeout=1):
+                if key.data is None:
+                    try:
+                        self._wake_r.recv(RECV_SIZE)
+                    except OSError:
+                        pass
+                    continue
+                self._read(key.data)
+
+    def _read(self, mux):
+        try:
+            data = mux.channel.recv(RECV_SIZE)
+        except (OSError, EOFError):
+            data = b""
+        with self.ready:
+            if data:
+                mux.buffer += data
+            else:
+                mux.eof = True
+            self.ready.notify_all()
+        if not data:
+            self.unregister(mux)
+
+    def close(self):
+        """Stop the reader thread; registered channels are left open"""
+        self._running = False
+        self._wake()
+        self._thread.join()
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+
+def expect_all(shells, prompts=None, timeout=COMMAND_TIMEOUT):
+    """
+    Wait for every shell's prompt under one shared deadline.
+
+    Meant for shells on a Reactor, which keeps reading all of them while we
+    wait on one. Returns the ExpectResults in the same order as shells.
+    """
+    deadline = time.monotonic() + timeout
+    return [shell.expect(prompts, max(deadline - time.monotonic(), 0.001)) for shell in shells]
@@ -0,0 +1,142 @@
+"""
+Desired-state reconciliation for port-channels.
+
+port_channel6.py used to check a list of expected lines and, if any was
+missing, re-send the whole block for that interface. PortChannelIntent
+describes the wanted state once (group, members, VLANs, STP link type,
+descriptions); plan() diffs it against the running config and returns only
+the lines that are missing or carry the wrong value, per interface.
+reconcile() pushes all of them in one config block, and nothing at all
+when the switch already complies. Lines the switch rejects come back with
+the deltas, so a rejected line never counts as reconciled.
+
+Only the settings in the intent are managed. Other lines on the interfaces
+are left alone, and nothing is removed except by overwriting a
+single-valued setting (description, allowed VLANs, link type ...).
+"""
+import re
+from collections import namedtuple
+
+from netlib.batch import push_config
+from netlib.runconfig import running_config
+
+# Lines to send under one interface to bring it to the intent
+Delta = namedtuple("Delta", "interface lines")
+# deltas that were sent; errors: [(line, error), ...] the switch rejected (see netlib.batch)
+ReconcileResult = namedtuple("ReconcileResult", "deltas errors")
+
+# A trunk without an allowed-vlan line, or with 'allowed vlan all', carries every VLAN
+ALL_VLANS = frozenset(range(1, 4095))
+ALLOWED_VLAN = re.compile(r"switchport trunk allowed vlan (?:(add|remove|except) )?(all|none|[\d,\- ]+)$")
+
+
+def expand_vlans(text):
+    """'1-3,10' -> {1, 2, 3, 10}"""
+    vlans = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        vlans.update(range(int(low), int(high or low) + 1))
+    return vlans
+
+
+def allowed_vlans(lines):
+    """VLANs a trunk allows after its 'switchport trunk allowed vlan [add|remove|except] ...' lines"""
+    vlans = set(ALL_VLANS)
+    for line in lines:
+        match = ALLOWED_VLAN.match(line)
+        if not match:
+            continue
+        action, listed = match.groups()
+        listed = set(ALL_VLANS) if listed == "all" else set() if listed == "none" else expand_vlans(listed)
+        if action == "add":
+            vlans |= listed
+        elif action == "remove":
+            vlans -= listed
+        elif action == "except":
+            vlans = ALL_VLANS - listed
+        else:
+            vlans = listed
+    return vlans
+
+
+def satisfied(wanted, existing):
+    """True if the wanted line already holds among the interface's existing lines"""
+    if wanted.startswith("switchport trunk allowed vlan "):
+        return allowed_vlans(existing) == allowed_vlans([wanted])
+    if wanted.startswith("no "):
+        # 'no shutdown' never shows up in the running config; 'shutdown' does
+        return wanted[3:] not in existing
+    return wanted in existing
+
+
+class PortChannelIntent:
+    """Wanted state of one port-channel and its member interfaces"""
+
+    def __init__(self, po_group, members, vlans, link_type="point-to-point", mode="active",
+                 description="CONFIGURED-BY-SCRIPT", member_description=None):
+        self.po_group = po_group
+        self.members = list(members)
+        self.vlans = vlans
+        self.link_type = link_type
+        self.mode = mode
+        self.description = description
+        self.member_description = member_description
+
+    def port_channel_lines(self):
+        lines = [f"description {self.description}"] if self.description else []
+        return lines + [
+            f"switchport trunk allowed vlan {self.vlans}",
+            "switchport mode trunk",
+            f"spanning-tree link-type {self.link_type}",
+            "no shutdown",
+        ]
+
+    def member_lines(self):
+        lines = [f"description {self.member_description}"] if self.member_description else []
+        return lines + [
+            f"switchport trunk allowed vlan {self.vlans}",
+            "switchport mode trunk",
+            f"channel-group {self.po_group} mode {self.mode}",
+            f"spanning-tree link-type {self.link_type}",
+            "no shutdown",
+        ]
+
+    def interfaces(self):
+        """(interface, wanted lines) for the port-channel first, then each member"""
+        yield f"Port-channel{self.po_group}", self.port_channel_lines()
+        for member in self.members:
+            yield member, self.member_lines()
+
+
+def plan(config, intent):
+    """Deltas that would bring config (a RunningConfig) to intent; [] if it complies"""
+    deltas = []
+    for interface, wanted in intent.interfaces():
+        existing = config.interface(interface).splitlines()[1:-1]
+        existing = [line.strip() for line in existing]
+        missing = [line for line in wanted if not satisfied(line, existing)]
+        if missing:
+            deltas.append(Delta(interface, missing))
+    return deltas
+
+
+def reconcile(shell, intent, config=None):
+    """
+    Push only what differs from intent, in one config block.
+
+    config defaults to the switch's (cached) running config. Returns
+    ReconcileResult(deltas sent, errors); no deltas means the switch
+    already complied and no config command was sent.
+    """
+    deltas = plan(config or running_config(shell), intent)
+    if not deltas:
+        print(f"\n[OK] {shell.host}: Port-channel{intent.po_group} already matches, nothing to send")
+        return ReconcileResult([], [])
+
+    block = []
+    for delta in deltas:
+        print(f"\n[ACTION] {shell.host}: {delta.interface} needs: {delta.lines}")
+        block += [f"interface {delta.interface}"] + delta.lines + ["exit"]
+    return ReconcileResult(deltas, push_config(shell, block).errors)
@@ -0,0 +1,131 @@
+"""
+One 'show running-config' per switch, indexed for local lookups.
+
+port_channel6 sent one 'show running-config interface X' per interface and
+the other scripts one 'show running-config | include ...' per check.
+running_config(shell) pulls the whole config once and RunningConfig
+answers the same questions locally:
+
+    config = running_config(shell)
+    config.interface("Gi1/0/1")          # same text as 'show run interface Gi1/0/1'
+    config.include("ip domain name")     # same lines as '| include ip domain name'
+    config.banner("motd")
+
+The pull goes through send_command(), so the session's show cache serves
+repeat calls until a config change on that switch drops it.
+"""
+import re
+from functools import lru_cache
+
+from netlib.showcache import interfaces_in
+from netlib.transport import send_command
+
+RUNNING_CONFIG_COMMAND = "show running-config"
+
+# Lines IOS prints around the config itself
+PREAMBLE = re.compile(r"^(Building configuration\.\.\.|Current configuration\s*:.*)$")
+
+
+class RunningConfig:
+    """Running config split into global lines, sections, interfaces and banners"""
+
+    def __init__(self, text):
+        self.lines = []
+        # top-level line -> its indented child lines
+        self.sections = {}
+        # 'gi1/0/1' -> 'interface GigabitEthernet1/0/1'
+        self.interfaces = {}
+        # 'motd' -> banner text
+        self.banners = {}
+        # top-level lines that do not open a section
+        self.global_lines = []
+        self._parse(text)
+
+    def _parse(self, text):
+        header = None
+        banner = None
+        for line in text.splitlines():
+            line = line.rstrip()
+            if banner is not None:
+                kind, delimiter, body = banner
+                self.lines.append(line)
+                if delimiter in line:
+                    body.append(line.split(delimiter, 1)[0])
+                    self.banners[kind] = "\n".join(body).strip("\n")
+                    banner = None
+                else:
+                    body.append(line)
+                continue
+            if not line or PREAMBLE.match(line):
+                continue
+            if line == "end":
+                break
+            self.lines.append(line)
+
+            if line.startswith("banner "):
+                banner = self._open_banner(line)
+                header = None
+            elif line.startswith((" ", "\t")):
+                if header is not None:
+                    self.sections[header].append(line.strip())
+            elif line == "!":
+                header = None
+            else:
+                header = line
+                self.sections.setdefault(header, [])
+                if line.startswith("interface "):
+                    for name in interfaces_in(line):
+                        self.interfaces[name] = header
+
+        self.global_lines = [line for line, children in self.sections.items() if not children]
+
+    def _open_banner(self, line):
+        """Start of 'banner motd ^C...'; returns (kind, delimiter, body) or None if one line"""
+        match = re.match(r"banner (\S+) (\^C|\S)(.*)$", line)
+        if not match:
+            return None
+        kind, delimiter, rest = match.groups()
+        if delimiter in rest:
+            self.banners[kind] = rest.split(delimiter, 1)[0]
+            return None
+        return kind, delimiter, [rest] if rest else []
+
+    def section(self, header):
+        """Child lines of a top-level line ('line vty 0 4', 'router ospf 1' ...), or []"""
+        return self.sections.get(header, [])
+
+    def interface(self, name):
+        """'interface X' plus its lines as IOS prints them, or '' if X is not configured"""
+        names = interfaces_in(name) or interfaces_in(f"interface {name}")
+        header = next((self.interfaces[n] for n in names if n in self.interfaces), None)
+        if header is None:
+            return ""
+        return "\n".join([header] + [f" {line}" for line in self.sections[header]] + ["end"])
+
+    def include(self, pattern):
+        """Lines matching pattern (a regex, like IOS '| include'), joined as one string"""
+        regex = re.compile(pattern)
+        return "\n".join(line for line in self.lines if regex.search(line))
+
+    def has(self, line):
+        """True if line appears anywhere, ignoring indentation"""
+        line = line.strip()
+        return any(existing.strip() == line for existing in self.lines)
+
+    def banner(self, kind="motd"):
+        return self.banners.get(kind, "")
+
+
+@lru_cache(maxsize=16)
+def parse(text):
+    """RunningConfig for text; the same output string is only parsed once"""
+    return RunningConfig(text)
+
+
+def running_config(shell):
+    """Running config of the switch shell is on (from the show cache if still valid)"""
+    output = send_command(shell, RUNNING_CONFIG_COMMAND)
+    # Drop our own echoed command; the prompt comes after 'end' and is skipped
+    if output.lstrip().startswith(RUNNING_CONFIG_COMMAND):
+        output = output.lstrip().split("\n", 1)[-1]
+    return parse(output)
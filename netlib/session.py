@@ -0,0 +1,183 @@
+"""
+Several hop channels over one authenticated SSH transport to the core.
+
+The jump-host scripts used to open one SSHClient and one invoke_shell()
+and type 'ssh -l cisco <ip>' into it, so every access switch waited behind
+that single channel. JumpHost logs in to the core once and opens up to
+max_channels shell channels on the same Transport, each of which can hop to
+a different access switch. Channels are prepared once (terminal length 0,
+optional enable) and handed back to an idle pool after each hop, so the
+next switch skips the core login entirely.
+"""
+import threading
+from contextlib import contextmanager
+
+import paramiko
+
+from netlib.transport import (
+    CONNECT_TIMEOUT,
+    HOP_TIMEOUT,
+    SSH_PORT,
+    Shell,
+    enable,
+    exit_hop,
+    hop,
+    send_command,
+)
+from netlib.hostmap import resolve
+from netlib.transcript import ReplayChannel, ssh_client
+
+# Stay below the free VTY lines on the core ('line vty 0 4' = 5)
+MAX_CHANNELS = 4
+
+
+class JumpHost:
+    """Authenticated core session that hands out shell channels for hops"""
+
+    def __init__(self, host, username, password, max_channels=MAX_CHANNELS,
+                 enable_password=None, port=SSH_PORT, timeout=CONNECT_TIMEOUT, echo=True,
+                 keepalive=0, reactor=None):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.max_channels = max_channels
+        self.enable_password = enable_password
+        self.port = port
+        self.timeout = timeout
+        self.echo = echo
+        # Seconds between SSH keepalives on the core login (0 = off)
+        self.keepalive = keepalive
+        # netlib.reactor.Reactor that reads every channel from one thread (None = each reads its own)
+        self.reactor = reactor
+
+        self._clients = []
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_channels)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _login(self):
+        client = ssh_client(self.host)
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        address, port = resolve(self.host, self.port)
+        client.connect(address, port=port, username=self.username,
+                       password=self.password, timeout=self.timeout)
+        if self.keepalive:
+            client.get_transport().set_keepalive(self.keepalive)
+        self._clients.append(client)
+        return client
+
+    def open(self):
+        """Log in to the core once; channels are opened on demand"""
+        with self._lock:
+            if not self._clients:
+                self._login()
+        return self
+
+    def _open_channel(self):
+        """New shell channel on the shared transport, prepared for hopping"""
+        with self._lock:
+            try:
+                channel = self._clients[0].get_transport().open_session(timeout=self.timeout)
+            except paramiko.SSHException as e:
+                # Some IOS images allow one shell per connection; log in again
+                print(f"\n[WARNING] {self.host}: extra channel refused ({e}), opening another login")
+                channel = self._login().get_transport().open_session(timeout=self.timeout)
+        channel.get_pty()
+        channel.invoke_shell()
+        # Replayed channels answer from memory; there is no socket to select on
+        if self.reactor is not None and not isinstance(channel, ReplayChannel):
+            channel = self.reactor.register(channel)
+
+        shell = Shell(channel, host=self.host, echo=self.echo)
+        shell.expect()
+        if self.enable_password is not None:
+            enable(shell, self.enable_password)
+        send_command(shell, "terminal length 0")
+        return shell
+
+    def acquire(self, blocking=True, timeout=None):
+        """
+        Borrow a channel sitting at the core prompt.
+
+        Blocks while all max_channels are busy; returns None if blocking=False
+        or timeout runs out before one frees up.
+        """
+        if not self._slots.acquire(blocking, timeout):
+            return None
+        try:
+            with self._lock:
+                shell = self._idle.pop() if self._idle else None
+            return shell or self._open_channel()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, shell, reuse=True):
+        """Give a channel back to the pool, or close it if its state is unknown"""
+        try:
+            if reuse and not shell.hops and not shell.channel.closed:
+                with self._lock:
+                    self._idle.append(shell)
+            else:
+                shell.close()
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def shell(self):
+        """Channel at the core's own prompt, for configuring the core itself"""
+        shell = self.acquire()
+        reuse = True
+        try:
+            yield shell
+        except Exception:
+            reuse = False
+            raise
+        finally:
+            self.release(shell, reuse)
+
+    @contextmanager
+    def hop(self, host, username=None, password=None, timeout=HOP_TIMEOUT):
+        """
+        Shell hopped from the core to host on its own channel.
+
+        username/password default to the core login; username="" hops with
+        plain 'ssh <ip>'. Raises ConnectionError if the hop fails; the
+        channel goes back to the pool either way.
+        """
+        username = self.username if username is None else username
+        password = self.password if password is None else password
+
+        shell = self.acquire()
+        reuse = True
+        try:
+            if not hop(shell, host, username, password, timeout):
+                raise ConnectionError(f"could not hop to {host}")
+            try:
+                yield shell
+            except Exception:
+                # Could be mid-config on the access switch; do not reuse
+                reuse = False
+                raise
+            finally:
+                if reuse:
+                    exit_hop(shell)
+        finally:
+            self.release(shell, reuse)
+
+    def close(self):
+        """Close every channel and the core login"""
+        with self._lock:
+            for shell in self._idle:
+                shell.close()
+            self._idle = []
+            for client in self._clients:
+                client.close()
+            self._clients = []
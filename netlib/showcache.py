@@ -0,0 +1,163 @@
+"""
+Per-session memo of show-command output.
+
+One switch visit in port_channel5.py asked for 'show interfaces status'
+four times. send_command() now keeps the output of read-only commands per
+(host, command) on the Shell and hands it back until something changes
+state on that host:
+
+- push_config() only drops what its block can have touched: entries that
+  name one of the configured interfaces (a channel-group also touches its
+  Port-channel) plus every device-wide show. IOS copies Port-channel config
+  to the member ports, and the members are not known here, so touching a
+  Port-channel also drops every physical port's entries. A block with
+  global lines drops everything for that host.
+- Any other non-show command sent with send_command() (a config line typed
+  one by one, 'test cable-diagnostics', 'clock set', ...) drops everything
+  for that host, except the few listed in HARMLESS.
+
+Volatile commands (clock, counters, logs, TDR results) are never cached.
+The cache lives on the Shell and is emptied on every hop, so it never
+outlives one visit to a switch.
+"""
+import re
+import threading
+
+# Read-only commands that may be answered from the cache
+CACHEABLE = ("show ", "sh ")
+
+# Output changes on its own between two identical commands
+VOLATILE = (
+    "show clock",
+    "show cable-diagnostics",
+    "show logging",
+    "show processes",
+    "show users",
+    "show ssh",
+    "show interfaces counters",
+    "show lacp counters",
+    "show mac address-table",
+)
+
+# Exec commands that leave running state alone ('write' only changes startup-config)
+HARMLESS = ("terminal ", "write", "wr", "copy running-config startup-config", "copy run start")
+
+# IOS interface types; any abbreviation of two letters or more names the same type
+INTERFACE_TYPES = (
+    "gigabitethernet", "tengigabitethernet", "fastethernet", "twogigabitethernet", "twentyfivegige",
+    "fortygigabitethernet", "hundredgige", "ethernet", "port-channel", "vlan", "loopback", "tunnel",
+)
+# Gi1/0/1, GigabitEthernet1/0/1, Port-channel11, po11, Vlan10 ... -> 'gi1/0/1', 'po11'; a space
+# before the number only after 'interface'/'int', so 'vlan 10' in 'show spanning-tree vlan 10' is not Vlan10
+INTERFACE = re.compile(
+    r"\b(int(?:erfaces?)?\s+)?([a-z][a-z\-]*)(\s?)(\d+(?:/\d+)*(?:\.\d+)?)\b",
+    re.IGNORECASE,
+)
+CHANNEL_GROUP = re.compile(r"^\s*channel-group\s+(\d+)", re.IGNORECASE)
+# Interface kinds that can be Port-channel members (keys as interfaces_in() returns them)
+PHYSICAL = ("gi", "te", "fa", "tw", "fo", "hu", "et")
+
+
+def normalize(command):
+    return " ".join(command.lower().split())
+
+
+def interfaces_in(text):
+    """Interfaces named in text, normalized so 'Gi1/0/1' == 'GigabitEthernet1/0/1'"""
+    names = set()
+    for keyword, kind, space, number in INTERFACE.findall(text):
+        kind = kind.lower()
+        if len(kind) < 2 or (space and not keyword) or not any(t.startswith(kind) for t in INTERFACE_TYPES):
+            continue
+        names.add(f"{kind[:2]}{number}")
+    return names
+
+
+def is_cacheable(command):
+    command = normalize(command)
+    return command.startswith(CACHEABLE) and not command.replace("sh ", "show ", 1).startswith(VOLATILE)
+
+
+def touched_interfaces(lines):
+    """
+    Interfaces a config block changes, or None if it also has global lines.
+
+    Lines between 'interface X' and the next 'exit'/'interface'/'end' belong
+    to X; 'interface range' is treated as global.
+    """
+    touched = set()
+    current = None
+    for line in lines:
+        line = normalize(line)
+        if line in ("", "exit", "end", "configure terminal"):
+            current = None
+        elif line.startswith("interface ") and not line.startswith("interface range"):
+            current = interfaces_in(line)
+            if not current:
+                return None
+            touched |= current
+        elif current:
+            group = CHANNEL_GROUP.match(line)
+            if group:
+                touched.add(f"po{group.group(1)}")
+        else:
+            return None
+    return touched
+
+
+class ShowCache:
+    """(host, command) -> output for one session"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, host, command):
+        if not is_cacheable(command):
+            return None
+        with self._lock:
+            return self._entries.get((host, normalize(command)))
+
+    def put(self, host, command, output):
+        if is_cacheable(command):
+            with self._lock:
+                self._entries[(host, normalize(command))] = output
+
+    def forget(self, host, interfaces=None):
+        """
+        Drop what a change on host may have made stale.
+
+        interfaces=None drops every entry of host; otherwise only entries
+        that name one of those interfaces or no interface at all, plus those
+        of every physical port if a Port-channel is among interfaces.
+        """
+        members = interfaces is not None and any(name.startswith("po") for name in interfaces)
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] != host:
+                    continue
+                named = interfaces_in(key[1])
+                if (interfaces is None or not named or named & interfaces
+                        or members and any(name.startswith(PHYSICAL) for name in named)):
+                    del self._entries[key]
+
+    def sent(self, host, command):
+        """Account for a command that went to the device"""
+        command = normalize(command)
+        if command.startswith(CACHEABLE):
+            return
+        if command.startswith(HARMLESS):
+            if command.startswith(("write", "wr", "copy")):
+                with self._lock:
+                    for key in [key for key in self._entries if key[0] == host and "startup" in key[1]]:
+                        del self._entries[key]
+            return
+        self.forget(host)
+
+    def configured(self, host, lines):
+        """Account for a config block pushed to host"""
+        self.forget(host, touched_interfaces(lines))
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
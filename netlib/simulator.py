@@ -0,0 +1,871 @@
+"""
+Local fake Cisco IOS fleet behind a paramiko SSH server.
+
+Load-testing the scripts used to need the real core and access switches.
+The simulator listens on localhost, logs in like IOS and emulates the CLI
+the scripts drive: prompts, enable, configure terminal and its sub-modes
+(including banner text), nested 'ssh -l user <ip>' from the core to any
+access switch, write memory, TDR tests, and the show commands they parse.
+Show output comes from netlib.synthetic, and each device keeps its own
+running config, so a pushed line shows up in the next 'show run' and
+'show etherchannel summary'. Every command can be given a latency.
+
+Access switches are created on the first hop to their IP, inside the
+same session. A few hundred of them cost no sockets and no threads
+beyond the channels actually open.
+
+    python3 -m netlib.simulator --latency show=0.05 --latency "write memory=1.5"
+    export NETLIB_SIMULATOR=~/.netlib-simulator.json
+    python3 port_channel6/port_channel6.py
+
+connect() and JumpHost read $NETLIB_SIMULATOR and, for the hosts in it,
+connect to the simulator instead. The first listening host also answers
+for any host not in the map. The netmiko TDR scripts do not go through
+netlib's transport and still connect to the real hosts.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+
+import paramiko
+
+from netlib import synthetic
+from netlib.hostmap import SIMULATOR_ENV
+from netlib.showcache import interfaces_in
+
+DEFAULT_MAP = "~/.netlib-simulator.json"
+ADDRESS = "127.0.0.1"
+FIRST_PORT = 2222
+# Hosts the scripts log in to first (their jump hosts / cores)
+ENTRY_HOSTS = ("192.168.100.111", "192.168.100.110", "10.10.40.254")
+USERNAME = "cisco"
+PASSWORD = "Cisco1234"
+# Ports per simulated switch (48 copper + 4 uplinks)
+PORTS = 52
+# Seconds before a started TDR test has results
+TDR_SECONDS = 3.0
+
+# Seconds per command, longest matching prefix wins ("" = everything else)
+LATENCY = {
+    "": 0.01,
+    "ssh": 0.3,
+    "show running-config": 0.1,
+    "write": 1.0,
+    "wr": 1.0,
+    "copy": 1.0,
+}
+
+INVALID = "        ^\n% Invalid input detected at '^' marker."
+
+LONG_NAMES = {
+    "gi": "GigabitEthernet",
+    "te": "TenGigabitEthernet",
+    "fa": "FastEthernet",
+    "tw": "TwoGigabitEthernet",
+    "fo": "FortyGigabitEthernet",
+    "hu": "HundredGigabitEthernet",
+    "po": "Port-channel",
+    "vl": "Vlan",
+    "lo": "Loopback",
+    "tu": "Tunnel",
+}
+
+# Lines that replace an existing line with the same start instead of adding one
+INTERFACE_SETTINGS = (
+    "description", "switchport mode", "switchport access vlan", "switchport trunk allowed vlan",
+    "switchport trunk native vlan", "channel-group", "spanning-tree link-type", "speed", "duplex",
+    "ip address",
+)
+GLOBAL_SETTINGS = (
+    "hostname", "clock timezone", "vtp mode", "vtp domain", "vtp version", "vtp password",
+    "ip domain name", "ip domain-name", "enable secret",
+)
+# Top-level lines that open a sub-mode, and the mode they open
+SUB_MODES = (("line ", "config-line"), ("router ", "config-router"), ("vlan ", "config-vlan"))
+CHANNEL_GROUP = re.compile(r"^channel-group (\d+) mode (\S+)")
+
+
+def short_name(key):
+    """'gi1/0/12' -> 'Gi1/0/12'"""
+    return key[:2].capitalize() + key[2:]
+
+
+def interface_keys(text):
+    """Normalized names in 'Gi1/1/1 - 2, Te1/1/4' (ranges expanded)"""
+    keys = []
+    for part in text.split(","):
+        match = re.match(r"^\s*([A-Za-z\-]+)\s?((?:\d+/)*)(\d+)(?:\s*-\s*(\d+))?\s*$", part)
+        if not match:
+            keys += sorted(interfaces_in(part))
+            continue
+        kind, prefix, first, last = match.groups()
+        kind = kind[:2].lower()
+        keys += [f"{kind}{prefix}{n}" for n in range(int(first), int(last or first) + 1)]
+    return keys
+
+
+def apply_filter(text, pipe):
+    """IOS output modifiers: include, exclude, begin, section"""
+    match = re.match(r"(inc\w*|exc\w*|beg\w*|sec\w*)\s+(.*)$", pipe.strip())
+    if not match:
+        return text
+    kind, pattern = match.group(1)[:3], match.group(2)
+    try:
+        regex = re.compile(pattern)
+    except re.error:
+        regex = re.compile(re.escape(pattern))
+    lines = text.split("\n")
+    if kind == "inc":
+        return "\n".join(line for line in lines if regex.search(line))
+    if kind == "exc":
+        return "\n".join(line for line in lines if not regex.search(line))
+    if kind == "beg":
+        start = next((i for i, line in enumerate(lines) if regex.search(line)), len(lines))
+        return "\n".join(lines[start:])
+    # section: top-level lines that match, or whose children match, with their children
+    out, block = [], []
+    for line in lines + [""]:
+        if line[:1] not in (" ", "\t") and block:
+            if any(regex.search(b) for b in block):
+                out += block
+            block = []
+        if line:
+            block.append(line)
+    return "\n".join(out)
+
+
+class Config:
+    """Running config of one simulated switch: top-level lines with their children"""
+
+    def __init__(self, text):
+        # top-level line -> child lines (global settings have none)
+        self.sections = {}
+        # 'gi1/0/1' -> 'interface GigabitEthernet1/0/1'
+        self.interfaces = {}
+        self.banners = {}
+        header = banner = None
+        for line in text.splitlines():
+            line = line.rstrip()
+            if banner is not None:
+                kind, delimiter, body = banner
+                if delimiter in line:
+                    body.append(line.split(delimiter, 1)[0])
+                    self.banners[kind] = "\n".join(body).strip("\n")
+                    banner = None
+                else:
+                    body.append(line)
+                continue
+            if not line or line == "!" or line.startswith(("Building configuration", "Current configuration")):
+                continue
+            if line == "end":
+                break
+            if line.startswith("banner "):
+                match = re.match(r"banner (\S+) (\^C|\S)(.*)$", line)
+                if match:
+                    banner = (match.group(1), match.group(2), [match.group(3)] if match.group(3) else [])
+            elif line.startswith((" ", "\t")):
+                if header is not None:
+                    self.sections[header].append(line.strip())
+            else:
+                header = line
+                self.add(header)
+
+    def add(self, header):
+        self.sections.setdefault(header, [])
+        if header.startswith("interface "):
+            for key in interfaces_in(header):
+                self.interfaces[key] = header
+        return header
+
+    def interface(self, key):
+        """Header for a normalized interface name, created like IOS does on first use"""
+        if key not in self.interfaces:
+            kind = re.match(r"[a-z]+", key).group(0)
+            self.add(f"interface {LONG_NAMES.get(kind, kind.capitalize())}{key[len(kind):]}")
+        return self.interfaces[key]
+
+    def set_global(self, line):
+        if line.startswith("no "):
+            body = line[3:]
+            for header in [h for h in self.sections if h == body or h.startswith(body + " ")]:
+                del self.sections[header]
+                for key in [k for k, h in self.interfaces.items() if h == header]:
+                    del self.interfaces[key]
+            if body.startswith("banner "):
+                self.banners.pop(body.split()[1], None)
+            return
+        setting = next((s for s in GLOBAL_SETTINGS if line.startswith(s + " ")), None)
+        if setting:
+            for header in [h for h in self.sections if h.startswith(setting + " ")]:
+                del self.sections[header]
+        self.add(line)
+
+    def set_child(self, header, line):
+        children = self.sections.setdefault(header, [])
+        if line.startswith("no "):
+            body = line[3:]
+            children[:] = [c for c in children if c != body and not c.startswith(body + " ")]
+            return
+        if not line.startswith("switchport trunk allowed vlan add "):
+            setting = next((s for s in INTERFACE_SETTINGS if line.startswith(s + " ")), None)
+            if setting:
+                children[:] = [c for c in children
+                               if not c.startswith(setting + " ") or c.startswith(setting + " add ")]
+        if line not in children:
+            children.append(line)
+        group = CHANNEL_GROUP.match(line)
+        if group:
+            self.interface(f"po{group.group(1)}")
+
+    def value(self, setting, default=None):
+        """Value of a global 'setting value' line"""
+        header = next((h for h in self.sections if h.startswith(setting + " ")), None)
+        return header[len(setting) + 1:] if header else default
+
+    def section_text(self, header):
+        return "\n".join([header] + [f" {line}" for line in self.sections.get(header, [])])
+
+    def render(self):
+        body = []
+        for header in self.sections:
+            body.append(self.section_text(header))
+            body.append("!")
+        for kind, text in self.banners.items():
+            body += [f"banner {kind} ^C", text, "^C", "!"]
+        text = "\n".join(body)
+        return f"Building configuration...\n\nCurrent configuration : {len(text)} bytes\n!\n{text}\nend"
+
+    def channels(self):
+        """group -> (mode, [member keys])"""
+        groups = {}
+        for key, header in self.interfaces.items():
+            for line in self.sections.get(header, []):
+                match = CHANNEL_GROUP.match(line)
+                if match:
+                    groups.setdefault(int(match.group(1)), [match.group(2), []])[1].append(key)
+        return groups
+
+
+class Device:
+    """One simulated switch: config, link state from netlib.synthetic, TDR tests"""
+
+    def __init__(self, host, ports=PORTS, enable_secret=None, tdr_seconds=TDR_SECONDS):
+        self.host = host
+        self.ports = ports
+        self.seed = zlib.crc32(host.encode())
+        self.enable_secret = enable_secret
+        self.tdr_seconds = tdr_seconds
+        self.lock = threading.RLock()
+        self.config = Config(self._canned("show running-config"))
+        self.config.set_global(f"hostname SW-{host.replace('.', '-')}")
+        # 'gi1/0/1' -> when its TDR test was started
+        self.tdr_started = {}
+        self.clock_set = False
+        self._outputs = {}
+
+    @property
+    def hostname(self):
+        return self.config.value("hostname", "Switch")
+
+    def _canned(self, command):
+        text = synthetic.generate(command, self.ports, self.seed)
+        return text.rsplit("\n", 1)[0] if text.endswith(f"{synthetic.HOSTNAME}#") else text
+
+    def canned(self, command):
+        if command not in self._outputs:
+            self._outputs[command] = self._canned(command)
+        return self._outputs[command]
+
+    def show(self, command):
+        """Output of a show command, with '| include' style filters applied"""
+        command, _, pipe = command.partition("|")
+        command = " ".join(command.split())
+        with self.lock:
+            for pattern, handler in SHOW_COMMANDS:
+                match = re.match(pattern, command, re.IGNORECASE)
+                if match:
+                    text = handler(self, *match.groups())
+                    break
+            else:
+                text = ""
+        return apply_filter(text, pipe) if pipe else text
+
+    def show_interfaces_status(self, name=None):
+        lines = [line for line in self.canned("show interfaces status").split("\n") if not line.startswith("Po")]
+        for group in sorted(self.config.channels()):
+            shutdown = "shutdown" in self.config.sections.get(self.config.interface(f"po{group}"), [])
+            status = "disabled" if shutdown else "connected"
+            lines.append(f"{f'Po{group}':<12} {'':<18} {status:<12} {'trunk':<10} {'a-full':>6} {'a-10G':>6} ")
+        if name:
+            keys = set(interface_keys(name))
+            lines = lines[:2] + [line for line in lines[2:] if interfaces_in(line.split(" ", 1)[0]) & keys]
+        return "\n".join(lines)
+
+    def show_etherchannel_summary(self):
+        groups = self.config.channels()
+        lines = self.canned("show etherchannel summary").split("\n")
+        lines = lines[:lines.index(next(line for line in lines if line.startswith("Number of")))]
+        lines += [
+            f"Number of channel-groups in use: {len(groups)}",
+            f"Number of aggregators:           {len(groups)}",
+            "",
+            "Group  Port-channel  Protocol    Ports",
+            "------+-------------+-----------+-----------------------------------------------",
+        ]
+        for group, (mode, members) in sorted(groups.items()):
+            po = self.config.sections.get(self.config.interface(f"po{group}"), [])
+            flags = "SD" if "shutdown" in po else "SU"
+            protocol = "LACP" if mode in ("active", "passive") else "PAgP" if mode in ("desirable", "auto") else "-"
+            tags = []
+            for key in sorted(members):
+                down = "shutdown" in self.config.sections.get(self.config.interfaces[key], [])
+                tags.append(f"{short_name(key)}({'D' if down or flags == 'SD' else 'P'})")
+            first = f"{group:<6} {f'Po{group}({flags})':<13} {protocol:<11} "
+            lines.append(first + "  ".join(tags[:3]))
+            for i in range(3, len(tags), 3):
+                lines.append(" " * len(first) + "  ".join(tags[i:i + 3]))
+        return "\n".join(lines)
+
+    def show_cable_diagnostics(self, name=None):
+        lines = self.canned("show cable-diagnostics tdr").split("\n")
+        if not name:
+            return "\n".join(lines)
+        key = (interface_keys(name) or [""])[0]
+        started = self.tdr_started.get(key)
+        if started is None:
+            return f"% TDR test was never issued on {short_name(key)}"
+        if time.monotonic() - started < self.tdr_seconds:
+            return f"TDR test is in progress on interface {short_name(key)}"
+        rows, found = [], False
+        for line in lines[4:]:
+            if line[:1] not in (" ", ""):
+                found = key in interfaces_in(line.split(" ", 1)[0])
+            if found:
+                rows.append(line)
+        if not rows and key.startswith(("gi", "fa")):
+            # Copper port with nothing plugged in: every pair open at the switch
+            rows = [f"{short_name(key) if pair == 'A' else '':<9} {'auto' if pair == 'A' else '':<5} "
+                    f"Pair {pair}     0    +/- 4  meters N/A         Open" for pair in "ABCD"]
+        if not rows:
+            return f"TDR test is not supported on this interface {short_name(key)}"
+        return "\n".join(lines[:4] + rows)
+
+    def show_interfaces(self, name=None):
+        text = self.canned("show interfaces")
+        if not name:
+            # IOS lists the Port-channels along with the physical ports
+            return "\n".join([text] + [self._port_channel_block(f"po{group}")
+                                       for group in sorted(self.config.channels())])
+        keys = set(interface_keys(name))
+        if any(key.startswith("po") for key in keys):
+            return "\n".join(self._port_channel_block(key) for key in keys)
+        blocks = re.split(r"\n(?=\S)", text)
+        found = [block for block in blocks if interfaces_in(block.split(" ", 1)[0]) & keys]
+        return "\n".join(found) or INVALID
+
+    def _port_channel_block(self, key):
+        group = int(key[2:])
+        mode, members = self.config.channels().get(group, (None, []))
+        header = self.config.interface(key)
+        description = next((c[12:] for c in self.config.sections[header] if c.startswith("description ")), "")
+        up = members and "shutdown" not in self.config.sections[header]
+        return "\n".join([
+            f"{header[10:]} is {'up' if up else 'down'}, line protocol is {'up (connected)' if up else 'down (notconnect)'}",
+            "  Hardware is EtherChannel, address is 00a3.d1ff.0000 (bia 00a3.d1ff.0000)",
+        ] + ([f"  Description: {description}"] if description else []) + [
+            "  MTU 1500 bytes, BW 20000000 Kbit/sec, DLY 10 usec,",
+            "  Full-duplex, 10Gb/s, link type is auto, media type is N/A",
+            f"  Members in this channel: {' '.join(short_name(m) for m in sorted(members))}",
+            "     0 input errors, 0 CRC, 0 frame, 0 overrun, 0 ignored",
+            "     0 output errors, 0 collisions, 0 interface resets",
+        ])
+
+    def show_running_config(self, name=None):
+        if not name:
+            return self.config.render()
+        keys = interface_keys(name)
+        if not keys or keys[0] not in self.config.interfaces:
+            return INVALID
+        text = self.config.section_text(self.config.interfaces[keys[0]])
+        return f"Building configuration...\n\nCurrent configuration : {len(text)} bytes\n!\n{text}\nend"
+
+    def show_vtp_status(self):
+        text = self.canned("show vtp status")
+        text = re.sub(r"(VTP Domain Name\s+: ).*", lambda m: m.group(1) + self.config.value("vtp domain", ""), text)
+        mode = self.config.value("vtp mode", "server")
+        text = re.sub(r"(VTP Operating Mode\s+: ).*", lambda m: m.group(1) + mode.capitalize(), text)
+        return re.sub(r"(VTP version running\s+: ).*",
+                      lambda m: m.group(1) + self.config.value("vtp version", "1"), text)
+
+    def show_clock(self):
+        zone, hours, minutes = "UTC", 0, 0
+        match = re.match(r"(\S+) (-?\d+)(?: (\d+))?", self.config.value("clock timezone", ""))
+        if match:
+            zone, hours, minutes = match.group(1), int(match.group(2)), int(match.group(3) or 0)
+        now = datetime.now(timezone.utc) + timedelta(hours=hours, minutes=minutes)
+        flag = "" if self.clock_set else "*"
+        return f"{flag}{now:%H:%M:%S}.{now.microsecond // 1000:03d} {zone} {now:%a %b} {now.day} {now.year}"
+
+    def show_banner(self, kind):
+        return self.config.banners.get(kind, "")
+
+    def show_version(self):
+        return self.canned("show version").replace(synthetic.HOSTNAME, self.hostname)
+
+
+# show command pattern -> Device method; unknown show commands print nothing
+SHOW_COMMANDS = (
+    (r"^sh(?:ow)? int(?:erfaces?)?(?: (\S+(?: ?- ?\d+)?))? status$", Device.show_interfaces_status),
+    (r"^sh(?:ow)? eth(?:erchannel)? summ(?:ary)?$", Device.show_etherchannel_summary),
+    (r"^sh(?:ow)? cable-diag(?:nostics)? tdr(?: int(?:erface)? (\S+))?$", Device.show_cable_diagnostics),
+    (r"^sh(?:ow)? int(?:erfaces?)?(?: ([A-Za-z][\w\-]*\s?\d+(?:/\d+)*(?:\.\d+)?))?$", Device.show_interfaces),
+    (r"^sh(?:ow)? run(?:ning-config)?(?: int(?:erface)? (.+))?$", Device.show_running_config),
+    (r"^sh(?:ow)? vtp status$", Device.show_vtp_status),
+    (r"^sh(?:ow)? clock$", Device.show_clock),
+    (r"^sh(?:ow)? banner (\S+)$", Device.show_banner),
+    (r"^sh(?:ow)? ver(?:sion)?$", Device.show_version),
+)
+
+
+class Fleet:
+    """Every simulated switch, created on first use, plus login and latency settings"""
+
+    def __init__(self, username=USERNAME, password=PASSWORD, ports=PORTS, latency=None, jitter=0.0,
+                 unreachable=(), enable_secret=None, tdr_seconds=TDR_SECONDS, reject=None):
+        self.username = username
+        self.password = password
+        self.ports = ports
+        self.latency = dict(LATENCY, **(latency or {}))
+        # +/- fraction of random spread on every latency
+        self.jitter = jitter
+        self.unreachable = set(unreachable)
+        self.enable_secret = enable_secret
+        self.tdr_seconds = tdr_seconds
+        # Config or exec lines matching this regex get '% Invalid input'
+        self.reject = re.compile(reject) if reject else None
+        self.devices = {}
+        self.commands = 0
+        self._lock = threading.Lock()
+
+    def device(self, host):
+        """Device for host, or None if it is unreachable"""
+        if host in self.unreachable:
+            return None
+        with self._lock:
+            if host not in self.devices:
+                self.devices[host] = Device(host, self.ports, self.enable_secret, self.tdr_seconds)
+            return self.devices[host]
+
+    def delay(self, command):
+        """Sleep for the latency configured for command"""
+        command = " ".join(command.lower().split())
+        key = max((k for k in self.latency if command.startswith(k)), key=len)
+        seconds = self.latency[key]
+        if self.jitter:
+            seconds *= 1 + random.uniform(-self.jitter, self.jitter)
+        with self._lock:
+            self.commands += 1
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class Frame:
+    """One device in a session's chain of ssh hops, and where its CLI is"""
+
+    def __init__(self, device, privileged):
+        self.device = device
+        self.privileged = privileged
+        # None = exec; 'config', 'config-if', 'config-if-range', 'config-line' ...
+        self.mode = None
+        # Sections that sub-mode lines go to
+        self.sections = []
+
+    def prompt(self):
+        if self.mode:
+            return f"{self.device.hostname}({self.mode})#"
+        return f"{self.device.hostname}{'#' if self.privileged else '>'}"
+
+
+class Session:
+    """IOS command line on one SSH channel"""
+
+    def __init__(self, fleet, channel, device):
+        self.fleet = fleet
+        self.channel = channel
+        self.frames = [Frame(device, privileged=not fleet.enable_secret)]
+        # Line handler waiting for a password / confirmation instead of a command
+        self.pending = None
+        # (device, kind, delimiter, lines) while reading banner text
+        self.banner = None
+        self.closed = False
+
+    @property
+    def frame(self):
+        return self.frames[-1]
+
+    def write(self, text):
+        try:
+            self.channel.sendall(text.replace("\n", "\r\n").replace("\r\r\n", "\r\n").encode())
+        except (OSError, EOFError, paramiko.SSHException):
+            self.closed = True
+
+    def reply(self, output):
+        self.write((f"{output}\n" if output else "") + self.frame.prompt())
+
+    def run(self):
+        self.write(f"\n{self.frame.prompt()}")
+        line = []
+        after_cr = False
+        try:
+            while not self.closed:
+                data = self.channel.recv(4096)
+                if not data:
+                    break
+                for char in data.decode("utf-8", errors="ignore"):
+                    if after_cr and char == "\n":
+                        after_cr = False
+                        continue
+                    after_cr = char == "\r"
+                    if char == "\x03":
+                        line = []
+                        self.interrupt()
+                    elif char in "\r\n":
+                        self.line("".join(line))
+                        line = []
+                        if self.closed:
+                            break
+                    else:
+                        line.append(char)
+        except (OSError, EOFError, paramiko.SSHException):
+            pass
+        finally:
+            self.channel.close()
+
+    def interrupt(self):
+        """Ctrl-C: abandon a password prompt or half-typed line"""
+        self.pending = None
+        self.write(f"\n{self.frame.prompt()}")
+
+    def line(self, text):
+        if self.pending:
+            handler, self.pending = self.pending, None
+            return handler(text)
+        if self.banner:
+            return self.banner_line(text)
+        self.write(f"{text}\n")
+        command = " ".join(text.split())
+        if command:
+            self.fleet.delay(command)
+        if self.fleet.reject and self.fleet.reject.search(command):
+            return self.reply(INVALID)
+        frame = self.frame
+        output = self.exec_command(frame, command) if frame.mode is None else self.config_command(frame, command)
+        if output is not None:
+            self.reply(output)
+
+    def exec_command(self, frame, command):
+        """Output of an exec command, or None when it already wrote what comes next"""
+        if not command:
+            return ""
+        word = command.split()[0].lower()
+        device = frame.device
+        if word in ("exit", "logout", "quit"):
+            return self.leave()
+        if word in ("show", "sh"):
+            return device.show(command)
+        if word == "ssh":
+            return self.ssh(command)
+        if word == "enable":
+            return self.enable(frame)
+        if word == "disable":
+            frame.privileged = False
+            return ""
+        if word == "terminal" or word == "ping":
+            return ""
+        if not frame.privileged:
+            return INVALID
+        if re.match(r"^conf(?:igure)?(?: t(?:erminal)?)?$", command, re.IGNORECASE):
+            frame.mode = "config"
+            return "Enter configuration commands, one per line.  End with CNTL/Z."
+        if word in ("write", "wr"):
+            return "Building configuration...\n[OK]"
+        if word == "copy":
+            self.write("Destination filename [startup-config]? ")
+            self.pending = lambda answer: self.reply("\nBuilding configuration...\n[OK]")
+            return None
+        if word == "clock":
+            device.clock_set = True
+            return ""
+        match = re.match(r"^test cable-diag(?:nostics)? tdr int(?:erface)? (\S+)$", command, re.IGNORECASE)
+        if match:
+            key = (interface_keys(match.group(1)) or [""])[0]
+            with device.lock:
+                device.tdr_started[key] = time.monotonic()
+            return (f"TDR test started on interface {short_name(key)}\n"
+                    "A TDR test can take a few seconds to run on an interface\n"
+                    "Use 'show cable-diagnostics tdr' to read the TDR results.")
+        return INVALID
+
+    def config_command(self, frame, command):
+        device = frame.device
+        config = device.config
+        lower = command.lower()
+        if not command:
+            return ""
+        if lower == "end" or command == "\x1a":
+            frame.mode, frame.sections = None, []
+            return ""
+        if lower == "exit":
+            frame.mode = None if frame.mode == "config" else "config"
+            frame.sections = []
+            return ""
+        if lower.startswith("do "):
+            return self.exec_command(frame, command[3:])
+        with device.lock:
+            if lower.startswith("banner "):
+                return self.open_banner(device, command)
+            if lower.startswith("interface range "):
+                frame.mode = "config-if-range"
+                frame.sections = [config.interface(key) for key in interface_keys(command[16:])]
+                return "" if frame.sections else INVALID
+            if lower.startswith("interface "):
+                keys = interface_keys(command[10:])
+                if not keys:
+                    return INVALID
+                frame.mode, frame.sections = "config-if", [config.interface(keys[0])]
+                return ""
+            for opener, mode in SUB_MODES:
+                if lower.startswith(opener):
+                    frame.mode, frame.sections = mode, [config.add(command)]
+                    return ""
+            if frame.mode == "config":
+                config.set_global(command)
+            else:
+                for header in frame.sections:
+                    config.set_child(header, command)
+        return ""
+
+    def open_banner(self, device, command):
+        match = re.match(r"banner (\S+) (\^C|\S)(.*)$", command)
+        if not match:
+            return INVALID
+        kind, delimiter, rest = match.groups()
+        if delimiter in rest:
+            device.config.banners[kind] = rest.split(delimiter, 1)[0]
+            return ""
+        self.write(f"Enter TEXT message.  End with the character '{delimiter}'.\n")
+        self.banner = (device, kind, delimiter, [rest] if rest else [])
+        return None
+
+    def banner_line(self, text):
+        device, kind, delimiter, lines = self.banner
+        self.write(f"{text}\n")
+        if delimiter not in text:
+            lines.append(text)
+            return
+        lines.append(text.split(delimiter, 1)[0])
+        with device.lock:
+            device.config.banners[kind] = "\n".join(lines).strip("\n")
+        self.banner = None
+        self.write(self.frame.prompt())
+
+    def enable(self, frame, attempt=0):
+        secret = frame.device.enable_secret
+        if frame.privileged or not secret:
+            frame.privileged = True
+            return ""
+
+        def check(answer):
+            self.write("\n")
+            if answer == secret:
+                frame.privileged = True
+                self.reply("")
+            elif attempt < 2:
+                self.enable(frame, attempt + 1)
+            else:
+                self.reply("% Bad secrets")
+        self.write("Password: ")
+        self.pending = check
+        return None
+
+    def ssh(self, command):
+        match = re.match(r"^ssh(?:\s+-l\s+(\S+))?(?:\s+-\w\s+\S+)*\s+(\S+)$", command)
+        if not match:
+            return INVALID
+        target = self.fleet.device(match.group(2))
+        if target is None:
+            return "% Connection timed out; remote host not responding"
+
+        def login(password):
+            self.write("\n")
+            if password != self.fleet.password or (match.group(1) or self.fleet.username) != self.fleet.username:
+                self.reply("% Authentication failed.")
+                return
+            self.frames.append(Frame(target, privileged=not target.enable_secret))
+            self.write(f"\n{self.frame.prompt()}")
+        self.write("Password: ")
+        self.pending = login
+        return None
+
+    def leave(self):
+        """exit at the exec prompt: back to the device we hopped from, or hang up"""
+        if len(self.frames) > 1:
+            host = self.frames.pop().device.host
+            self.write(f"\n[Connection to {host} closed by foreign host]\n{self.frame.prompt()}")
+        else:
+            self.closed = True
+        return None
+
+
+class _Server(paramiko.ServerInterface):
+    """Password login for one listening host; each shell channel gets a Session"""
+
+    def __init__(self, fleet, host):
+        self.fleet = fleet
+        self.host = host
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        if username == self.fleet.username and password == self.fleet.password:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        device = self.fleet.device(self.host)
+        threading.Thread(target=Session(self.fleet, channel, device).run, daemon=True).start()
+        return True
+
+
+class Simulator:
+    """SSH listeners for the entry hosts, all sharing one Fleet"""
+
+    def __init__(self, fleet=None, hosts=ENTRY_HOSTS, address=ADDRESS, port=FIRST_PORT, host_key=None):
+        self.fleet = fleet or Fleet()
+        self.address = address
+        # host -> port (0 = any free port)
+        self.ports = {host: (port + i if port else 0) for i, host in enumerate(hosts)}
+        self.host_key = paramiko.RSAKey(filename=host_key) if host_key else paramiko.RSAKey.generate(2048)
+        self._sockets = []
+        self._transports = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        for host, port in self.ports.items():
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.address, port))
+            sock.listen(128)
+            self.ports[host] = sock.getsockname()[1]
+            self._sockets.append(sock)
+            threading.Thread(target=self._accept, args=(sock, host), daemon=True).start()
+        return self
+
+    def _accept(self, sock, host):
+        while not self._stopped.is_set():
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(self.host_key)
+            with self._lock:
+                self._transports.append(transport)
+            try:
+                transport.start_server(server=_Server(self.fleet, host))
+            except (paramiko.SSHException, EOFError, OSError):
+                transport.close()
+
+    def hosts(self):
+        """host -> [address, port], with '*' for hosts not listed"""
+        hosts = {host: [self.address, port] for host, port in self.ports.items()}
+        hosts["*"] = hosts[next(iter(self.ports))]
+        return hosts
+
+    def write_map(self, path=None):
+        """Write the host map that connect() follows when $NETLIB_SIMULATOR points at it"""
+        path = os.path.expanduser(path or os.environ.get(SIMULATOR_ENV, DEFAULT_MAP))
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"hosts": self.hosts()}, f, indent=1)
+        os.replace(tmp, path)
+        return path
+
+    def stop(self):
+        self._stopped.set()
+        for sock in self._sockets:
+            sock.close()
+        with self._lock:
+            for transport in self._transports:
+                transport.close()
+
+
+def parse_latency(values):
+    latency = {}
+    for value in values:
+        command, _, seconds = value.rpartition("=")
+        latency[command.strip().lower()] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a simulated Cisco IOS fleet on localhost")
+    parser.add_argument("--address", default=ADDRESS)
+    parser.add_argument("--port", type=int, default=FIRST_PORT, help="first port; one per entry host")
+    parser.add_argument("--hosts", nargs="+", default=list(ENTRY_HOSTS), metavar="IP",
+                        help="hosts the scripts log in to directly")
+    parser.add_argument("--username", default=USERNAME)
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--enable-secret", default=None)
+    parser.add_argument("--ports", type=int, default=PORTS, help="ports per switch")
+    parser.add_argument("--latency", action="append", default=[], metavar="COMMAND=SECONDS")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--tdr-seconds", type=float, default=TDR_SECONDS)
+    parser.add_argument("--unreachable", nargs="+", default=[], metavar="IP")
+    parser.add_argument("--reject", default=None, metavar="REGEX", help="lines answered with '%% Invalid input'")
+    parser.add_argument("--map", default=None, help=f"host map file (default ${SIMULATOR_ENV} or {DEFAULT_MAP})")
+    parser.add_argument("--host-key", default=None)
+    args = parser.parse_args()
+
+    fleet = Fleet(args.username, args.password, args.ports, parse_latency(args.latency), args.jitter,
+                  args.unreachable, args.enable_secret, args.tdr_seconds, args.reject)
+    with Simulator(fleet, args.hosts, args.address, args.port, args.host_key) as simulator:
+        path = simulator.write_map(args.map)
+        for host, (address, port) in simulator.hosts().items():
+            print(f"[SIM] {host} -> {address}:{port}")
+        print(f"[SIM] export {SIMULATOR_ENV}={path}")
+        try:
+            while True:
+                time.sleep(60)
+                print(f"[SIM] {len(fleet.devices)} switches, {fleet.commands} commands so far")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
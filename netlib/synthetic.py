@@ -0,0 +1,301 @@
+"""
+Synthetic IOS show output for switch stacks of any size.
+
+Nobody has an 8-member stack with 400+ ports on the bench, so the parsers
+cannot be timed against the real thing. stack(count) lays out a
+deterministic stack (copper access ports, fiber uplinks, port-channels,
+a few bad cables) and each generator renders one show command for it,
+formatted the way a Catalyst prints it:
+
+    output = generate("show interfaces status", 384)
+    records = parse("show interfaces status", output)
+
+The same count and seed always give the same text, and every generator
+describes the same stack, so the outputs agree with each other.
+"""
+import random
+from collections import namedtuple
+
+# 48 copper access ports + 4 fiber uplinks per stack member
+COPPER_PER_MEMBER = 48
+UPLINKS_PER_MEMBER = 4
+# Port-channel members per group
+CHANNEL_MEMBERS = 4
+# Share of copper ports with a cable fault / linked at 100M / unused
+FAULT_RATE = 0.03
+SLOW_RATE = 0.1
+IDLE_RATE = 0.3
+
+Port = namedtuple("Port", "name long_name media status speed duplex vlan description group")
+
+HOSTNAME = "NSPC-AccSW-1"
+VLANS = (10, 20, 28, 50, 90, 91, 92, 100)
+TDR_FAULTS = ("Open", "Short", "Impedance Mis")
+
+
+def stack(count, seed=0):
+    """count ports of a stack as Port records, uplinks bundled into port-channels"""
+    rng = random.Random(seed)
+    ports = []
+    member = 0
+    while len(ports) < count:
+        member += 1
+        for n in range(1, COPPER_PER_MEMBER + 1):
+            roll = rng.random()
+            if roll < IDLE_RATE:
+                status, speed, duplex = "notconnect", "auto", "auto"
+            elif roll < IDLE_RATE + SLOW_RATE:
+                status, speed, duplex = "connected", "a-100", "a-full"
+            else:
+                status, speed, duplex = "connected", "a-1000", "a-full"
+            ports.append(Port(f"Gi{member}/0/{n}", f"GigabitEthernet{member}/0/{n}", "10/100/1000BaseTX",
+                              status, speed, duplex, str(rng.choice(VLANS)),
+                              f"User {member}-{n}" if status == "connected" else "", None))
+        for n in range(1, UPLINKS_PER_MEMBER + 1):
+            ports.append(Port(f"Te{member}/1/{n}", f"TenGigabitEthernet{member}/1/{n}", "SFP-10GBase-SR",
+                              "connected", "10G", "full", "trunk", f"Uplink {member}-{n}", None))
+    ports = ports[:count]
+
+    # Bundle uplinks (and every 12th access port, like server LACP pairs) into groups
+    bundled = [i for i, p in enumerate(ports) if p.name.startswith("Te") or i % 12 == 11]
+    for n, index in enumerate(bundled):
+        ports[index] = ports[index]._replace(group=n // CHANNEL_MEMBERS + 1)
+    return ports
+
+
+def channels(ports):
+    """group -> member ports"""
+    groups = {}
+    for port in ports:
+        if port.group:
+            groups.setdefault(port.group, []).append(port)
+    return groups
+
+
+def interfaces_status(count, seed=0):
+    """'show interfaces status'"""
+    ports = stack(count, seed)
+    lines = [
+        "",
+        "Port         Name               Status       Vlan       Duplex  Speed Type",
+    ]
+    for port in ports:
+        lines.append(f"{port.name:<12} {port.description[:18]:<18} {port.status:<12} "
+                     f"{port.vlan:<10} {port.duplex:>6} {port.speed:>6} {port.media}")
+    for group in channels(ports):
+        lines.append(f"{f'Po{group}':<12} {'':<18} {'connected':<12} {'trunk':<10} {'a-full':>6} {'a-10G':>6} ")
+    return "\n".join(lines) + f"\n{HOSTNAME}#"
+
+
+def etherchannel_summary(count, seed=0):
+    """'show etherchannel summary', long member lists wrapped like IOS does"""
+    groups = channels(stack(count, seed))
+    lines = [
+        "Flags:  D - down        P - bundled in port-channel",
+        "        I - stand-alone s - suspended",
+        "        H - Hot-standby (LACP only)",
+        "        R - Layer3      S - Layer2",
+        "        U - in use      f - failed to allocate aggregator",
+        "",
+        f"Number of channel-groups in use: {len(groups)}",
+        f"Number of aggregators:           {len(groups)}",
+        "",
+        "Group  Port-channel  Protocol    Ports",
+        "------+-------------+-----------+-----------------------------------------------",
+    ]
+    for group, members in groups.items():
+        flags = "SU" if group % 17 else "SD"
+        tags = [f"{m.name}({'P' if flags == 'SU' else 'D'})" for m in members]
+        first = f"{group:<6} {f'Po{group}({flags})':<13} {'LACP':<11} "
+        lines.append(first + "  ".join(tags[:3]))
+        for i in range(3, len(tags), 3):
+            lines.append(" " * len(first) + "  ".join(tags[i:i + 3]))
+    return "\n".join(lines) + f"\n{HOSTNAME}#"
+
+
+def cable_diagnostics_tdr(count, seed=0):
+    """'show cable-diagnostics tdr' for every copper port; fiber ports have no TDR"""
+    rng = random.Random(seed + 1)
+    lines = [
+        "TDR test last run on: March 01 10:00:00",
+        "",
+        "Interface Speed Local pair Pair length        Remote pair Pair status",
+        "--------- ----- ---------- ------------------ ----------- --------------------",
+    ]
+    for port in stack(count, seed):
+        if not port.name.startswith("Gi") or port.status != "connected":
+            continue
+        speed = "100M" if port.speed == "a-100" else "1000M"
+        length = rng.randint(2, 90)
+        fault_pair = rng.choice("ABCD") if rng.random() < FAULT_RATE else None
+        for pair in "ABCD":
+            if speed == "100M" and pair in "CD":
+                pair_length, status = 0, "Normal"
+            elif pair == fault_pair:
+                pair_length, status = rng.randint(0, length), rng.choice(TDR_FAULTS)
+            else:
+                pair_length, status = length, "Normal"
+            head = f"{port.name:<9} {speed:<5}" if pair == "A" else " " * 15
+            lines.append(f"{head} Pair {pair}     {pair_length:<4} +/- 4  meters Pair {pair}      {status}")
+    return "\n".join(lines) + f"\n{HOSTNAME}#"
+
+
+def interfaces(count, seed=0):
+    """'show interfaces', one full block per port"""
+    rng = random.Random(seed + 2)
+    blocks = []
+    for port in stack(count, seed):
+        up = port.status == "connected"
+        speed = {"a-100": "100Mb/s", "a-1000": "1000Mb/s", "10G": "10Gb/s"}.get(port.speed, "Auto-speed")
+        input_errors = rng.choice((0, 0, 0, 0, rng.randint(1, 500)))
+        block = [
+            f"{port.long_name} is {'up' if up else 'down'}, line protocol is {'up (connected)' if up else 'down (notconnect)'}",
+            f"  Hardware is Gigabit Ethernet, address is 00a3.d1{rng.randint(16, 255):02x}.{rng.randint(4096, 65535):04x}",
+        ]
+        if port.description:
+            block.append(f"  Description: {port.description}")
+        block += [
+            "  MTU 1500 bytes, BW 1000000 Kbit/sec, DLY 10 usec,",
+            "     reliability 255/255, txload 1/255, rxload 1/255",
+            "  Encapsulation ARPA, loopback not set",
+            "  Keepalive set (10 sec)",
+            f"  {'Full' if up else 'Auto'}-duplex, {speed}, media type is {port.media}",
+            "  input flow-control is on, output flow-control is unsupported",
+            "  ARP type: ARPA, ARP Timeout 04:00:00",
+            "  Last input never, output 00:00:01, output hang never",
+            "  Last clearing of \"show interface\" counters never",
+            "  Input queue: 0/2000/0/0 (size/max/drops/flushes); Total output drops: 0",
+            "  Queueing strategy: fifo",
+            "  Output queue: 0/40 (size/max)",
+            "  5 minute input rate 2000 bits/sec, 3 packets/sec",
+            "  5 minute output rate 4000 bits/sec, 5 packets/sec",
+            f"     {rng.randint(0, 10 ** 7)} packets input, {rng.randint(0, 10 ** 9)} bytes, 0 no buffer",
+            f"     Received {rng.randint(0, 10 ** 5)} broadcasts ({rng.randint(0, 10 ** 5)} multicasts)",
+            "     0 runts, 0 giants, 0 throttles",
+            f"     {input_errors} input errors, {input_errors // 2} CRC, 0 frame, 0 overrun, 0 ignored",
+            "     0 watchdog, 0 multicast, 0 pause input",
+            "     0 input packets with dribble condition detected",
+            f"     {rng.randint(0, 10 ** 7)} packets output, {rng.randint(0, 10 ** 9)} bytes, 0 underruns",
+            "     0 output errors, 0 collisions, 1 interface resets",
+            "     0 unknown protocol drops",
+            "     0 babbles, 0 late collision, 0 deferred",
+            "     0 lost carrier, 0 no carrier, 0 pause output",
+            "     0 output buffer failures, 0 output buffers swapped out",
+        ]
+        blocks.append("\n".join(block))
+    return "\n".join(blocks) + f"\n{HOSTNAME}#"
+
+
+def running_config(count, seed=0):
+    """'show running-config' with one section per port and port-channel"""
+    ports = stack(count, seed)
+    lines = [
+        "Building configuration...",
+        "",
+        f"Current configuration : {count * 120} bytes",
+        "!",
+        "version 17.9",
+        f"hostname {HOSTNAME}",
+        "!",
+        "clock timezone AST 3 0",
+        "ip domain name nadec.com.sa",
+        "vtp domain nadec.com.sa",
+        "vtp mode client",
+        "!",
+    ]
+    for group in channels(ports):
+        lines += [
+            f"interface Port-channel{group}",
+            " description CONFIGURED-BY-SCRIPT",
+            " switchport trunk allowed vlan 1-16,28,50,90-92,100",
+            " switchport mode trunk",
+            " spanning-tree link-type point-to-point",
+            "!",
+        ]
+    for port in ports:
+        lines.append(f"interface {port.long_name}")
+        if port.description:
+            lines.append(f" description {port.description}")
+        if port.group:
+            lines += [
+                " switchport trunk allowed vlan 1-16,28,50,90-92,100",
+                " switchport mode trunk",
+                f" channel-group {port.group} mode active",
+            ]
+        else:
+            lines += [f" switchport access vlan {port.vlan}", " switchport mode access", " spanning-tree portfast"]
+        lines.append("!")
+    lines += [
+        "banner motd ^C",
+        "Authorized access only",
+        "^C",
+        "!",
+        "line vty 0 4",
+        " transport input ssh",
+        "!",
+        "end",
+    ]
+    return "\n".join(lines) + f"\n{HOSTNAME}#"
+
+
+def version(count, seed=0):
+    """'show version' of a stack with enough members for count ports"""
+    members = -(-count // (COPPER_PER_MEMBER + UPLINKS_PER_MEMBER))
+    lines = [
+        "Cisco IOS XE Software, Version 17.09.04a",
+        f"{HOSTNAME} uptime is 1 year, 2 weeks, 4 days, 5 hours, 6 minutes",
+        "cisco C9300-48P (X86) processor with 1338934K/6147K bytes of memory.",
+        f"Processor board ID FOC{seed:08d}",
+        f"{count} Gigabit Ethernet interfaces",
+        "Model Number                       : C9300-48P",
+        f"System Serial Number               : FOC{seed:08d}",
+        "",
+        "Switch Ports Model              SW Version        SW Image              Mode",
+        "------ ----- -----              ----------        ----------            ----",
+    ]
+    for member in range(1, members + 1):
+        lines.append(f"{'*' if member == 1 else ' '} {member:<4} 52    C9300-48P          17.09.04a         CAT9K_IOSXE           INSTALL")
+    return "\n".join(lines) + f"\n{HOSTNAME}#"
+
+
+def vtp_status(count=0, seed=0):
+    """'show vtp status' (does not grow with the stack)"""
+    return "\n".join([
+        "VTP Version capable             : 1 to 3",
+        "VTP version running             : 3",
+        "VTP Domain Name                 : nadec.com.sa",
+        "VTP Pruning Mode                : Enabled",
+        "VTP Traps Generation            : Disabled",
+        "Device ID                       : 00a3.d1ff.0000",
+        "",
+        "Feature VLAN:",
+        "--------------",
+        "VTP Operating Mode                : Client",
+        f"Number of existing VLANs          : {len(VLANS) + 5}",
+        "Number of existing extended VLANs : 0",
+        "Maximum VLANs supported locally   : 4096",
+        "Configuration Revision            : 42",
+    ]) + f"\n{HOSTNAME}#"
+
+
+def clock(count=0, seed=0):
+    """'show clock' (does not grow with the stack)"""
+    return f"*10:15:30.123 AST Mon Mar 2 2026\n{HOSTNAME}#"
+
+
+# command -> generator(count, seed)
+GENERATORS = {
+    "show interfaces status": interfaces_status,
+    "show etherchannel summary": etherchannel_summary,
+    "show cable-diagnostics tdr": cable_diagnostics_tdr,
+    "show interfaces": interfaces,
+    "show running-config": running_config,
+    "show version": version,
+    "show vtp status": vtp_status,
+    "show clock": clock,
+}
+
+
+def generate(command, count, seed=0):
+    """Synthetic output of command for a stack of count ports"""
+    return GENERATORS[command](count, seed)
@@ -0,0 +1,108 @@
+"""
+TDR runs that wait for the results instead of a fixed sleep.
+
+The TDR scripts started every test and then slept 10 seconds (3 per port
+in test-cable-tdr.py) before reading results. Short cables are done in a
+second or two, and long ones can still say 'Not Completed' after the
+sleep. run_tdr() starts the test on every port, then polls
+'show cable-diagnostics tdr interface X' with a growing interval. A port
+leaves the poll list as soon as its result is final, so each round only
+asks about the ports still running. The wait per switch follows its
+slowest cable, capped by timeout.
+
+    results = run_tdr(shell, ["Gi1/0/1", "Gi1/0/2"])        # netlib Shell or BrokerShell
+    results = run_tdr(conn, ports)                          # netmiko connection
+    for interface, result in results.items():
+        result.pairs, result.output, result.final, result.seconds
+"""
+import re
+import time
+from collections import namedtuple
+
+from netlib.parsers import parse
+from netlib.query import command_sender
+
+# Seconds before the first poll, growth per round and the longest gap between polls
+FIRST_POLL = 1.0
+BACKOFF = 1.5
+MAX_POLL = 4.0
+# Give up on ports still running after this long and keep their last output
+TDR_TIMEOUT = 30
+
+TEST_COMMAND = "test cable-diagnostics tdr interface {}"
+SHOW_COMMAND = "show cable-diagnostics tdr interface {}"
+
+# Still running, or the switch has not registered the test yet
+PENDING = re.compile(r"in progress|not completed|never issued|has not been run", re.IGNORECASE)
+UNSUPPORTED = re.compile(r"not\s+supported", re.IGNORECASE)
+
+# pairs: [TdrPair], empty for fiber; final: False if it timed out still running
+TdrResult = namedtuple("TdrResult", "interface output pairs supported final seconds")
+
+
+def is_final(output):
+    """True once output is a finished result (or says TDR is not supported)"""
+    if UNSUPPORTED.search(output):
+        return True
+    pairs = parse("show cable-diagnostics tdr", output)
+    return bool(pairs) and not any(PENDING.search(pair.status) for pair in pairs) and not PENDING.search(output)
+
+
+def start_tdr(send, interfaces):
+    for interface in interfaces:
+        send(TEST_COMMAND.format(interface))
+
+
+def poll_tdr(send, interfaces, started=None, timeout=TDR_TIMEOUT,
+             first_poll=FIRST_POLL, backoff=BACKOFF, max_poll=MAX_POLL):
+    """Poll already started tests until each is final or timeout; returns {interface: TdrResult}"""
+    started = time.monotonic() if started is None else started
+    pending = list(interfaces)
+    outputs = {}
+    results = {}
+    interval = first_poll
+    next_poll = started + first_poll
+    while pending:
+        time.sleep(max(0, next_poll - time.monotonic()))
+        still_running = []
+        for interface in pending:
+            output = send(SHOW_COMMAND.format(interface))
+            outputs[interface] = output
+            if is_final(output):
+                results[interface] = result(interface, output, True, time.monotonic() - started)
+            else:
+                still_running.append(interface)
+        pending = still_running
+        if pending and time.monotonic() - started >= timeout:
+            print(f"\n[TDR] Still running after {timeout}s: {', '.join(pending)}")
+            for interface in pending:
+                results[interface] = result(interface, outputs[interface], False, time.monotonic() - started)
+            break
+        interval = min(interval * backoff, max_poll)
+        next_poll = time.monotonic() + interval
+    return {interface: results[interface] for interface in interfaces}
+
+
+def result(interface, output, final, seconds):
+    return TdrResult(interface, output, parse("show cable-diagnostics tdr", output),
+                     not UNSUPPORTED.search(output), final, round(seconds, 2))
+
+
+def run_tdr(shell, interfaces, send=None, timeout=TDR_TIMEOUT, command_timeout=None, **poll):
+    """
+    Start TDR on every interface and collect each result as soon as it is final.
+
+    shell is a netlib Shell, a BrokerShell or a netmiko connection (or pass send, as in
+    netlib.query). Returns {interface: TdrResult} in the order given.
+    """
+    interfaces = list(interfaces)
+    if not interfaces:
+        return {}
+    send = command_sender(shell, send, command_timeout)
+    started = time.monotonic()
+    start_tdr(send, interfaces)
+    results = poll_tdr(send, interfaces, started, timeout, **poll)
+    slowest = max(r.seconds for r in results.values())
+    print(f"\n[TDR] {len(interfaces)} ports done in {slowest:.1f}s "
+          f"({sum(1 for r in results.values() if not r.final)} still running)")
+    return results
@@ -0,0 +1,389 @@
+"""
+TDR results kept on disk, indexed for history queries.
+
+The TDR scripts printed their tables and the results were gone. TdrStore
+writes every run_tdr() result to a SQLite file: speed, and status and length
+of each pair, per switch, interface and time. Nightly runs on thousands of
+ports add millions of pair rows a year, so queries over "what changed" do
+not scan them. While recording, each port is compared with its baseline
+(the values it had when it last changed), and a difference lands in a small
+'changes' table indexed by field, pair and time:
+
+- a speed or a pair status that is not the same as last time
+- a pair length that moved by more than the TDR tolerance ('+/- 4 meters'),
+  so the meter of jitter between runs is not a change but slow drift is
+
+    store = shared_store()
+    store.record("10.20.39.21", run_tdr(shell, ports))
+    store.changed_ports(pair="C", days=90)        # [(switch, interface), ...]
+
+    python3 -m netlib.tdr_store --changed C --days 90
+    python3 -m netlib.tdr_store --history 10.20.39.21 Gi1/0/8
+
+'ports' holds the latest result of every port and when it was last good
+(final, and every pair Normal or TDR not supported).
+
+TDR takes the link down for a moment, so a nightly audit should not test
+every port again. due_ports() picks the ones worth testing from the
+history and the 'show interfaces' counters, which cost nothing to read.
+record() keeps those counters as they were at each port's last good
+result, and a port is due when:
+
+- it was never tested, or its last result was not good
+- its speed is not what it was then
+- 'interface resets' went up (the link flapped)
+- input errors or CRC went up
+- its counters went down (cleared or reloaded: nothing to compare with)
+- its last good result is older than MAX_AGE_DAYS
+
+    counters = port_counters(show(shell, "show interfaces"), ports)
+    due = store.due_ports(switch, ports, counters)     # {interface: reason}
+    store.record(switch, run_tdr(shell, list(due)), counters=counters)
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from netlib.showcache import interfaces_in
+
+TDR_STORE_ENV = "NETLIB_TDR_STORE"
+DEFAULT_PATH = "~/.netlib-tdr.sqlite"
+# Meters a pair length may move before it counts as changed, when the switch prints no tolerance
+LENGTH_TOLERANCE = 2
+DAY = 86400
+# Retest a port at least this often, even if its counters did not move
+MAX_AGE_DAYS = 30
+# 'show interfaces' lines port_counters() needs (an '| include' the switch can apply)
+COUNTER_LINES = "line protocol|duplex|input errors|interface resets"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    switch TEXT NOT NULL,
+    interface TEXT NOT NULL,
+    tested REAL NOT NULL,
+    speed TEXT,
+    supported INTEGER NOT NULL,
+    final INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_port ON results (switch, interface, tested);
+CREATE INDEX IF NOT EXISTS results_tested ON results (tested);
+
+CREATE TABLE IF NOT EXISTS pairs (
+    result_id INTEGER NOT NULL,
+    pair TEXT NOT NULL,
+    status TEXT,
+    length INTEGER,
+    PRIMARY KEY (result_id, pair)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ports (
+    switch TEXT NOT NULL,
+    interface TEXT NOT NULL,
+    result_id INTEGER NOT NULL,
+    tested REAL NOT NULL,
+    good REAL,
+    speed TEXT,
+    PRIMARY KEY (switch, interface)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS baseline (
+    switch TEXT NOT NULL,
+    interface TEXT NOT NULL,
+    pair TEXT NOT NULL,
+    status TEXT,
+    length INTEGER,
+    PRIMARY KEY (switch, interface, pair)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS changes (
+    switch TEXT NOT NULL,
+    interface TEXT NOT NULL,
+    pair TEXT NOT NULL,
+    field TEXT NOT NULL,
+    old TEXT,
+    new TEXT,
+    tested REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_field ON changes (field, pair, tested);
+CREATE INDEX IF NOT EXISTS changes_port ON changes (switch, interface, tested);
+
+CREATE TABLE IF NOT EXISTS counters (
+    switch TEXT NOT NULL,
+    interface TEXT NOT NULL,
+    speed TEXT,
+    resets INTEGER,
+    input_errors INTEGER,
+    crc INTEGER,
+    PRIMARY KEY (switch, interface)
+) WITHOUT ROWID;
+"""
+
+# pair is '' for speed changes; old/new are stored as text
+Change = namedtuple("Change", "switch interface pair field old new tested")
+# One stored result: pairs is {pair: (status, length)}
+Record = namedtuple("Record", "tested speed supported final pairs")
+# Latest result of a port; good is when it last had a good result (None = never)
+PortState = namedtuple("PortState", "tested good speed")
+
+
+def is_good(result):
+    """Final, and every pair Normal (or TDR not supported on the port)"""
+    if not result.final:
+        return False
+    return not result.supported or (bool(result.pairs)
+                                    and all(p.status.lower() == "normal" for p in result.pairs))
+
+
+def length_changed(old, new, tolerance):
+    if old is None or new is None:
+        return old != new
+    return abs(new - old) > (LENGTH_TOLERANCE if tolerance is None else tolerance)
+
+
+def port_counters(records, interfaces):
+    """{interface: Interface} out of parsed 'show interfaces' records; 'Gi1/0/1' finds 'GigabitEthernet1/0/1'"""
+    by_name = {name: record for record in records for name in interfaces_in(record.name)}
+    return {interface: by_name[name] for interface in interfaces
+            for name in interfaces_in(interface) if name in by_name}
+
+
+def why_due(port, snapshot, current, max_age, now):
+    """Reason a port needs TDR now, or None if its last good result still stands"""
+    if port is None:
+        return "new"
+    if port.good is None or port.good < port.tested:
+        return "last result not good"
+    if now - port.good > max_age:
+        return f"last tested over {max_age / DAY:g} days ago"
+    if snapshot is None or current is None:
+        return "no counters"
+    speed, resets, input_errors, crc = snapshot
+    if current.speed != speed:
+        return f"speed {speed} -> {current.speed}"
+    if current.resets < resets or current.input_errors < input_errors or current.crc < crc:
+        return "counters cleared"
+    if current.resets > resets:
+        return f"flapped ({current.resets - resets} resets)"
+    if current.input_errors > input_errors or current.crc > crc:
+        return f"errors (+{current.input_errors - input_errors} input, +{current.crc - crc} CRC)"
+    return None
+
+
+def compare(speed, pairs, old_speed, baseline):
+    """
+    (changes, baseline entries that moved) of one final result against the port's baseline.
+
+    changes are (pair, field, old, new). A pair's length baseline only moves
+    when the change is recorded, so drift adds up until it counts.
+    """
+    changes = []
+    if old_speed is not None and speed != old_speed:
+        changes.append(("", "speed", old_speed, speed))
+    moved = {}
+    for p in pairs:
+        if p.pair not in baseline:
+            moved[p.pair] = (p.status, p.length)
+            continue
+        status, length = baseline[p.pair]
+        if p.status != status:
+            changes.append((p.pair, "status", status, p.status))
+        if length_changed(length, p.length, p.tolerance):
+            changes.append((p.pair, "length", None if length is None else str(length),
+                            None if p.length is None else str(p.length)))
+            length = p.length
+        if (p.status, length) != baseline[p.pair]:
+            moved[p.pair] = (p.status, length)
+    return changes, moved
+
+
+class TdrStore:
+    """TDR history in a SQLite file shared by every script"""
+
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path or os.environ.get(TDR_STORE_ENV, DEFAULT_PATH))
+        self._lock = threading.Lock()
+        # One connection for every thread of run_parallel(); _lock serializes use
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def record(self, switch, results, tested=None, counters=None):
+        """
+        Store {interface: TdrResult} of one run_tdr() on switch; returns the Changes it found.
+
+        counters ({interface: Interface}, see port_counters) are kept for the
+        ports with a good result, for due_ports() to compare against.
+        """
+        tested = time.time() if tested is None else tested
+        found = []
+        with self._lock, self._db:
+            db = self._db
+            # One read of the switch's ports and baselines instead of one per port
+            previous = {interface: (good, speed) for interface, good, speed in db.execute(
+                "SELECT interface, good, speed FROM ports WHERE switch = ?", (switch,))}
+            baselines = {}
+            for interface, pair, status, length in db.execute(
+                    "SELECT interface, pair, status, length FROM baseline WHERE switch = ?", (switch,)):
+                baselines.setdefault(interface, {})[pair] = (status, length)
+
+            pair_rows, port_rows, baseline_rows, counter_rows = [], [], [], []
+            for interface, result in results.items():
+                speed = result.pairs[0].speed if result.pairs and result.pairs[0].speed else None
+                result_id = db.execute(
+                    "INSERT INTO results (switch, interface, tested, speed, supported, final) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (switch, interface, tested, speed, int(bool(result.supported)), int(result.final)),
+                ).lastrowid
+                pair_rows += [(result_id, p.pair, p.status, p.length) for p in result.pairs]
+
+                good, old_speed = previous.get(interface, (None, None))
+                if is_good(result):
+                    good = tested
+                    current = (counters or {}).get(interface)
+                    if current is not None:
+                        counter_rows.append((switch, interface, current.speed, current.resets,
+                                             current.input_errors, current.crc))
+                # Unfinished tests say nothing about the cable, and have no speed yet
+                if result.final:
+                    changes, baseline = compare(speed, result.pairs, old_speed, baselines.get(interface, {}))
+                    found += [(switch, interface) + change + (tested,) for change in changes]
+                    baseline_rows += [(switch, interface, pair) + values for pair, values in baseline.items()]
+                    old_speed = speed
+                port_rows.append((switch, interface, result_id, tested, good, old_speed))
+
+            db.executemany("INSERT OR REPLACE INTO pairs VALUES (?, ?, ?, ?)", pair_rows)
+            db.executemany("INSERT OR REPLACE INTO ports VALUES (?, ?, ?, ?, ?, ?)", port_rows)
+            db.executemany("INSERT OR REPLACE INTO baseline VALUES (?, ?, ?, ?, ?)", baseline_rows)
+            db.executemany("INSERT INTO changes VALUES (?, ?, ?, ?, ?, ?, ?)", found)
+            db.executemany("INSERT OR REPLACE INTO counters VALUES (?, ?, ?, ?, ?, ?)", counter_rows)
+        return [Change(*change) for change in found]
+
+    def due_ports(self, switch, interfaces, counters, max_age_days=MAX_AGE_DAYS, now=None):
+        """
+        {interface: reason} of the interfaces that need TDR now, in the order given.
+
+        counters is {interface: Interface} from 'show interfaces' (port_counters);
+        a port missing from it is always due.
+        """
+        now = time.time() if now is None else now
+        ports = self.ports(switch)
+        with self._lock:
+            snapshots = {interface: tuple(values) for interface, *values in self._db.execute(
+                "SELECT interface, speed, resets, input_errors, crc FROM counters WHERE switch = ?", (switch,))}
+        due = {}
+        for interface in interfaces:
+            reason = why_due(ports.get(interface), snapshots.get(interface), counters.get(interface),
+                             max_age_days * DAY, now)
+            if reason:
+                due[interface] = reason
+        return due
+
+    def changes(self, field="length", pair=None, since=None, switch=None):
+        """Changes of field ('length', 'status' or 'speed') since a time, oldest first"""
+        sql = "SELECT * FROM changes WHERE field = ?"
+        args = [field]
+        if pair is not None:
+            sql += " AND pair = ?"
+            args.append(pair)
+        if since is not None:
+            sql += " AND tested >= ?"
+            args.append(since)
+        if switch is not None:
+            sql += " AND switch = ?"
+            args.append(switch)
+        with self._lock:
+            return [Change(*row) for row in self._db.execute(sql + " ORDER BY tested", args)]
+
+    def changed_ports(self, pair="C", field="length", days=90):
+        """(switch, interface) of every port whose pair field changed in the last days"""
+        return sorted({(c.switch, c.interface) for c in self.changes(field, pair, time.time() - days * DAY)})
+
+    def history(self, switch, interface, since=None):
+        """[Record] of one port, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT r.tested, r.speed, r.supported, r.final, p.pair, p.status, p.length "
+                "FROM results r LEFT JOIN pairs p ON p.result_id = r.id "
+                "WHERE r.switch = ? AND r.interface = ? AND r.tested >= ? ORDER BY r.tested, r.id, p.pair",
+                (switch, interface, since or 0),
+            ).fetchall()
+        records = []
+        for tested, speed, supported, final, pair, status, length in rows:
+            if not records or records[-1].tested != tested:
+                records.append(Record(tested, speed, bool(supported), bool(final), {}))
+            if pair is not None:
+                records[-1].pairs[pair] = (status, length)
+        return records
+
+    def latest(self, switch, interface):
+        """Last stored Record of a port, or None"""
+        port = self.ports(switch).get(interface)
+        records = self.history(switch, interface, since=port.tested) if port else []
+        return records[-1] if records else None
+
+    def ports(self, switch):
+        """{interface: PortState} of every port of switch ever tested"""
+        with self._lock:
+            return {interface: PortState(tested, good, speed) for interface, tested, good, speed in self._db.execute(
+                "SELECT interface, tested, good, speed FROM ports WHERE switch = ?", (switch,))}
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_store():
+    """Process-wide store at $NETLIB_TDR_STORE (default ~/.netlib-tdr.sqlite)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = TdrStore()
+        return _shared
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the netlib TDR history")
+    parser.add_argument("--path", default=None)
+    parser.add_argument("--changed", metavar="PAIR", default=None, help="ports whose PAIR (A-D) changed")
+    parser.add_argument("--field", choices=("length", "status", "speed"), default="length")
+    parser.add_argument("--days", type=float, default=90)
+    parser.add_argument("--history", nargs=2, metavar=("SWITCH", "INTERFACE"), default=None)
+    args = parser.parse_args()
+
+    store = TdrStore(args.path)
+    since = time.time() - args.days * DAY
+    if args.history:
+        for record in store.history(*args.history, since=since):
+            pairs = "  ".join(f"{pair} {status} {length if length is not None else '-'}m"
+                              for pair, (status, length) in sorted(record.pairs.items()))
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(record.tested))}  "
+                  f"{record.speed or 'N/A':<6} {pairs or 'not supported'}")
+        return
+    pair = "" if args.field == "speed" else args.changed
+    started = time.perf_counter()
+    changes = store.changes(args.field, pair, since)
+    elapsed = (time.perf_counter() - started) * 1000
+    for c in changes:
+        print(f"{time.strftime('%Y-%m-%d', time.localtime(c.tested))}  {c.switch:<16} {c.interface:<12} "
+              f"{('Pair ' + c.pair) if c.pair else '':<7} {c.field}: {c.old} -> {c.new}")
+    ports = {(c.switch, c.interface) for c in changes}
+    print(f"\n{len(ports)} ports, {len(changes)} changes in the last {args.days:g} days ({elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
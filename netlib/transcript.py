@@ -0,0 +1,303 @@
+"""
+Record real sessions to a transcript file and replay them without a network.
+
+With NETLIB_RECORD pointing at a file, every Shell logs each exchange: what
+was sent, everything the device answered until the next send, and how long
+that took. Exchanges are kept per device (the host the shell was on when it
+sent), and the file is written gzipped when the process exits. Passwords
+typed at a Password: prompt, and secret/password/community values in
+config lines and in output, are masked before anything is stored.
+
+With NETLIB_REPLAY pointing at such a file, connect() and JumpHost get a
+ReplayClient instead of paramiko: no SSH at all, and every send is answered
+with the recorded output for that device and command, in recorded order.
+NETLIB_REPLAY_TIMING scales the recorded waits: 0 (default) answers at once,
+1 at the original speed, so a command that was slow in production is just
+as slow in the replay.
+
+    NETLIB_RECORD=~/run.transcript.gz python3 port_channel5/port_channel5.py
+    NETLIB_REPLAY=~/run.transcript.gz python3 port_channel5/port_channel5.py
+    python3 -m netlib.transcript ~/run.transcript.gz --slowest 10
+
+A send that is not in the transcript gets '% Unknown command (not in
+transcript)', so the script sees an IOS error instead of hanging. Channels
+read by a Reactor (expect_all) are neither recorded nor replayed.
+"""
+import argparse
+import atexit
+import gzip
+import json
+import os
+import re
+import socket
+import threading
+import time
+from collections import deque
+
+import paramiko
+
+RECORD_ENV = "NETLIB_RECORD"
+REPLAY_ENV = "NETLIB_REPLAY"
+REPLAY_TIMING_ENV = "NETLIB_REPLAY_TIMING"
+VERSION = 1
+
+MASK = "******"
+# password / secret values in config lines and output: 'secret 5 $1$...', 'vtp password X hidden'
+SECRETS = re.compile(r"\b(password|secret|community|key-string)(\s+\d{1,2})?[ \t]+(?!\*{6})(\S+)", re.IGNORECASE)
+MISSING = "% Unknown command (not in transcript)"
+DEFAULT_PROMPT = "Switch#"
+
+
+def mask(text):
+    """text with every secret value replaced by MASK"""
+    return SECRETS.sub(lambda m: f"{m.group(1)}{m.group(2) or ''} {MASK}", text) if text else text
+
+
+def last_prompt(output):
+    """Trailing 'SW01#' style prompt of an output, or None"""
+    line = output.rstrip().rsplit("\n", 1)[-1].strip()
+    return line if line.endswith(("#", ">")) else None
+
+
+class Transcript:
+    """Turns sends into transcript keys; shared by Recorder and Replayer"""
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        # shell -> (prompt name of the last read, key of the last send)
+        self._state = {}
+
+    def key(self, shell, data):
+        """Masked send; a password answers whatever asked for it"""
+        prompt, previous = self._state.get(shell, (None, None))
+        if prompt == "password":
+            key = f"{MASK} ({previous})"
+        else:
+            key = mask(data)
+        self._state[shell] = (None, key)
+        return key
+
+    def read(self, shell, result):
+        _, previous = self._state.get(shell, (None, None))
+        self._state[shell] = (result.prompt, previous)
+
+
+class Recorder(Transcript):
+    """Collects every exchange of every Shell and writes them on save()"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        # host -> [[send, output, seconds], ...]
+        self.hosts = {}
+        # shell -> [host, send, output chunks, seconds] still receiving
+        self._open = {}
+
+    def _flush(self, shell):
+        entry = self._open.pop(shell, None)
+        if entry:
+            host, send, chunks, seconds = entry
+            self.hosts.setdefault(host, []).append([send, mask("".join(chunks)), round(seconds, 3)])
+
+    def sent(self, shell, data):
+        with self._lock:
+            self._flush(shell)
+            self._open[shell] = [shell.host, self.key(shell, data), [], 0.0]
+
+    def received(self, shell, result):
+        with self._lock:
+            self.read(shell, result)
+            # Reads before the first send are the login banner (send None)
+            entry = self._open.setdefault(shell, [shell.host, None, [], 0.0])
+            entry[2].append(result.output)
+            entry[3] += result.elapsed
+
+    def save(self):
+        with self._lock:
+            for shell in list(self._open):
+                self._flush(shell)
+            data = {"version": VERSION, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "hosts": self.hosts}
+            tmp = f"{self.path}.tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        print(f"\n[TRANSCRIPT] {sum(map(len, self.hosts.values()))} exchanges on {len(self.hosts)} devices "
+              f"recorded to {self.path}")
+
+
+def load(path):
+    """host -> [[send, output, seconds], ...] from a transcript file"""
+    with gzip.open(os.path.expanduser(path), "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != VERSION:
+        raise ValueError(f"{path}: transcript version {data.get('version')}, expected {VERSION}")
+    return data["hosts"]
+
+
+class Replayer(Transcript):
+    """Answers every send from a recorded transcript"""
+
+    def __init__(self, path, timing=0.0):
+        super().__init__(path)
+        # Recorded seconds are multiplied by this before an answer is delivered
+        self.timing = timing
+        # (host, send) -> answers in recorded order; the last one is repeated
+        self._answers = {}
+        self._prompts = {}
+        for host, exchanges in load(path).items():
+            for send, output, seconds in exchanges:
+                self._answers.setdefault((host, send), deque()).append((output, seconds))
+                self._prompts[host] = last_prompt(output) or self._prompts.get(host)
+
+    def client(self, host):
+        return ReplayClient(self, host)
+
+    def answer(self, host, send, echo=""):
+        """(output, seconds) for send on host"""
+        with self._lock:
+            answers = self._answers.get((host, send))
+            if answers:
+                return answers.popleft() if len(answers) > 1 else answers[0]
+        print(f"\n[TRANSCRIPT] {host}: not in transcript: {echo.strip() or send}")
+        prompt = self._prompts.get(host, DEFAULT_PROMPT)
+        return f"{echo.strip()}\n{MISSING}\n{prompt}", 0.0
+
+    def sent(self, shell, data):
+        with self._lock:
+            key = self.key(shell, data)
+        output, seconds = self.answer(shell.host, key, "" if key.startswith(MASK) else data)
+        shell.channel.feed(output, seconds * self.timing)
+
+    def received(self, shell, result):
+        with self._lock:
+            self.read(shell, result)
+
+
+class ReplayChannel:
+    """Stands in for a paramiko shell channel; recv() hands out queued answers"""
+
+    def __init__(self, replayer, host):
+        self.replayer = replayer
+        self.host = host
+        self.closed = False
+        self.timeout = None
+        # (monotonic time it is due, bytes)
+        self._queue = deque()
+        self._ready = threading.Condition()
+
+    def get_pty(self, *args, **kwargs):
+        pass
+
+    def invoke_shell(self):
+        self.feed(*self.replayer.answer(self.host, None))
+
+    def feed(self, output, delay):
+        with self._ready:
+            # Answers come out in order, each one delay after the previous is due
+            start = max(time.monotonic(), self._queue[-1][0]) if self._queue else time.monotonic()
+            self._queue.append((start + delay, output.encode("utf-8")))
+            self._ready.notify_all()
+
+    def send(self, data):
+        return len(data)
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def recv(self, size):
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._ready:
+            while True:
+                now = time.monotonic()
+                due = self._queue[0][0] if self._queue else None
+                if due is not None and due <= now:
+                    _, data = self._queue.popleft()
+                    if len(data) > size:
+                        self._queue.appendleft((due, data[size:]))
+                    return data[:size]
+                if deadline is not None and deadline <= now:
+                    raise socket.timeout()
+                waits = [t - now for t in (due, deadline) if t is not None]
+                self._ready.wait(min(waits) if waits else None)
+
+    def close(self):
+        self.closed = True
+
+
+class ReplayClient:
+    """Stands in for paramiko.SSHClient (and its Transport) during a replay"""
+
+    def __init__(self, replayer, host):
+        self.replayer = replayer
+        self.host = host
+
+    def set_missing_host_key_policy(self, policy):
+        pass
+
+    def connect(self, hostname, **kwargs):
+        pass
+
+    def get_transport(self):
+        return self
+
+    def set_keepalive(self, interval):
+        pass
+
+    def open_session(self, timeout=None):
+        return ReplayChannel(self.replayer, self.host)
+
+    def invoke_shell(self):
+        channel = self.open_session()
+        channel.invoke_shell()
+        return channel
+
+    def close(self):
+        pass
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_transcript():
+    """Process-wide Recorder ($NETLIB_RECORD) or Replayer ($NETLIB_REPLAY), else None"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            if os.environ.get(REPLAY_ENV):
+                _shared = Replayer(os.environ[REPLAY_ENV], float(os.environ.get(REPLAY_TIMING_ENV, 0)))
+            elif os.environ.get(RECORD_ENV):
+                _shared = Recorder(os.environ[RECORD_ENV])
+                atexit.register(_shared.save)
+        return _shared or None
+
+
+def ssh_client(host):
+    """paramiko.SSHClient for host, or a ReplayClient when a replay is running"""
+    transcript = shared_transcript()
+    if isinstance(transcript, Replayer):
+        return transcript.client(host)
+    return paramiko.SSHClient()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a netlib session transcript")
+    parser.add_argument("path")
+    parser.add_argument("--slowest", type=int, default=10, metavar="N", help="list the N slowest exchanges")
+    parser.add_argument("--host", default=None, help="only this device")
+    args = parser.parse_args()
+
+    hosts = load(args.path)
+    if args.host:
+        hosts = {args.host: hosts.get(args.host, [])}
+    exchanges = [(seconds, host, send) for host, entries in hosts.items() for send, _, seconds in entries]
+    for host, entries in sorted(hosts.items()):
+        print(f"{host}: {len(entries)} exchanges, {sum(e[2] for e in entries):.2f}s waiting")
+    print(f"\nSlowest {args.slowest}:")
+    for seconds, host, send in sorted(exchanges, key=lambda e: e[0], reverse=True)[:args.slowest]:
+        first = (send or "<login>").strip().split("\n", 1)[0]
+        print(f"  {seconds:>8.3f}s  {host:<16} {first}")
+
+
+if __name__ == "__main__":
+    main()
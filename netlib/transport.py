@@ -0,0 +1,178 @@
+"""
+Shared SSH transport used by every paramiko script.
+
+One copy of connect / hop / send_command / read_shell_output instead of a
+slightly different one per script. Output is buffered in a bytearray and
+decoded once by expect(), and every command follows the same timeout and
+echo policy, so performance fixes land here for all scripts at once.
+"""
+import paramiko
+
+from netlib.expect import COMMAND_TIMEOUT, RECV_SIZE, expect
+from netlib.hostmap import resolve
+from netlib.latency import shared_model
+from netlib.showcache import ShowCache
+from netlib.transcript import shared_transcript, ssh_client
+
+SSH_PORT = 22
+CONNECT_TIMEOUT = 20
+HOP_TIMEOUT = 15
+SAVE_TIMEOUT = 30
+
+
+class Shell:
+    """Interactive channel to one device plus its read/echo policy"""
+
+    def __init__(self, channel, host=None, echo=True, latency=None, transcript=None):
+        self.channel = channel
+        self.host = host
+        self.echo = echo
+        # Learned read deadlines (netlib.latency), shared by every shell by default
+        self.latency = latency or shared_model()
+        # Output of read-only commands until something changes (netlib.showcache)
+        self.show_cache = ShowCache()
+        # Devices we hopped through to reach the current one
+        self.hops = []
+        # Last device prompt seen, e.g. 'SW01#'
+        self.prompt = None
+        # Records or replays every exchange with $NETLIB_RECORD / $NETLIB_REPLAY (netlib.transcript)
+        self.transcript = transcript or shared_transcript()
+
+    def send(self, data):
+        if self.transcript:
+            self.transcript.sent(self, data)
+        self.channel.send(data)
+
+    def settimeout(self, timeout):
+        self.channel.settimeout(timeout)
+
+    def recv(self, size=RECV_SIZE):
+        return self.channel.recv(size)
+
+    def expect(self, prompts=None, timeout=COMMAND_TIMEOUT):
+        """Read until a prompt shows up (see netlib.expect)"""
+        result = expect(self.channel, prompts, timeout, self.echo)
+        if self.transcript:
+            self.transcript.received(self, result)
+        if result.prompt == "device":
+            self.prompt = last_line(result.output)
+        return result
+
+    def close(self):
+        self.channel.close()
+
+
+def last_line(output):
+    """Last non-empty line of output, which is the prompt after a read"""
+    return output.rstrip().rsplit("\n", 1)[-1].strip()
+
+
+def connect(host, username, password, port=SSH_PORT, timeout=CONNECT_TIMEOUT, echo=True):
+    """Open an SSH session to host and return (ssh, shell) at the first prompt"""
+    ssh = ssh_client(host)
+    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    # Follows $NETLIB_SIMULATOR to a simulated switch when it is set (netlib.simulator)
+    address, port = resolve(host, port)
+    ssh.connect(address, port=port, username=username, password=password, timeout=timeout)
+
+    shell = Shell(ssh.invoke_shell(), host=host, echo=echo)
+    # Read initial banner up to the first prompt
+    shell.expect()
+    return ssh, shell
+
+
+def read_shell_output(shell, timeout=COMMAND_TIMEOUT):
+    """Read output from shell until the prompt comes back"""
+    return shell.expect(timeout=timeout).output
+
+
+def send_command(shell, command, timeout=None):
+    """
+    Send command and return output as soon as the prompt comes back.
+
+    Without timeout, the read waits COMMAND_TIMEOUT until the latency model
+    has seen this kind of command on this device, then its learned deadline.
+    A timeout passed by the caller is the least the read waits.
+    A show command already answered in this session, with nothing changed
+    since, is returned from the session's show cache without a round trip.
+    """
+    cached = shell.show_cache.get(shell.host, command)
+    if cached is not None:
+        if shell.echo:
+            print(f"\n[COMMAND] {command} (cached)\n{cached}")
+        return cached
+
+    if shell.echo:
+        print(f"\n[COMMAND] {command}")
+    timeout = shell.latency.deadline(shell.host, command, timeout or COMMAND_TIMEOUT, timeout or 0)
+    shell.show_cache.sent(shell.host, command)
+    shell.send(f"{command}\n")
+    result = shell.expect(timeout=timeout)
+    shell.latency.record(shell.host, command, result.elapsed)
+    if result.prompt == "device" and not result.errors:
+        shell.show_cache.put(shell.host, command, result.output)
+    for error in result.errors:
+        print(f"\n[ERROR] {shell.host}: {command}: {error}")
+    if result.prompt is None:
+        print(f"\n[WARNING] {shell.host}: no prompt after {timeout:.1f}s: {command}")
+    return result.output
+
+
+def enable(shell, password):
+    """Enter enable mode; tries an empty enable secret, then the login password"""
+    shell.send("enable\n")
+    result = shell.expect()
+    for secret in ("", password):
+        if result.prompt != "password":
+            break
+        shell.send(f"{secret}\n")
+        result = shell.expect()
+    return result.output.rstrip().endswith("#")
+
+
+def hop(shell, host, username, password, timeout=HOP_TIMEOUT):
+    """
+    SSH from the current device to host over the same shell.
+
+    Pass username=None for 'ssh <ip>' instead of 'ssh -l <user> <ip>'.
+    Returns True once we are sitting at the target's prompt.
+    """
+    command = f"ssh -l {username} {host}" if username else f"ssh {host}"
+    if shell.echo:
+        print(f"\n[SSH] {command}")
+    shell.send(f"{command}\n")
+    result = shell.expect(timeout=timeout)
+
+    # First-time host key prompt
+    if result.prompt == "confirm":
+        shell.send("yes\n")
+        result = shell.expect(timeout=timeout)
+    if result.prompt == "username" and username:
+        shell.send(f"{username}\n")
+        result = shell.expect(timeout=timeout)
+    if result.prompt == "password":
+        shell.send(f"{password}\n")
+        result = shell.expect(timeout=timeout)
+
+    if result.prompt == "device" and not result.errors:
+        shell.hops.append(shell.host)
+        shell.host = host
+        shell.show_cache.clear()
+        return True
+
+    print(f"\n[ERROR] Could not hop to {host}: {'; '.join(result.errors) or 'no prompt'}")
+    if result.prompt != "device":
+        # Abandon a hung ssh / password prompt and get back to our own prompt
+        shell.send("\x03")
+        shell.expect(timeout=2)
+    return False
+
+
+def exit_hop(shell):
+    """Leave the current device and return to the one we hopped from"""
+    shell.send("exit\n")
+    shell.expect()
+    shell.show_cache.clear()
+    if shell.hops:
+        shell.host = shell.hops.pop()
+
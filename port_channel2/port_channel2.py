@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
-import paramiko
-import time
-import socket
 import re
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netlib import core_session, device_facts, push_config, run_parallel, send_command, show
 
 CORE_IP = "192.168.100.110"
 USERNAME = "cisco"
@@ -16,49 +18,22 @@ ACCESS_SWITCHES = {
     "10.20.39.25": 14
 }
 
-def read_shell_output(shell, timeout=2):
-    """Read available output from shell"""
-    output = ""
-    shell.settimeout(timeout)
-    try:
-        while True:
-            if shell.recv_ready():
-                data = shell.recv(4096).decode('utf-8', errors='ignore')
-                output += data
-                print(data, end='')
-            else:
-                break
-    except socket.timeout:
-        pass
-    return output
-
-def send_command(shell, command, delay=2.0):
-    """Send command and return output"""
-    print(f"\n[COMMAND] {command}")
-    shell.send(f"{command}\n")
-    time.sleep(delay)
-    output = read_shell_output(shell)
-    # Add extra delay for certain commands
-    if any(keyword in command.lower() for keyword in ['configure', 'interface', 'show']):
-        time.sleep(1)
-    return output
+# How many switches to configure at the same time (1 = one after another)
+MAX_WORKERS = 4
 
 def get_interface_prefix(shell):
     """Determine if switch uses GigabitEthernet or TenGigabitEthernet"""
     print(f"\n[CHECK] Determining interface naming convention...")
     
-    # Try show interfaces brief to see naming
-    output = send_command(shell, "show ip interface brief", delay=2)
+    # Cached per switch; only a new, replaced or reloaded switch is rediscovered
+    naming = device_facts(shell)["naming"]
     
-    if "TenGigabitEthernet" in output:
+    if "Te" in naming:
         print("[INFO] Switch uses TenGigabitEthernet naming")
         return "TenGigabitEthernet"
-    elif "GigabitEthernet" in output:
+    elif "Gi" in naming:
         print("[INFO] Switch uses GigabitEthernet naming")
         return "GigabitEthernet"
-    elif "Gi" in output:
-        print("[INFO] Switch uses abbreviated Gi naming")
-        return "GigabitEthernet"  # Full name will be expanded
     else:
         # Default to GigabitEthernet
         print("[WARNING] Could not determine interface naming, defaulting to GigabitEthernet")
@@ -70,13 +45,13 @@ def check_interface_range_availability(shell, interface_prefix, port_range="1/1/
     print(f"\n[CHECK] Checking interface range: {full_range}")
     
     # First check if interfaces exist
-    output = send_command(shell, f"show interfaces {interface_prefix}1/1/1 status", delay=2)
+    output = send_command(shell, f"show interfaces {interface_prefix}1/1/1 status")
     
     # Check if interface exists
     if "Invalid input" in output or "Invalid interface" in output:
         # Try abbreviated form
         if interface_prefix == "GigabitEthernet":
-            output = send_command(shell, "show interfaces Gi1/1/1 status", delay=2)
+            output = send_command(shell, "show interfaces Gi1/1/1 status")
             if "Invalid input" in output or "Invalid interface" in output:
                 print(f"[ERROR] Interface {interface_prefix}1/1/1 does not exist!")
                 return False, []
@@ -93,10 +68,10 @@ def check_interface_range_availability(shell, interface_prefix, port_range="1/1/
         else:
             cmd = f"show interfaces {interface} status"
         
-        output = send_command(shell, cmd, delay=2)
+        rows = show(shell, cmd)
         
         # Check for connected status
-        if "connected" in output.lower() or ("up" in output.lower() and "down" not in output.lower()):
+        if any(row.status == "connected" for row in rows):
             print(f"[WARNING] {interface} appears to be CONNECTED/UP!")
             connected_interfaces.append(interface)
         else:
@@ -119,18 +94,15 @@ def configure_port_channel(shell, interface_prefix, po_group, connected_interfac
     
     # Step 1: Create Port-Channel interface
     commands = [
-        "configure terminal",
         f"interface Port-channel{po_group}",
         "description CONFIGURED-BY-SCRIPT",
         "switchport mode trunk",
         "switchport trunk allowed vlan all",
         "spanning-tree portfast trunk",
         "no shutdown",
-        "end"
     ]
     
-    for cmd in commands:
-        send_command(shell, cmd)
+    push_config(shell, commands)
     
     # Step 2: Configure interfaces
     if connected_interfaces:
@@ -149,7 +121,6 @@ def configure_port_channel(shell, interface_prefix, po_group, connected_interfac
             print(f"{'~'*40}")
             
             int_commands = [
-                "configure terminal",
                 f"interface {interface}",
                 "description PORT-CHANNEL-MEMBER",
                 "switchport mode trunk",
@@ -157,11 +128,9 @@ def configure_port_channel(shell, interface_prefix, po_group, connected_interfac
                 "spanning-tree portfast trunk",
                 f"channel-group {po_group} mode active",
                 "no shutdown",
-                "end"
             ]
             
-            for cmd in int_commands:
-                send_command(shell, cmd)
+            push_config(shell, int_commands)
             
             print(f"[OK] {interface} added to Port-channel{po_group}")
     else:
@@ -172,7 +141,6 @@ def configure_port_channel(shell, interface_prefix, po_group, connected_interfac
         
         # Use interface range command
         range_commands = [
-            "configure terminal",
             f"interface range {interface_prefix}1/1/1-2",
             "description PORT-CHANNEL-MEMBER",
             "switchport mode trunk",
@@ -180,11 +148,9 @@ def configure_port_channel(shell, interface_prefix, po_group, connected_interfac
             "spanning-tree portfast trunk",
             f"channel-group {po_group} mode active",
             "no shutdown",
-            "end"
         ]
         
-        for cmd in range_commands:
-            send_command(shell, cmd)
+        push_config(shell, range_commands)
         
         print(f"[OK] Interface range added to Port-channel{po_group}")
     
@@ -224,6 +190,44 @@ def verify_configuration(shell, interface_prefix, po_group):
     print("\n[VERIFY] Port-channel Switchport Configuration:")
     send_command(shell, f"show interfaces Port-channel{po_group} switchport")
 
+def configure_switch(core, switch_ip):
+    """Run the whole port channel workflow on one access switch"""
+    po_group = ACCESS_SWITCHES[switch_ip]
+    print(f"\n{'='*70}")
+    print(f"CONFIGURING: {switch_ip}")
+    print(f"Port-Channel Group: {po_group}")
+    print(f"{'='*70}")
+    
+    # SSH to access switch on its own core channel
+    print(f"\n[SSH] Connecting to {switch_ip}...")
+    with core.hop(switch_ip) as shell:
+        # Determine interface naming convention
+        interface_prefix = get_interface_prefix(shell)
+        
+        # Check interface availability
+        available, connected_interfaces = check_interface_range_availability(shell, interface_prefix)
+        
+        if not available:
+            print(f"\n❌ Cannot configure {switch_ip} - interfaces not available")
+            print("[SSH] Exiting switch...")
+            return False
+        
+        # Configure port channel
+        success = configure_port_channel(shell, interface_prefix, po_group, connected_interfaces)
+        
+        if success:
+            # Verify configuration
+            verify_configuration(shell, interface_prefix, po_group)
+            
+            print(f"\n[SSH] Exiting {switch_ip}...")
+        else:
+            print(f"\n❌ FAILED: Could not configure Port-channel{po_group} on {switch_ip}")
+            print("[SSH] Exiting switch...")
+            return False
+    
+    print(f"\n✅ SUCCESS: {switch_ip} → Port-channel{po_group} configured")
+    return True
+
 def main():
     print("="*70)
     print("PORT CHANNEL CONFIGURATION SCRIPT")
@@ -234,82 +238,20 @@ def main():
     print("- Checks interface connectivity before configuring")
     print("- Configures individual interfaces if range has connected ports")
     print("- Full verification after configuration")
+    print(f"- Configures up to {MAX_WORKERS} switches at the same time")
     print("="*70)
     
     try:
-        # Connect to core switch
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(CORE_IP, username=USERNAME, password=PASSWORD, timeout=20)
-        print("✓ Connected to Core Switch")
-        
-        shell = ssh.invoke_shell()
-        shell.settimeout(10)
-        time.sleep(3)
-        
-        # Read initial banner
-        read_shell_output(shell)
-        
-        for switch_ip, po_group in ACCESS_SWITCHES.items():
-            print(f"\n{'='*70}")
-            print(f"CONFIGURING: {switch_ip}")
-            print(f"Port-Channel Group: {po_group}")
-            print(f"{'='*70}")
-            
-            # SSH to access switch
-            print(f"\n[SSH] Connecting to {switch_ip}...")
-            shell.send(f"ssh -l {USERNAME} {switch_ip}\n")
-            time.sleep(3)
-            read_shell_output(shell)
-            
-            # Send password
-            print(f"\n[SSH] Sending password...")
-            shell.send(f"{PASSWORD}\n")
-            time.sleep(3)
-            read_shell_output(shell)
-            
-            # Determine interface naming convention
-            interface_prefix = get_interface_prefix(shell)
-            
-            # Check interface availability
-            available, connected_interfaces = check_interface_range_availability(shell, interface_prefix)
-            
-            if not available:
-                print(f"\n❌ Cannot configure {switch_ip} - interfaces not available")
-                print("[SSH] Exiting switch...")
-                shell.send("exit\n")
-                time.sleep(2)
-                read_shell_output(shell)
-                continue
-            
-            # Configure port channel
-            success = configure_port_channel(shell, interface_prefix, po_group, connected_interfaces)
-            
-            if success:
-                # Verify configuration
-                verify_configuration(shell, interface_prefix, po_group)
-                
-                print(f"\n[SSH] Exiting {switch_ip}...")
-                shell.send("exit\n")
-                time.sleep(2)
-                read_shell_output(shell)
-                
-                print(f"\n✅ SUCCESS: {switch_ip} → Port-channel{po_group} configured")
-            else:
-                print(f"\n❌ FAILED: Could not configure Port-channel{po_group} on {switch_ip}")
-                print("[SSH] Exiting switch...")
-                shell.send("exit\n")
-                time.sleep(2)
-                read_shell_output(shell)
-        
-        shell.close()
-        ssh.close()
+        # One core login (or warm broker sessions); each switch runs on its own channel, failures stay per switch
+        with core_session(CORE_IP, USERNAME, PASSWORD, max_channels=MAX_WORKERS, echo=MAX_WORKERS == 1) as core:
+            results = run_parallel(lambda switch_ip: configure_switch(core, switch_ip), ACCESS_SWITCHES, MAX_WORKERS)
         
         print(f"\n{'='*70}")
         print("CONFIGURATION SUMMARY")
         print("="*70)
         for switch_ip, po_group in ACCESS_SWITCHES.items():
-            print(f"  {switch_ip}: Port-channel{po_group}")
+            status = "OK" if results[switch_ip] is True else "FAILED"
+            print(f"  {switch_ip}: Port-channel{po_group} - {status}")
         print("="*70)
         print("✓ Script execution completed")
         
@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
-import paramiko
-import time
-import socket
 import re
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netlib import SAVE_TIMEOUT, core_session, device_facts, push_config, run_parallel, send_command, show
 
 # --- Configuration ---
 CORE_IP = "192.168.100.110"
@@ -16,118 +18,67 @@ ACCESS_SWITCHES = {
     "10.20.39.25": 14  
 }
 
-def read_shell_output(shell, timeout=2):
-    """Read available output from the shell."""
-    output = ""
-    shell.settimeout(timeout)
-    try:
-        while True:
-            if shell.recv_ready():
-                data = shell.recv(4096).decode('utf-8', errors='ignore')
-                output += data
-                print(data, end='') 
-            else:
-                break
-    except socket.timeout:
-        pass
-    return output
-
-def send_safe_cmd(shell, command, wait=1.5):
-    """Flush buffer and send command."""
-    read_shell_output(shell, timeout=0.5) 
-    shell.send(f"{command}\n")
-    time.sleep(wait)
-    return read_shell_output(shell)
+# How many switches to configure at the same time (1 = one after another)
+MAX_WORKERS = 4
 
 def get_prefix(shell):
     """Detect if switch uses Te (TenGigabit) or Gi (Gigabit)."""
-    output = send_safe_cmd(shell, "show ip interface brief")
-    if "Te1/1/1" in output or "TenGigabit" in output:
+    # Cached per switch; only a new, replaced or reloaded switch is rediscovered
+    if "Te" in device_facts(shell)["naming"]:
         return "Te"
     return "Gi"
 
-try:
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh.connect(CORE_IP, username=USERNAME, password=PASSWORD, timeout=20)
-    
-    shell = ssh.invoke_shell()
-    time.sleep(2)
-    read_shell_output(shell) # Clear core banner
-
-    for switch_ip, po_group in ACCESS_SWITCHES.items():
-        print(f"\n\n{'='*60}")
-        print(f">>> TARGETING: {switch_ip} (Group {po_group})")
-        print(f"{'='*60}")
-        
-        # Clear buffer before jumping
-        read_shell_output(shell, timeout=0.5)
-        shell.send(f"ssh -l {USERNAME} {switch_ip}\n")
-        
-        # FIX: Loop to wait for Password prompt
-        authenticated = False
-        for _ in range(5): # Try for 10 seconds total
-            time.sleep(2)
-            response = read_shell_output(shell)
-            if "Password:" in response or "word:" in response:
-                shell.send(f"{PASSWORD}\n")
-                time.sleep(3)
-                authenticated = True
-                break
-            elif "timed out" in response or "refused" in response:
-                print(f"\n[!] SKIP: Host {switch_ip} is UNREACHABLE.")
-                break
-        
-        if not authenticated:
-            print(f"\n[!] SKIP: No response/Password prompt from {switch_ip}.")
-            shell.send("\x03") # Ctrl+C to cancel hung SSH
-            time.sleep(1)
-            continue
-
-        # Verify successful login
-        prompt_check = read_shell_output(shell)
-        if "#" not in prompt_check and ">" not in prompt_check:
-            print(f" [!] ERROR: Login failed on {switch_ip}.")
-            shell.send("exit\n")
-            continue
+def configure_switch(core, switch_ip):
+    """Bundle the uplinks on one access switch on its own core channel"""
+    po_group = ACCESS_SWITCHES[switch_ip]
+    print(f"\n\n{'='*60}")
+    print(f">>> TARGETING: {switch_ip} (Group {po_group})")
+    print(f"{'='*60}")
 
+    with core.hop(switch_ip) as shell:
         # CONFIGURATION BLOCK
-        send_safe_cmd(shell, "terminal length 0")
+        send_command(shell, "terminal length 0")
         prefix = get_prefix(shell)
         print(f" [INFO] Detected Interface Prefix: {prefix}")
         
         # Safety Check
-        status = send_safe_cmd(shell, "show interface status")
-        if f"{prefix}1/1/1" in status and "connected" in status.lower():
+        uplinks = {f"{prefix}1/1/1", f"{prefix}1/1/2"}
+        if any(row.port in uplinks and row.status == "connected" for row in show(shell, "show interface status")):
             print(f" [!] SKIPPING: Interfaces on {switch_ip} are already CONNECTED.")
-            send_safe_cmd(shell, "exit")
-            continue
+            return "SKIPPED"
 
         commands = [
-            "configure terminal",
             f"interface port-channel {po_group}",
             "switchport mode trunk",
             "exit",
             f"interface range {prefix}1/1/1 - 2",
             "switchport mode trunk",
             f"channel-group {po_group} mode active",
-            "end",
-            "write memory",
-            "show etherchannel summary" 
         ]
         
-        for cmd in commands:
-            send_safe_cmd(shell, cmd)
+        push_config(shell, commands)
+        send_command(shell, "write memory", timeout=SAVE_TIMEOUT)
+        send_command(shell, "show etherchannel summary")
         
         print(f"\n [✓] SUCCESS: {switch_ip} is configured.")
-        send_safe_cmd(shell, "exit") # Return to Core
+    return "CONFIGURED"
+
+try:
+    # core.hop() cancels a hung or refused SSH and raises, so only that switch fails
+    with core_session(CORE_IP, USERNAME, PASSWORD, max_channels=MAX_WORKERS, echo=MAX_WORKERS == 1) as core:
+        results = run_parallel(lambda switch_ip: configure_switch(core, switch_ip), ACCESS_SWITCHES, MAX_WORKERS)
 
-    ssh.close()
     print("\n" + "="*60)
+    for switch_ip, result in results.items():
+        if isinstance(result, ConnectionError):
+            result = "UNREACHABLE"
+        elif isinstance(result, Exception):
+            result = "ERROR"
+        print(f" {switch_ip}: {result}")
     print("ALL ACCESSIBLE HOSTS PROCESSED.")
     print("="*60)
 
 except Exception as e:
     print(f"\n[CRITICAL ERROR] {e}")
 
-input("\nPress Enter to close...")
\ No newline at end of file
+input("\nPress Enter to close...")
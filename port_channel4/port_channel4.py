@@ -1,8 +1,12 @@
 from netmiko import ConnectHandler
 from getpass import getpass
 from datetime import datetime
+import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netlib import run_parallel
+
 # ==============================
 # USER INPUT SECTION
 # ==============================
@@ -21,6 +25,9 @@ PORT_CHANNEL_ID = 2
 MEMBER_INTERFACES = ["GigabitEthernet1/0/47", "GigabitEthernet1/0/48"]
 TRUNK_ALLOWED_VLANS = "10,20,30,39"
 
+# How many switches to configure at the same time (1 = one after another)
+MAX_WORKERS = 4
+
 # ==============================
 # FUNCTIONS
 # ==============================
@@ -84,13 +91,20 @@ if __name__ == "__main__":
     start = datetime.now()
     print(f"=== Deployment started at {start} ===")
 
-    try:
-        for switch_ip, vlan in ACCESS_SWITCHES.items():
-            configure_port_channel(switch_ip, vlan)
+    # One netmiko connection per switch, MAX_WORKERS at a time
+    results = run_parallel(
+        lambda switch_ip: configure_port_channel(switch_ip, ACCESS_SWITCHES[switch_ip]),
+        ACCESS_SWITCHES,
+        MAX_WORKERS,
+    )
 
-    except Exception as e:
-        print(f"\nERROR: {e}")
-        sys.exit(1)
+    print("\n=== Summary ===")
+    for switch_ip, result in results.items():
+        status = f"FAILED ({result})" if isinstance(result, Exception) else "SUCCESS"
+        print(f"{switch_ip}: {status}")
 
     end = datetime.now()
     print(f"\n=== Deployment completed at {end} ===")
+
+    if any(isinstance(result, Exception) for result in results.values()):
+        sys.exit(1)
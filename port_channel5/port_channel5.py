@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
-import paramiko
-import time
-import socket
 import re
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netlib import SAVE_TIMEOUT, core_session, device_facts, filter_lines, include, parse, push_config, pushdown, run_parallel, select, send_batch, send_command
 
 CORE_IP = "192.168.100.110"
 USERNAME = "cisco"
@@ -16,60 +18,25 @@ ACCESS_SWITCHES = {
     "10.20.39.25": 14
 }
 
-def read_shell_output(shell, timeout=2):
-    """Read available output from shell"""
-    output = ""
-    shell.settimeout(timeout)
-    try:
-        while True:
-            if shell.recv_ready():
-                data = shell.recv(4096).decode('utf-8', errors='ignore')
-                output += data
-                print(data, end='')
-            else:
-                break
-    except socket.timeout:
-        pass
-    return output
-
-def send_command(shell, command, delay=2.0):
-    """Send command and return output"""
-    print(f"\n[COMMAND] {command}")
-    shell.send(f"{command}\n")
-    time.sleep(delay)
-    output = read_shell_output(shell)
-    return output
+# How many switches to configure at the same time (1 = one after another)
+MAX_WORKERS = 4
 
 def get_actual_interface_naming(shell):
     """Determine the actual interface naming convention used by the switch"""
     print(f"\n[CHECK] Discovering interface naming convention...")
     
-    # Send test commands to see interface naming
-    test_output = send_command(shell, "show interfaces status", delay=3)
+    # Port names as 'show interfaces status' prints them (TeX/X/X, GiX/X/X),
+    # cached per switch; only a new, replaced or reloaded switch is rediscovered
+    naming = device_facts(shell)["naming"]
     
     # Look for TenGigabitEthernet first
-    if "TenGigabitEthernet" in test_output or "Ten" in test_output or "tengig" in test_output.lower():
+    if "Te" in naming:
         print("[INFO] Switch has TenGigabitEthernet interfaces")
-        
-        # Check exact format
-        if "TenGigabitEthernet" in test_output:
-            print("[INFO] Using 'TenGigabitEthernet' format")
-            return "TenGigabitEthernet", False
-        elif "Te " in test_output:
-            print("[INFO] Using 'Te X/X/X' format (with space)")
-            return "Te", True
-        elif "Te" in test_output and not "TenGigabitEthernet" in test_output:
-            print("[INFO] Using 'TeX/X/X' format (no space)")
-            return "Te", False
+        print("[INFO] Using 'TeX/X/X' format (no space)")
+        return "Te", False
     
     # Look for GigabitEthernet
-    if "GigabitEthernet" in test_output:
-        print("[INFO] Using 'GigabitEthernet' format")
-        return "GigabitEthernet", False
-    elif "Gi " in test_output:
-        print("[INFO] Using 'Gi X/X/X' format (with space)")
-        return "Gi", True
-    elif "Gi" in test_output:
+    if "Gi" in naming:
         print("[INFO] Using 'GiX/X/X' format (no space)")
         return "Gi", False
     
@@ -77,47 +44,37 @@ def get_actual_interface_naming(shell):
     print("[WARNING] Could not determine interface naming, defaulting to GigabitEthernet")
     return "GigabitEthernet", False
 
+def find_port(rows, interface_prefix, port):
+    """'show interfaces status' row for port (e.g. 1/1/1) with the given prefix, or None"""
+    for row in rows:
+        kind, number = re.match(r"([A-Za-z\-]*)(.*)", row.port).groups()
+        if number == port and kind[:2].lower() == interface_prefix[:2].lower():
+            return row
+    return None
+
 def check_specific_interfaces(shell, interface_prefix, with_space):
     """Check specific interfaces 1/1/1 and 1/1/2"""
     print(f"\n[CHECK] Checking specific interfaces...")
     
     interfaces_to_check = []
     
-    # First check what interfaces actually exist
-    output = send_command(shell, "show interfaces status", delay=3)
+    # First check what interfaces actually exist; only the 1/1/1 and 1/1/2 rows come back
+    rows = select(shell, "show interfaces status", include("1/1/[12]"))
     
     # Look for interfaces 1/1/1 and 1/1/2
     for port in ["1/1/1", "1/1/2"]:
-        interface_found = False
-        
-        # Try different naming patterns
-        patterns = [
-            f"{interface_prefix}{port}",
-            f"{interface_prefix} {port}",
-            f"{interface_prefix.lower()}{port}",
-        ]
-        
-        for pattern in patterns:
-            if pattern in output:
-                print(f"[FOUND] Interface exists: {pattern}")
-                
-                # Check if it's connected
-                lines = output.split('\n')
-                for line in lines:
-                    if pattern in line:
-                        if "connected" in line.lower():
-                            print(f"[WARNING] {pattern} is CONNECTED!")
-                            interfaces_to_check.append((pattern, True))  # True = connected
-                        else:
-                            print(f"[OK] {pattern} is NOT CONNECTED")
-                            interfaces_to_check.append((pattern, False))  # False = not connected
-                        interface_found = True
-                        break
-                break
-        
-        if not interface_found:
+        row = find_port(rows, interface_prefix, port)
+        if row is None:
             print(f"[ERROR] Interface {interface_prefix}{port} not found!")
             return False, []
+        
+        print(f"[FOUND] Interface exists: {row.port}")
+        if row.status == "connected":
+            print(f"[WARNING] {row.port} is CONNECTED!")
+            interfaces_to_check.append((row.port, True))  # True = connected
+        else:
+            print(f"[OK] {row.port} is NOT CONNECTED ({row.status})")
+            interfaces_to_check.append((row.port, False))  # False = not connected
     
     # Count connected interfaces
     connected_count = sum(1 for _, connected in interfaces_to_check if connected)
@@ -140,57 +97,35 @@ def configure_port_channel_for_switch(shell, switch_ip, interface_prefix, with_s
     
     # Step 1: Check current port-channel status
     print(f"\n[CHECK] Current port-channel status:")
-    send_command(shell, "show etherchannel summary", delay=2)
+    send_command(shell, "show etherchannel summary")
     
     # Step 2: Create or configure Port-Channel interface
     commands = [
-        "configure terminal",
         f"interface Port-channel{po_group}",
         "description CONFIGURED-BY-SCRIPT",
         "switchport mode trunk",
         "switchport trunk allowed vlan all",
         "spanning-tree portfast trunk",
         "no shutdown",  # Ensure it's not shutdown
-        "end"
     ]
     
-    for cmd in commands:
-        send_command(shell, cmd)
+    push_config(shell, commands)
     
     # Step 3: Check what interfaces actually exist
     print(f"\n[CHECK] Finding available interfaces...")
     
-    # Get list of all interfaces
-    output = send_command(shell, "show interfaces status", delay=3)
+    # Get the 1/1/1 and 1/1/2 rows
+    rows = select(shell, "show interfaces status", include("1/1/[12]"))
     
     # Look for interfaces 1/1/1 and 1/1/2 with our prefix
     interfaces_to_configure = []
     
     for port in ["1/1/1", "1/1/2"]:
-        # Try different formats
-        formats_to_try = []
-        
-        if with_space:
-            formats_to_try.append(f"{interface_prefix} {port}")
+        row = find_port(rows, interface_prefix, port)
+        if row:
+            print(f"[FOUND] Will configure: {row.port}")
+            interfaces_to_configure.append(row.port)
         else:
-            formats_to_try.append(f"{interface_prefix}{port}")
-        
-        # Also try common variations
-        formats_to_try.append(f"{interface_prefix.lower()}{port}")
-        if interface_prefix == "Te":
-            formats_to_try.append(f"TenGigabitEthernet{port}")
-        elif interface_prefix == "Gi":
-            formats_to_try.append(f"GigabitEthernet{port}")
-        
-        interface_found = False
-        for fmt in formats_to_try:
-            if fmt in output:
-                print(f"[FOUND] Will configure: {fmt}")
-                interfaces_to_configure.append(fmt)
-                interface_found = True
-                break
-        
-        if not interface_found:
             print(f"[WARNING] Interface {port} not found with prefix {interface_prefix}")
     
     if not interfaces_to_configure:
@@ -222,7 +157,6 @@ def configure_port_channel_for_switch(shell, switch_ip, interface_prefix, with_s
                 print(f"{'~'*40}")
                 
                 range_commands = [
-                    "configure terminal",
                     f"interface range {interface_range}",
                     "description PORT-CHANNEL-MEMBER",
                     "switchport mode trunk",
@@ -230,15 +164,11 @@ def configure_port_channel_for_switch(shell, switch_ip, interface_prefix, with_s
                     "spanning-tree portfast trunk",
                     f"channel-group {po_group} mode active",
                     "no shutdown",
-                    "end"
                 ]
                 
-                for cmd in range_commands:
-                    output = send_command(shell, cmd, delay=2)
-                    if "Invalid input" in output or "% Invalid" in output:
-                        print(f"[WARNING] Range command failed, configuring individually...")
-                        # Fall back to individual config
-                        break
+                if push_config(shell, range_commands).errors:
+                    print(f"[WARNING] Range command failed, configuring individually...")
+                    # Fall back to individual config
                 else:
                     # Range succeeded
                     print(f"[OK] Interface range configured successfully")
@@ -253,7 +183,6 @@ def configure_port_channel_for_switch(shell, switch_ip, interface_prefix, with_s
         print(f"{'~'*30}")
         
         int_commands = [
-            "configure terminal",
             f"interface {interface}",
             "description PORT-CHANNEL-MEMBER",
             "switchport mode trunk",
@@ -261,12 +190,10 @@ def configure_port_channel_for_switch(shell, switch_ip, interface_prefix, with_s
             "spanning-tree portfast trunk",
             f"channel-group {po_group} mode active",
             "no shutdown",
-            "end",
-            f"show run int {interface}"  # Verify
         ]
         
-        for cmd in int_commands:
-            send_command(shell, cmd, delay=2)
+        push_config(shell, int_commands)
+        send_command(shell, f"show run int {interface}")  # Verify
         
         print(f"[OK] {interface} added to Port-channel{po_group}")
     
@@ -281,67 +208,107 @@ def verify_port_channel_configuration(shell, switch_ip, po_group):
     
     # 1. Show detailed etherchannel summary
     print("\n[VERIFY] Detailed Etherchannel Summary:")
-    output = send_command(shell, "show etherchannel detail", delay=3)
+    output = send_command(shell, "show etherchannel detail")
     
     # Check for (SD) - Shutdown status
     if "(SD)" in output:
         print("[ERROR] Port-channel is SHUTDOWN! Need to investigate...")
         # Try to fix
-        send_command(shell, "configure terminal", delay=1)
-        send_command(shell, f"interface Port-channel{po_group}", delay=1)
-        send_command(shell, "no shutdown", delay=1)
-        send_command(shell, "end", delay=1)
-        send_command(shell, "write memory", delay=2)
+        push_config(shell, [f"interface Port-channel{po_group}", "no shutdown"])
+        send_command(shell, "write memory", timeout=SAVE_TIMEOUT)
+    
+    # 2-7. Everything else is read-only, so send it as one pipelined batch;
+    # the member status check only needs the 1/1/1 and 1/1/2 rows
+    status_command, status_filters = pushdown("show interfaces status", [include("1/1/[12]")], shell.host)
+    summary, po_status, po_switchport, po_config, int_status, lacp = send_batch(shell, [
+        "show etherchannel summary",
+        f"show interfaces Port-channel{po_group}",
+        f"show interfaces Port-channel{po_group} switchport",
+        f"show run interface Port-channel{po_group}",
+        status_command,
+        "show lacp neighbor",
+    ])
     
-    # 2. Show regular summary
     print("\n[VERIFY] Etherchannel Summary:")
-    send_command(shell, "show etherchannel summary", delay=2)
+    print(summary)
     
-    # 3. Show port-channel interface status
     print("\n[VERIFY] Port-channel Interface Status:")
-    send_command(shell, f"show interfaces Port-channel{po_group}", delay=2)
+    print(po_status)
     
-    # 4. Show port-channel switchport config
     print("\n[VERIFY] Port-channel Switchport Configuration:")
-    send_command(shell, f"show interfaces Port-channel{po_group} switchport", delay=2)
+    print(po_switchport)
     
-    # 5. Show running config for port-channel
     print("\n[VERIFY] Port-channel Running Config:")
-    send_command(shell, f"show run interface Port-channel{po_group}", delay=2)
+    print(po_config)
     
     # 6. Show member interfaces
     print("\n[VERIFY] Member Interface Status:")
     
-    # Try to find member interfaces from output
-    output = send_command(shell, "show interfaces status", delay=3)
-    lines = output.split('\n')
-    
-    for line in lines:
-        if "1/1/1" in line or "1/1/2" in line:
-            print(f"  {line.strip()}")
+    for row in parse("show interfaces status", filter_lines(int_status, status_filters)):
+        if row.port.endswith(("1/1/1", "1/1/2")):
+            print(f"  {row.port}: {row.status} vlan {row.vlan} {row.duplex} {row.speed}")
     
     # 7. Show lacp neighbors if any
     print("\n[VERIFY] LACP Neighbors:")
-    send_command(shell, "show lacp neighbor", delay=2)
+    print(lacp)
     
-    # 8. Final verification
+    # 8. Final verification (summary above was taken after any fix)
     print("\n[VERIFY] Final Status Check:")
-    output = send_command(shell, "show etherchannel summary", delay=2)
+    channel = next((c for c in parse("show etherchannel summary", summary) if c.group == po_group), None)
     
     # Check if port-channel is formed
-    if f"Po{po_group}" in output and "(SU)" in output:
+    if channel and "U" in channel.flags:
         print(f"✅ SUCCESS: Port-channel{po_group} is UP and formed!")
         return True
-    elif f"Po{po_group}" in output and "(SD)" in output:
+    elif channel and "D" in channel.flags:
         print(f"⚠️ WARNING: Port-channel{po_group} exists but is SHUTDOWN")
         return False
-    elif f"Po{po_group}" in output:
+    elif channel:
         print(f"ℹ️ INFO: Port-channel{po_group} exists")
         return True
     else:
         print(f"❌ ERROR: Port-channel{po_group} not found!")
         return False
 
+def configure_switch(core, switch_ip):
+    """Configure and verify the port channel on one access switch; returns its status"""
+    po_group = ACCESS_SWITCHES[switch_ip]
+    print(f"\n{'='*70}")
+    print(f"CONFIGURING: {switch_ip}")
+    print(f"Port-Channel Group: {po_group}")
+    print(f"{'='*70}")
+    
+    # SSH to access switch on its own core channel
+    print(f"\n[SSH] Connecting to {switch_ip}...")
+    with core.hop(switch_ip) as shell:
+        # Set terminal length for better output
+        send_command(shell, "terminal length 0")
+        
+        # Discover interface naming
+        print(f"\n[INFO] Switch: {switch_ip}")
+        interface_prefix, with_space = get_actual_interface_naming(shell)
+        print(f"[CONFIG] Interface format: {interface_prefix} (space={with_space})")
+        
+        # Configure port channel
+        success = configure_port_channel_for_switch(shell, switch_ip, interface_prefix, with_space, po_group)
+        
+        if success:
+            # Verify configuration
+            verified = verify_port_channel_configuration(shell, switch_ip, po_group)
+            
+            if verified:
+                print(f"\n✅ SUCCESS: {switch_ip} → Port-channel{po_group} configured and verified")
+                status = "SUCCESS"
+            else:
+                print(f"\n⚠️ PARTIAL: {switch_ip} → Port-channel{po_group} configured but needs attention")
+                status = "NEEDS_ATTENTION"
+        else:
+            print(f"\n❌ FAILED: Could not configure Port-channel{po_group} on {switch_ip}")
+            status = "FAILED"
+        
+        print(f"\n[SSH] Exiting {switch_ip}...")
+    return status
+
 def main():
     print("="*70)
     print("FIXED PORT CHANNEL CONFIGURATION SCRIPT")
@@ -353,72 +320,11 @@ def main():
     print("- Complete verification with status checks")
     print("="*70)
     
-    results = {}
-    
     try:
-        # Connect to core switch
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(CORE_IP, username=USERNAME, password=PASSWORD, timeout=20)
-        print("✓ Connected to Core Switch")
-        
-        shell = ssh.invoke_shell()
-        shell.settimeout(10)
-        time.sleep(3)
-        
-        # Read initial banner
-        read_shell_output(shell)
-        
-        for switch_ip, po_group in ACCESS_SWITCHES.items():
-            print(f"\n{'='*70}")
-            print(f"CONFIGURING: {switch_ip}")
-            print(f"Port-Channel Group: {po_group}")
-            print(f"{'='*70}")
-            
-            # SSH to access switch
-            print(f"\n[SSH] Connecting to {switch_ip}...")
-            shell.send(f"ssh -l {USERNAME} {switch_ip}\n")
-            time.sleep(3)
-            read_shell_output(shell)
-            
-            # Send password
-            print(f"\n[SSH] Sending password...")
-            shell.send(f"{PASSWORD}\n")
-            time.sleep(3)
-            read_shell_output(shell)
-            
-            # Set terminal length for better output
-            send_command(shell, "terminal length 0", delay=1)
-            
-            # Discover interface naming
-            print(f"\n[INFO] Switch: {switch_ip}")
-            interface_prefix, with_space = get_actual_interface_naming(shell)
-            print(f"[CONFIG] Interface format: {interface_prefix} (space={with_space})")
-            
-            # Configure port channel
-            success = configure_port_channel_for_switch(shell, switch_ip, interface_prefix, with_space, po_group)
-            
-            if success:
-                # Verify configuration
-                verified = verify_port_channel_configuration(shell, switch_ip, po_group)
-                
-                if verified:
-                    print(f"\n✅ SUCCESS: {switch_ip} → Port-channel{po_group} configured and verified")
-                    results[switch_ip] = "SUCCESS"
-                else:
-                    print(f"\n⚠️ PARTIAL: {switch_ip} → Port-channel{po_group} configured but needs attention")
-                    results[switch_ip] = "NEEDS_ATTENTION"
-            else:
-                print(f"\n❌ FAILED: Could not configure Port-channel{po_group} on {switch_ip}")
-                results[switch_ip] = "FAILED"
-            
-            print(f"\n[SSH] Exiting {switch_ip}...")
-            shell.send("exit\n")
-            time.sleep(2)
-            read_shell_output(shell)
-        
-        shell.close()
-        ssh.close()
+        # One core login (or warm broker sessions); each switch runs on its own channel, a switch that raises is FAILED
+        with core_session(CORE_IP, USERNAME, PASSWORD, max_channels=MAX_WORKERS, echo=MAX_WORKERS == 1) as core:
+            results = run_parallel(lambda switch_ip: configure_switch(core, switch_ip), ACCESS_SWITCHES, MAX_WORKERS)
+        results = {ip: "FAILED" if isinstance(r, Exception) else r for ip, r in results.items()}
         
         # Final summary
         print(f"\n{'='*70}")
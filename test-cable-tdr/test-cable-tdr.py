@@ -1,10 +1,12 @@
-```python
 #!/usr/bin/env python3
-import paramiko
+import os
+import sys
 import time
-import re
 from tabulate import tabulate
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netlib import connect, include, parse, port_counters, run_parallel, run_tdr, select, send_command, shared_store, show
+
 # Access switches to test
 ACCESS_SWITCHES = {
     "10.20.39.21": 11,
@@ -15,59 +17,35 @@ ACCESS_SWITCHES = {
 USERNAME = "cisco"
 PASSWORD = "Cisco1234"
 
-def read_shell_output(shell, timeout=2):
-    """Read available output from shell"""
-    output = ""
-    shell.settimeout(timeout)
-    try:
-        while True:
-            if shell.recv_ready():
-                data = shell.recv(4096).decode('utf-8', errors='ignore')
-                output += data
-            else:
-                break
-    except socket.timeout:
-        pass
-    return output
+# How many switches to test at the same time (1 = one after another)
+MAX_WORKERS = 4
 
-def send_command(shell, command, delay=1.5):
-    """Send command and return output"""
-    shell.send(f"{command}\n")
-    time.sleep(delay)
-    return read_shell_output(shell)
+# Only test ports that are new, changed speed, flapped or got errors since their last
+# good result (history in netlib.tdr_store); the rest are retested every MAX_AGE_DAYS
+INCREMENTAL = False
+MAX_AGE_DAYS = 30
 
 def get_connected_interfaces(shell):
     """Get list of connected interfaces"""
     print(f"\n[INFO] Checking connected interfaces...")
-    output = send_command(shell, "show interface status | include connected", delay=2)
-    
-    connected_interfaces = []
-    lines = output.split('\n')
+    rows = select(shell, "show interfaces status", include("connected"))
     
-    for line in lines:
-        if 'connected' in line.lower():
-            parts = line.split()
-            if parts:
-                interface = parts[0]
-                connected_interfaces.append(interface)
-                print(f"[FOUND] Connected interface: {interface}")
+    connected_interfaces = [row.port for row in rows if row.status == "connected"]
+    for interface in connected_interfaces:
+        print(f"[FOUND] Connected interface: {interface}")
     
     return connected_interfaces
 
-def run_cable_diagnostics(shell, interface):
-    """Run TDR test on interface"""
-    print(f"\n[TEST] Running TDR test on {interface}...")
+def run_cable_diagnostics(shell, interfaces, counters=None):
+    """Run TDR on all interfaces at once; returns {interface: TDR output}"""
+    print(f"\n[TEST] Running TDR test on {len(interfaces)} interfaces...")
     
-    # Run TDR test
-    output = send_command(shell, f"test cable-diagnostics tdr interface {interface}", delay=3)
+    # Trigger every port, then poll until each result is in
+    results = run_tdr(shell, interfaces)
+    # Keep the per-pair results for history queries (python3 -m netlib.tdr_store)
+    shared_store().record(shell.host, results, counters=counters)
     
-    # Wait for test to complete
-    time.sleep(3)
-    
-    # Get TDR results and shows in nice format
-    results_output = send_command(shell, f"show cable-diagnostics tdr interface {interface}", delay=2)
-    
-    return results_output
+    return {interface: result.output for interface, result in results.items()}
 
 def parse_tdr_results(results, interface):
     """Parse TDR results into dictionary"""
@@ -79,22 +57,24 @@ def parse_tdr_results(results, interface):
         'Distance(m)': 'N/A'
     }
     
-    # Parse TDR results
-    lines = results.split('\n')
-    for line in lines:
-        line = line.strip()
-        if 'Pair A' in line:
-            parts = line.split()
-            if len(parts) >= 5:
-                result_data['Status'] = parts[2]  # OK/Open/Short
-                result_data['Length(m)'] = parts[3] if parts[3] != 'N/A' else 'N/A'
-                if len(parts) >= 6:
-                    result_data['Fault'] = parts[4] if parts[4] != 'N/A' else 'N/A'
-                    result_data['Distance(m)'] = parts[5] if len(parts) > 5 and parts[5] != 'N/A' else 'N/A'
+    # Parse TDR results: OK if every pair is Normal, else the first faulty pair
+    pairs = parse("show cable-diagnostics tdr", results)
+    if pairs:
+        pair_a = next((p for p in pairs if p.pair == 'A'), pairs[0])
+        if pair_a.length is not None:
+            result_data['Length(m)'] = str(pair_a.length)
+        fault = next((p for p in pairs if p.status.lower() != 'normal'), None)
+        if fault is None:
+            result_data['Status'] = 'OK'
+        else:
+            result_data['Status'] = fault.status  # Open/Short/Impedance Mis ...
+            result_data['Fault'] = f"Pair {fault.pair}"
+            if fault.length is not None:
+                result_data['Distance(m)'] = str(fault.length)
     
-    # If no Pair A found, check for standard results
+    # If no pairs found, check for standard results
     if result_data['Status'] == 'Unknown':
-        for line in lines:
+        for line in results.split('\n'):
             if 'TDR test' in line or 'cable' in line.lower():
                 if 'passed' in line.lower() or 'ok' in line.lower():
                     result_data['Status'] = 'OK'
@@ -103,39 +83,151 @@ def parse_tdr_results(results, interface):
     
     return result_data
 
-def check_interface_status(shell, interface):
-    """Check basic interface status"""
-    output = send_command(shell, f"show interface {interface}", delay=2)
-    
-    status_data = {
-        'Admin': 'down',
-        'Operational': 'down',
-        'Speed': 'N/A',
-        'Duplex': 'N/A',
-        'Errors': '0'
+def get_interface_counters(shell, interfaces):
+    """Parsed 'show interfaces' record of every interface, from one command"""
+    return port_counters(show(shell, "show interfaces"), interfaces)
+
+def unchanged_result(switch_ip, interface):
+    """Result row of a port skipped by INCREMENTAL: unchanged since its last good result"""
+    store = shared_store()
+    record = store.latest(switch_ip, interface)
+    pair_a = record.pairs.get('A') if record else None
+    state = store.ports(switch_ip).get(interface)
+    since = time.strftime("%Y-%m-%d", time.localtime(state.good)) if state and state.good else "?"
+    return {
+        'Interface': interface,
+        'Status': f'Unchanged since {since}',
+        'Length(m)': str(pair_a[1]) if pair_a and pair_a[1] is not None else 'N/A',
+        'Fault': 'N/A',
+        'Distance(m)': 'N/A'
     }
+
+def check_interface_status(counters, interfaces):
+    """Basic status of every interface from its 'show interfaces' record; returns {interface: status}"""
+    statuses = {}
+    for interface in interfaces:
+        status_data = {
+            'Admin': 'down',
+            'Operational': 'down',
+            'Speed': 'N/A',
+            'Duplex': 'N/A',
+            'Errors': '0'
+        }
+        
+        record = counters.get(interface)
+        if record:
+            status_data['Admin'] = record.admin_status
+            status_data['Operational'] = record.protocol
+            status_data['Speed'] = record.speed or 'N/A'
+            status_data['Duplex'] = record.duplex or 'N/A'
+            status_data['Errors'] = str(record.input_errors)
+        
+        statuses[interface] = status_data
+    
+    return statuses
+
+def test_switch(switch_ip):
+    """Run TDR on every connected interface of one switch; returns its result rows"""
+    print(f"\n{'='*80}")
+    print(f"PROCESSING SWITCH: {switch_ip}")
+    print(f"{'='*80}")
+    
+    all_results = []
     
-    lines = output.split('\n')
-    for line in lines:
-        line = line.strip()
-        if 'line protocol' in line:
-            if 'up' in line:
-                status_data['Admin'] = 'up'
-            if 'up' in line.split()[-1]:
-                status_data['Operational'] = 'up'
-        elif 'BW' in line and 'DLY' in line:
-            parts = line.split(',')
-            for part in parts:
-                if 'b/s' in part:
-                    status_data['Speed'] = part.strip()
-                elif 'duplex' in part:
-                    status_data['Duplex'] = part.strip()
-        elif 'input errors' in line:
-            parts = line.split()
-            if len(parts) > 0:
-                status_data['Errors'] = parts[0]
+    try:
+        # Connect directly to switch
+        print(f"[CONNECT] Connecting to {switch_ip}...")
+        ssh, shell = connect(switch_ip, USERNAME, PASSWORD, echo=False)
+        print(f"✓ Connected to {switch_ip}")
+
+        # Set terminal length
+        send_command(shell, "terminal length 0")
+
+        # Get connected interfaces
+        connected_interfaces = get_connected_interfaces(shell)
+
+        if not connected_interfaces:
+            print(f"[WARNING] No connected interfaces found on {switch_ip}")
+            all_results.append({
+                'Switch': switch_ip,
+                'Interface': 'N/A',
+                'Status': 'No connected interfaces',
+                'Length(m)': 'N/A',
+                'Fault': 'N/A',
+                'Distance(m)': 'N/A'
+            })
+        else:
+            print(f"\n[INFO] Found {len(connected_interfaces)} connected interfaces")
+
+            # Status of every port from one 'show interfaces'
+            print(f"[STATUS] Checking interface status...")
+            counters = get_interface_counters(shell, connected_interfaces)
+            statuses = check_interface_status(counters, connected_interfaces)
+
+            # Skip ports whose cable cannot have changed since their last good result
+            due = connected_interfaces
+            if INCREMENTAL:
+                reasons = shared_store().due_ports(switch_ip, connected_interfaces, counters, MAX_AGE_DAYS)
+                due = list(reasons)
+                for interface, reason in reasons.items():
+                    print(f"[DUE] {interface}: {reason}")
+                print(f"\n[INFO] {len(due)} of {len(connected_interfaces)} interfaces need TDR, "
+                      f"{len(connected_interfaces) - len(due)} unchanged")
+
+            # TDR on all ports at once: one TDR cycle for the whole switch
+            tdr_outputs = run_cable_diagnostics(shell, due, counters) if due else {}
+
+            for interface in connected_interfaces:
+                status_data = statuses[interface]
+
+                # Parse results (unchanged ports keep their last good result)
+                if interface in tdr_outputs:
+                    parsed_data = parse_tdr_results(tdr_outputs[interface], interface)
+                else:
+                    parsed_data = unchanged_result(switch_ip, interface)
+
+                # Combine with switch info
+                final_data = {
+                    'Switch': switch_ip,
+                    'Interface': interface,
+                    'Status': parsed_data['Status'],
+                    'Length(m)': parsed_data['Length(m)'],
+                    'Fault': parsed_data['Fault'],
+                    'Distance(m)': parsed_data['Distance(m)'],
+                    'Admin': status_data['Admin'],
+                    'Operational': status_data['Operational'],
+                    'Speed': status_data['Speed'],
+                    'Duplex': status_data['Duplex']
+                }
+
+                all_results.append(final_data)
+
+                # Print individual results
+                print(f"\n[TDR RESULTS] {interface}:")
+                print(f"  Status: {parsed_data['Status']}")
+                print(f"  Length: {parsed_data['Length(m)']}m")
+                print(f"  Fault: {parsed_data['Fault']}")
+                print(f"  Distance to fault: {parsed_data['Distance(m)']}m")
+                print(f"  Admin/Operational: {status_data['Admin']}/{status_data['Operational']}")
+                print(f"  Speed/Duplex: {status_data['Speed']} / {status_data['Duplex']}")
+
+        # Close connection
+        shell.close()
+        ssh.close()
+        print(f"\n[INFO] Disconnected from {switch_ip}")
+
+    except Exception as e:
+        print(f"\n❌ ERROR connecting to {switch_ip}: {e}")
+        all_results.append({
+            'Switch': switch_ip,
+            'Interface': 'Connection Failed',
+            'Status': f'ERROR: {str(e)[:50]}',
+            'Length(m)': 'N/A',
+            'Fault': 'N/A',
+            'Distance(m)': 'N/A'
+        })
     
-    return status_data
+    return all_results
 
 def main():
     print("="*80)
@@ -145,101 +237,10 @@ def main():
     print("Only testing CONNECTED interfaces")
     print("="*80)
     
+    # Switches are tested side by side, MAX_WORKERS at a time
     all_results = []
-    
-    for switch_ip, po_group in ACCESS_SWITCHES.items():
-        print(f"\n{'='*80}")
-        print(f"PROCESSING SWITCH: {switch_ip}")
-        print(f"{'='*80}")
-        
-        try:
-            # Connect directly to switch
-            print(f"[CONNECT] Connecting to {switch_ip}...")
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            ssh.connect(switch_ip, username=USERNAME, password=PASSWORD, timeout=20)
-            print(f"✓ Connected to {switch_ip}")
-            
-            shell = ssh.invoke_shell()
-            shell.settimeout(10)
-            time.sleep(3)
-            
-            # Read initial banner
-            read_shell_output(shell)
-            
-            # Set terminal length
-            send_command(shell, "terminal length 0", delay=1)
-            
-            # Get connected interfaces
-            connected_interfaces = get_connected_interfaces(shell)
-            
-            if not connected_interfaces:
-                print(f"[WARNING] No connected interfaces found on {switch_ip}")
-                all_results.append({
-                    'Switch': switch_ip,
-                    'Interface': 'N/A',
-                    'Status': 'No connected interfaces',
-                    'Length(m)': 'N/A',
-                    'Fault': 'N/A',
-                    'Distance(m)': 'N/A'
-                })
-            else:
-                print(f"\n[INFO] Found {len(connected_interfaces)} connected interfaces")
-                
-                # Test each connected interface
-                for interface in connected_interfaces:
-                    print(f"\n[TEST] Testing interface {interface}...")
-                    
-                    # Check interface status first
-                    print(f"[STATUS] Checking interface status...")
-                    status_data = check_interface_status(shell, interface)
-                    
-                    # Run TDR test
-                    tdr_results = run_cable_diagnostics(shell, interface)
-                    
-                    # Parse results
-                    parsed_data = parse_tdr_results(tdr_results, interface)
-                    
-                    # Combine with switch info
-                    final_data = {
-                        'Switch': switch_ip,
-                        'Interface': interface,
-                        'Status': parsed_data['Status'],
-                        'Length(m)': parsed_data['Length(m)'],
-                        'Fault': parsed_data['Fault'],
-                        'Distance(m)': parsed_data['Distance(m)'],
-                        'Admin': status_data['Admin'],
-                        'Operational': status_data['Operational'],
-                        'Speed': status_data['Speed'],
-                        'Duplex': status_data['Duplex']
-                    }
-                    
-                    all_results.append(final_data)
-                    
-                    # Print individual results
-                    print(f"\n[TDR RESULTS] {interface}:")
-                    print(f"  Status: {parsed_data['Status']}")
-                    print(f"  Length: {parsed_data['Length(m)']}m")
-                    print(f"  Fault: {parsed_data['Fault']}")
-                    print(f"  Distance to fault: {parsed_data['Distance(m)']}m")
-                    print(f"  Admin/Operational: {status_data['Admin']}/{status_data['Operational']}")
-                    print(f"  Speed/Duplex: {status_data['Speed']} / {status_data['Duplex']}")
-            
-            # Close connection
-            shell.close()
-            ssh.close()
-            print(f"\n[INFO] Disconnected from {switch_ip}")
-            
-        except Exception as e:
-            print(f"\n❌ ERROR connecting to {switch_ip}: {e}")
-            all_results.append({
-                'Switch': switch_ip,
-                'Interface': 'Connection Failed',
-                'Status': f'ERROR: {str(e)[:50]}',
-                'Length(m)': 'N/A',
-                'Fault': 'N/A',
-                'Distance(m)': 'N/A'
-            })
+    for switch_results in run_parallel(test_switch, ACCESS_SWITCHES, MAX_WORKERS).values():
+        all_results.extend(switch_results)
     
     # Display results in table format
     print(f"\n{'='*80}")
@@ -257,7 +258,7 @@ def main():
                 result['Length(m)'],
                 result['Fault'],
                 result['Distance(m)'],
-                f"{result['Admin']}/{result.get('Operational', 'N/A')}",
+                f"{result.get('Admin', 'N/A')}/{result.get('Operational', 'N/A')}",
                 result.get('Speed', 'N/A'),
                 result.get('Duplex', 'N/A')
             ])
@@ -267,15 +268,19 @@ def main():
         print(tabulate(table_data, headers=headers, tablefmt='grid'))
         
         # Summary statistics
-        total_tests = len([r for r in all_results if r['Interface'] != 'N/A' and 'Connection' not in r['Interface']])
+        total_tests = len([r for r in all_results if r['Interface'] != 'N/A' and 'Connection' not in r['Interface']
+                           and not r['Status'].startswith('Unchanged')])
         passed_tests = len([r for r in all_results if r['Status'] == 'OK'])
         failed_tests = len([r for r in all_results if r['Status'] in ['FAIL', 'Open', 'Short']])
+        unchanged_tests = len([r for r in all_results if r['Status'].startswith('Unchanged')])
         
         print(f"\nSUMMARY:")
         print(f"  Total switches tested: {len(ACCESS_SWITCHES)}")
         print(f"  Total interfaces tested: {total_tests}")
         print(f"  Passed: {passed_tests}")
         print(f"  Failed: {failed_tests}")
+        if INCREMENTAL:
+            print(f"  Unchanged since last good result (not retested): {unchanged_tests}")
         print(f"  Connection errors: {len([r for r in all_results if 'ERROR' in r['Status']])}")
     
     print(f"\n{'='*80}")
@@ -284,4 +289,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-```
@@ -1,7 +1,10 @@
-import time
-import re
+import os
+import sys
 from netmiko import ConnectHandler
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netlib import parse, run_tdr, shared_store
+
 # 1. Connection Details
 device = {
     'device_type': 'cisco_ios',
@@ -16,22 +19,18 @@ def run_smart_tdr():
     try:
         net_connect = ConnectHandler(**device)
         
-        # --- BATCH TRIGGER ---
+        # --- BATCH TRIGGER, THEN POLL UNTIL EACH PORT IS DONE ---
         print("Triggering TDR tests...")
-        for intf in interfaces:
-            net_connect.send_command(f"test cable-diagnostics tdr interface {intf}")
-        
-        # --- THE 10-SECOND WAIT ---
-        print("Waiting 10 seconds for results...")
-        time.sleep(10)
+        results = run_tdr(net_connect, interfaces)
+        shared_store().record(device['host'], results)
 
-        # --- RETRIEVAL & PARSING ---
+        # --- PARSING ---
         for intf in interfaces:
-            output = net_connect.send_command(f"show cable-diagnostics tdr interface {intf}")
+            output = results[intf].output
             
-            # Find the speed using Regex
-            speed_match = re.search(r"(\d+M|Auto)", output)
-            speed = speed_match.group(1) if speed_match else "Unknown"
+            # Speed column of the first pair row
+            pairs = parse("show cable-diagnostics tdr", output)
+            speed = pairs[0].speed if pairs and pairs[0].speed else "Unknown"
 
             print(f"\n--- Interface: {intf} | Negotiated Speed: {speed} ---")
 
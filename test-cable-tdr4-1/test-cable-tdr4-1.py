@@ -1,7 +1,12 @@
 import time
 import re
+import os
+import sys
 from netmiko import ConnectHandler
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netlib import COUNTER_LINES, Pool, include, parse, port_counters, resolve, run_parallel, run_tdr, select, shared_store
+
 # -------------------------------
 # Jump host details (Cisco IOS)
 # -------------------------------
@@ -26,6 +31,14 @@ switch_list = [
 SW_USERNAME = "cisco"          # Only used if a switch ever asks for Username:
 SW_PASSWORD = "Cisco1234"    # Per your note: switch typically asks for password directly
 
+# How many switches to test at the same time (each uses its own jump host VTY)
+MAX_WORKERS = 4
+
+# Only test ports that are new, changed speed, flapped or got errors since their last
+# good result (history in netlib.tdr_store); the rest are retested every MAX_AGE_DAYS
+INCREMENTAL = False
+MAX_AGE_DAYS = 30
+
 # -------------------------------
 # Prompt/Session helpers
 # -------------------------------
@@ -60,6 +73,11 @@ def _handle_ssh_prompts_via_timing(conn, first_output):
 
     return out
 
+def _connect_jump():
+    """Log in to the jump host (follows $NETLIB_SIMULATOR like netlib.connect)"""
+    address, port = resolve(jump_host["host"], jump_host.get("port", 22))
+    return ConnectHandler(**dict(jump_host, host=address, port=port))
+
 def _enter_enable_and_pager_off(conn):
     """Ensure we’re privileged and disable paging."""
     out = conn.send_command_timing("enable")
@@ -67,6 +85,17 @@ def _enter_enable_and_pager_off(conn):
         conn.send_command_timing(SW_PASSWORD)
     conn.send_command_timing("terminal length 0")
 
+def _open_jump():
+    """New pooled jump host session, privileged with paging off"""
+    print(f"Connecting to jump host {jump_host['host']}...")
+    jump = _connect_jump()
+    _enter_enable_and_pager_off(jump)
+    return jump
+
+def _on_jump(jump):
+    """True if jump is back at the jump host's own prompt (safe to reuse)"""
+    return jump.find_prompt().rstrip("#>") == jump.base_prompt
+
 
 # -------------------------------
 # Discovery & parsing
@@ -76,69 +105,58 @@ def _get_connected_copper_ports(conn):
     Parse 'show interfaces status' where status is 'connected'
     and interface looks like Gi*, Fa*, Te*, Eth* (ignore Po/Vl).
     """
-    show_status = conn.send_command("show interfaces status")
-    connected_ports = []
-    for line in show_status.splitlines():
-        if "connected" in line:
-            parts = line.split()
-            if parts:
-                intf = parts[0]
-                if intf.startswith(("Gi", "Fa", "Te", "Eth")) and not intf.startswith(("Po", "Vl")):
-                    connected_ports.append(intf)
-    return connected_ports
+    # '| include connected' runs on the switch, so only connected rows cross the hop
+    return [row.port for row in select(conn, "show interfaces status", include("connected"))
+            if row.status == "connected" and row.port.startswith(("Gi", "Fa", "Te", "Eth"))]
 
 
+def _get_port_counters(conn, ports):
+    """
+    'show interfaces' speed, resets and error counters of 'ports';
+    only the lines they are on cross the hop.
+    """
+    return port_counters(select(conn, "show interfaces", include(COUNTER_LINES)), ports)
+
+
+def _due_ports(conn, sw_ip, ports):
+    """
+    (ports that need TDR, their counters) for INCREMENTAL mode.
+    """
+    counters = _get_port_counters(conn, ports)
+    due = shared_store().due_ports(sw_ip, ports, counters, MAX_AGE_DAYS)
+    for intf, reason in due.items():
+        print(f"{sw_ip} {intf}: TDR due, {reason}")
+    print(f"{sw_ip}: {len(due)} of {len(ports)} ports need TDR, {len(ports) - len(due)} unchanged")
+    return list(due), counters
+
+
+def _unchanged_row(sw_ip, intf):
+    """
+    Table row of a port skipped by INCREMENTAL: unchanged since its last good result.
+    """
+    state = shared_store().ports(sw_ip).get(intf)
+    since = time.strftime("%Y-%m-%d", time.localtime(state.good)) if state and state.good else "?"
+    return {"intf": intf, "speed": (state.speed if state else None) or "N/A", "status": f"⏭ Unchanged since {since}"}
 def _parse_speed_from_tdr(output_text):
     """
-    From 'show cable-diagnostics tdr interface X' output,
-    extract speed like '1000M', '100M', or return 'N/A'.
+    Extract speed like '1000M', '100M', else 'N/A'.
     """
-    # Look for a header line that contains the speed (Cisco usually prints it in the table)
-    # Example:
-    # Interface   Speed ...
-    # Gi1/0/11    1000M ...
-    speed_match = re.search(r"\n\s*\S+\s+(\d{2,4}M)\s", output_text)
-    if speed_match:
-        return speed_match.group(1)
-    # Fallbacks seen on some platforms
-    m2 = re.search(r"Speed\s*[:=]\s*(\d{2,4}M)", output_text, re.IGNORECASE)
-    return m2.group(1) if m2 else "N/A"
+    pairs = parse("show cable-diagnostics tdr", output_text)
+    return pairs[0].speed if pairs and pairs[0].speed else "N/A"
 
 
 def _parse_pairs_status(output_text):
     """
     Returns:
-      pairs: dict like { 'A': {'status': 'Normal', 'length': 12}, ... }
+      pairs: dict { 'A': {'status': 'Normal', 'length': 12}, ... }
       not_supported: True if output indicates TDR not supported
     """
-    pairs = {}
-    not_supported = False
-
     if re.search(r"not\s+supported", output_text, re.IGNORECASE):
-        return pairs, True
-
-    # Typical TDR table lines like:
-    # Pair A     12   +/- 10 meters  Pair A      Normal
-    # Pair B     12   +/- 10 meters  Pair B      Normal
-    # Sometimes length may be '-', or '0'
-    pair_line = re.compile(
-        r"Pair\s+([ABCD])\s+(\d+|-\s?)\s+\+/-\s+\d+\s+meters\s+Pair\s+[ABCD]\s+(\S+)",
-        re.IGNORECASE
-    )
-
-    for line in output_text.splitlines():
-        m = pair_line.search(line)
-        if m:
-            p = m.group(1).upper()
-            length_raw = m.group(2).strip()
-            status = m.group(3)
-            try:
-                length_val = int(length_raw) if length_raw.isdigit() else None
-            except ValueError:
-                length_val = None
-            pairs[p] = {"status": status, "length": length_val}
-
-    return pairs, not_supported
+        return {}, True
+
+    pairs = {pair.pair: {"status": pair.status, "length": pair.length}
+             for pair in parse("show cable-diagnostics tdr", output_text)}
+    return pairs, False
 
 
 def _summarize_interface(speed, pairs):
@@ -181,22 +199,21 @@ def _summarize_interface(speed, pairs):
 # -------------------------------
 # TDR run & collection
 # -------------------------------
-def _run_tdr_batch_and_collect_table(conn, ports):
+def _run_tdr_batch_and_collect_table(conn, ports, sw_ip, counters=None):
     """
-    Trigger TDR on all 'ports', wait, then return list of rows:
+    Trigger TDR on all 'ports', collect each as soon as it finishes, then return list of rows:
       [{'intf': 'Gi1/0/1', 'speed': '1000M', 'status': '✅ ...'}, ...]
     """
-    # Trigger
-    for intf in ports:
-        conn.send_command(f"test cable-diagnostics tdr interface {intf}", expect_string=r"#")
-
-    # Wait for hardware to finish
-    time.sleep(10)
+    # Trigger, then poll only the ports still running until the slowest is done
+    # expect_string: netmiko's prompt is still the jump host's after the hop
+    results = run_tdr(conn, ports, send=lambda command: conn.send_command(command, expect_string=r"#"))
+    # Keep the per-pair results for history queries (python3 -m netlib.tdr_store)
+    shared_store().record(sw_ip, results, counters=counters)
 
-    # Collect and summarize
+    # Summarize
     rows = []
     for intf in ports:
-        raw = conn.send_command(f"show cable-diagnostics tdr interface {intf}")
+        raw = results[intf].output
         # Parse speed & pairs
         speed = _parse_speed_from_tdr(raw)
         pairs, not_supported = _parse_pairs_status(raw)
@@ -226,15 +243,13 @@ def _print_switch_table(sw_ip, rows):
 # -------------------------------
 # Main workflow
 # -------------------------------
-def run_tdr_via_jump():
-    print(f"Connecting to jump host {jump_host['host']}...")
-    jump = ConnectHandler(**jump_host)
-    _enter_enable_and_pager_off(jump)
-
-    for sw_ip in switch_list:
-        print("\n" + "="*74)
-        print(f"Connecting from jump host to switch {sw_ip} (ssh {sw_ip})")
-
+def _test_switch_via_jump(pool, sw_ip):
+    """
+    Jump host session from the pool -> ssh to sw_ip -> TDR on its connected copper ports.
+    Returns the table rows, or [] when the switch has no connected ports.
+    """
+    print(f"Connecting from jump host to switch {sw_ip} (ssh {sw_ip})")
+    with pool.connection() as jump:
         # Start SSH to switch (no username in cmd, per your behavior)
         first = jump.send_command_timing(f"ssh {sw_ip}")
 
@@ -249,17 +264,37 @@ def run_tdr_via_jump():
         if not ports:
             print(f"No connected copper ports found on {sw_ip}. Skipping.")
             jump.send_command_timing("exit")
-            continue
+            return []
 
         # Run and gather a single summary table
-        rows = _run_tdr_batch_and_collect_table(jump, ports)
-        _print_switch_table(sw_ip, rows)
+        if INCREMENTAL:
+            due, counters = _due_ports(jump, sw_ip, ports)
+            tested = _run_tdr_batch_and_collect_table(jump, due, sw_ip, counters) if due else []
+            by_intf = {row["intf"]: row for row in tested}
+            rows = [by_intf.get(intf) or _unchanged_row(sw_ip, intf) for intf in ports]
+        else:
+            rows = _run_tdr_batch_and_collect_table(jump, ports, sw_ip)
 
         # Exit back to jump host
         jump.send_command_timing("exit")
         print(f"Completed {sw_ip}")
+        return rows
+
+def run_tdr_via_jump():
+    print(f"Testing {len(switch_list)} switches via jump host {jump_host['host']}, {MAX_WORKERS} at a time...")
+
+    # Up to MAX_WORKERS jump host sessions, each reused for switch after switch;
+    # the whole floor takes about as long as its slowest switches. Tables print once all are done
+    with Pool(_open_jump, lambda jump: jump.disconnect(), MAX_WORKERS, reusable=_on_jump) as pool:
+        results = run_parallel(lambda sw_ip: _test_switch_via_jump(pool, sw_ip), switch_list, MAX_WORKERS)
+
+    for sw_ip, rows in results.items():
+        print("\n" + "="*74)
+        if isinstance(rows, Exception):
+            print(f"FAILED {sw_ip}: {rows}")
+        elif rows:
+            _print_switch_table(sw_ip, rows)
 
-    jump.disconnect()
     print("\nAll switches completed.")
 
 
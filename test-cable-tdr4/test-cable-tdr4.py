@@ -1,7 +1,10 @@
-import time
-import re
+import os
+import sys
 from netmiko import ConnectHandler
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netlib import parse, run_tdr, shared_store
+
 # 1. Hardware Connection Details
 device = {
     'device_type': 'cisco_ios',
@@ -20,8 +23,9 @@ def run_connected_tdr():
         print("Scanning for 'connected' copper interfaces...")
         status_output = net_connect.send_command("show interfaces status")
         
-        # Regex captures interfaces (e.g., Gi1/0/1) only if status is 'connected'
-        connected_ports = re.findall(r"(\S+\d+/\d+/\d+|\S+\d+/\d+)\s+.*?\s+connected", status_output)
+        # Physical interfaces (e.g., Gi1/0/1) only if status is 'connected'
+        connected_ports = [row.port for row in parse("show interfaces status", status_output)
+                           if row.status == "connected" and "/" in row.port]
 
         if not connected_ports:
             print("No active connected ports found. Exiting.")
@@ -30,33 +34,28 @@ def run_connected_tdr():
 
         print(f"Found {len(connected_ports)} connected ports: {', '.join(connected_ports)}")
 
-        # 3. BATCH TRIGGER (The "Batch" part of your method)
+        # 3. BATCH TRIGGER, 4. POLL until every port has a result (slowest cable sets the wait)
         print("Triggering TDR tests on all active ports...")
-        for intf in connected_ports:
-            # We don't wait for output here, just send the command
-            net_connect.send_command(f"test cable-diagnostics tdr interface {intf}", expect_string=r"#")
-        
-        # 4. THE 10-SECOND WAIT
-        print("Waiting exactly 10 seconds for hardware to generate reflections...")
-        time.sleep(10)
+        results = run_tdr(net_connect, connected_ports)
+        shared_store().record(device['host'], results)
 
-        # 5. RETRIEVAL & ANALYSIS (The "Wait" part of your method)
+        # 5. ANALYSIS
         print("\n" + "="*80)
         print(f"{'Interface':<15} | {'Speed':<8} | {'Diagnosis'}")
         print("-" * 80)
 
         for intf in connected_ports:
-            output = net_connect.send_command(f"show cable-diagnostics tdr interface {intf}")
+            output = results[intf].output
             
             # Detect speed to explain the 0m distance on Pairs C/D
-            speed_match = re.search(r"(\d+M|Auto|1000|100)", output)
-            speed = speed_match.group(1) if speed_match else "N/A"
+            pairs = parse("show cable-diagnostics tdr", output)
+            speed = pairs[0].speed if pairs and pairs[0].speed else "N/A"
 
             # logic for the 0m distance you noticed
             diagnosis = "Normal"
             if "100M" in speed or "100" in speed:
                 diagnosis = "Valid (100M uses 2 pairs; C/D at 0m is expected)"
-            elif "1000" in speed and "0" in output:
+            elif "1000" in speed and any(pair.length == 0 for pair in pairs):
                 diagnosis = "Check Cable (Gigabit should use all 4 pairs!)"
 
             print(f"{intf:<15} | {speed:<8} | {diagnosis}")
@@ -1,7 +1,12 @@
 import time
 import re
+import os
+import sys
 from netmiko import ConnectHandler
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netlib import COUNTER_LINES, Pool, include, parse, port_counters, resolve, run_parallel, run_tdr, select, shared_store
+
 # -------------------------------
 # Jump host details (Cisco IOS)
 # -------------------------------
@@ -30,6 +35,14 @@ switch_list = [
 SW_USERNAME = "cisco"          # Only if a switch ever asks for Username:
 SW_PASSWORD = "Cisco1234"    # Switches prompt for password directly in your environment
 
+# How many switches to test at the same time (each uses its own jump host VTY)
+MAX_WORKERS = 4
+
+# Only test ports that are new, changed speed, flapped or got errors since their last
+# good result (history in netlib.tdr_store); the rest are retested every MAX_AGE_DAYS
+INCREMENTAL = False
+MAX_AGE_DAYS = 30
+
 # Optional: write a sanitized activity log (no secrets)
 ACTIVITY_LOG_FILE = None  # e.g., set to "tdr_activity.log" if you want a masked log
 
@@ -89,10 +102,26 @@ def _handle_ssh_prompts_via_timing(conn, first_output):
 
     return out
 
+def _connect_jump():
+    """Log in to the jump host (follows $NETLIB_SIMULATOR like netlib.connect)"""
+    address, port = resolve(jump_host["host"], jump_host.get("port", 22))
+    return ConnectHandler(**dict(jump_host, host=address, port=port))
+
 def _pager_off(conn):
     """Disable paging; works in user exec on IOS."""
     send_cmd_timing(conn, "terminal length 0")
 
+def _open_jump():
+    """New pooled jump host session, paging off"""
+    _activity_log(f"Connecting to jump host {jump_host['host']}...")
+    jump = _connect_jump()
+    _pager_off(jump)
+    return jump
+
+def _on_jump(jump):
+    """True if jump is back at the jump host's own prompt (safe to reuse)"""
+    return jump.find_prompt().rstrip("#>") == jump.base_prompt
+
 # -------------------------------
 # Discovery & parsing
 # -------------------------------
@@ -101,26 +130,43 @@ def _get_connected_copper_ports(conn):
     Parse 'show interfaces status' where status is 'connected'
     and interface looks like Gi*, Fa*, Te*, Eth* (ignore Po/Vl).
     """
-    show_status = send_cmd(conn, "show interfaces status")
-    connected_ports = []
-    for line in show_status.splitlines():
-        if "connected" in line:
-            parts = line.split()
-            if parts:
-                intf = parts[0]
-                if intf.startswith(("Gi", "Fa", "Te", "Eth")) and not intf.startswith(("Po", "Vl")):
-                    connected_ports.append(intf)
-    return connected_ports
+    # '| include connected' runs on the switch, so only connected rows cross the hop
+    rows = select(conn, "show interfaces status", include("connected"), send=lambda command: send_cmd(conn, command))
+    return [row.port for row in rows
+            if row.status == "connected" and row.port.startswith(("Gi", "Fa", "Te", "Eth"))]
+
+def _get_port_counters(conn, ports):
+    """
+    'show interfaces' speed, resets and error counters of 'ports';
+    only the lines they are on cross the hop.
+    """
+    records = select(conn, "show interfaces", include(COUNTER_LINES), send=lambda command: send_cmd(conn, command))
+    return port_counters(records, ports)
+
+def _due_ports(conn, sw_ip, ports):
+    """
+    (ports that need TDR, their counters) for INCREMENTAL mode.
+    """
+    counters = _get_port_counters(conn, ports)
+    due = shared_store().due_ports(sw_ip, ports, counters, MAX_AGE_DAYS)
+    for intf, reason in due.items():
+        print(f"{sw_ip} {intf}: TDR due, {reason}")
+    print(f"{sw_ip}: {len(due)} of {len(ports)} ports need TDR, {len(ports) - len(due)} unchanged")
+    _activity_log(f"{sw_ip}: {len(due)} of {len(ports)} ports due for TDR")
+    return list(due), counters
+
+def _unchanged_row(sw_ip, intf):
+    """Table row of a port skipped by INCREMENTAL: unchanged since its last good result"""
+    state = shared_store().ports(sw_ip).get(intf)
+    since = time.strftime("%Y-%m-%d", time.localtime(state.good)) if state and state.good else "?"
+    return {"intf": intf, "speed": (state.speed if state else None) or "N/A", "status": f"⏭ Unchanged since {since}"}
 
 def _parse_speed_from_tdr(output_text):
     """
     Extract speed like '1000M', '100M', else 'N/A'.
     """
-    m = re.search(r"\n\s*\S+\s+(\d{2,4}M)\s", output_text)
-    if m:
-        return m.group(1)
-    m2 = re.search(r"Speed\s*[:=]\s*(\d{2,4}M)", output_text, re.IGNORECASE)
-    return m2.group(1) if m2 else "N/A"
+    pairs = parse("show cable-diagnostics tdr", output_text)
+    return pairs[0].speed if pairs and pairs[0].speed else "N/A"
 
 def _parse_pairs_status(output_text):
     """
@@ -128,30 +174,12 @@ def _parse_pairs_status(output_text):
       pairs: dict { 'A': {'status': 'Normal', 'length': 12}, ... }
       not_supported: True if output indicates TDR not supported
     """
-    pairs = {}
-    not_supported = False
-
     if re.search(r"not\s+supported", output_text, re.IGNORECASE):
-        return pairs, True
-
-    pair_line = re.compile(
-        r"Pair\s+([ABCD])\s+(\d+|-\s?)\s+\+/-\s+\d+\s+meters\s+Pair\s+[ABCD]\s+(\S+)",
-        re.IGNORECASE
-    )
-
-    for line in output_text.splitlines():
-        m = pair_line.search(line)
-        if m:
-            p = m.group(1).upper()
-            length_raw = m.group(2).strip()
-            status = m.group(3)
-            try:
-                length_val = int(length_raw) if length_raw.isdigit() else None
-            except ValueError:
-                length_val = None
-            pairs[p] = {"status": status, "length": length_val}
-
-    return pairs, not_supported
+        return {}, True
+
+    pairs = {pair.pair: {"status": pair.status, "length": pair.length}
+             for pair in parse("show cable-diagnostics tdr", output_text)}
+    return pairs, False
 
 def _summarize_interface(speed, pairs):
     """
@@ -182,23 +210,21 @@ def _summarize_interface(speed, pairs):
 # -------------------------------
 # TDR run & collection
 # -------------------------------
-def _run_tdr_batch_and_collect_table(conn, ports):
+def _run_tdr_batch_and_collect_table(conn, ports, sw_ip, counters=None):
     """
-    Trigger TDR on all 'ports', wait, then return list of rows:
+    Trigger TDR on all 'ports', collect each as soon as it finishes, then return list of rows:
       [{'intf': 'Gi1/0/1', 'speed': '1000M', 'status': '✅ ...'}, ...]
     """
-    for intf in ports:
-        send_cmd(conn, f"test cable-diagnostics tdr interface {intf}", expect_string=r"#")
-
-    print("...waiting 10 seconds for TDR to complete...")
-    _activity_log("...waiting 10 seconds for TDR to complete...")
-    time.sleep(10)
+    # Polls only the ports still running; the wait follows the slowest cable.
+    # expect_string: netmiko's prompt is still the jump host's after the hop
+    results = run_tdr(conn, ports, send=lambda command: send_cmd(conn, command, expect_string=r"#"))
+    _activity_log(f"TDR finished on {sum(1 for r in results.values() if r.final)}/{len(ports)} ports")
+    # Keep the per-pair results for history queries (python3 -m netlib.tdr_store)
+    shared_store().record(sw_ip, results, counters=counters)
 
     rows = []
     for intf in ports:
-        print(f">>> show cable-diagnostics tdr interface {intf}")
-        _activity_log(f">>> show cable-diagnostics tdr interface {intf}")
-        raw = conn.send_command(f"show cable-diagnostics tdr interface {intf}")
+        raw = results[intf].output
         speed = _parse_speed_from_tdr(raw)
         pairs, not_supported = _parse_pairs_status(raw)
         if not_supported:
@@ -223,19 +249,14 @@ def _print_switch_table(sw_ip, rows):
 # -------------------------------
 # Main workflow
 # -------------------------------
-def run_tdr_via_jump():
-    print(f"Connecting to jump host {jump_host['host']}...")
-    _activity_log(f"Connecting to jump host {jump_host['host']}...")
-    jump = ConnectHandler(**jump_host)
-
-    # No 'enable' required; just turn paging off
-    _pager_off(jump)
-
-    for sw_ip in switch_list:
-        print("\n" + "="*74)
-        print(f"Connecting from jump host to switch {sw_ip} (ssh {sw_ip})")
-        _activity_log(f"Connecting to {sw_ip}")
-
+def _test_switch_via_jump(pool, sw_ip):
+    """
+    Jump host session from the pool -> ssh to sw_ip -> TDR on its connected copper ports.
+    Returns the table rows, or [] when the switch has no connected ports.
+    """
+    print(f"Connecting from jump host to switch {sw_ip} (ssh {sw_ip})")
+    _activity_log(f"Connecting to {sw_ip}")
+    with pool.connection() as jump:
         # Start SSH to switch (no username in cmd)
         first = send_cmd_timing(jump, f"ssh {sw_ip}")
 
@@ -251,18 +272,38 @@ def run_tdr_via_jump():
             print(f"No connected copper ports found on {sw_ip}. Skipping.")
             _activity_log(f"No connected ports on {sw_ip}; skipping.")
             send_cmd_timing(jump, "exit")
-            continue
+            return []
 
         # Run and gather a single summary table
-        rows = _run_tdr_batch_and_collect_table(jump, ports)
-        _print_switch_table(sw_ip, rows)
+        if INCREMENTAL:
+            due, counters = _due_ports(jump, sw_ip, ports)
+            tested = _run_tdr_batch_and_collect_table(jump, due, sw_ip, counters) if due else []
+            by_intf = {row["intf"]: row for row in tested}
+            rows = [by_intf.get(intf) or _unchanged_row(sw_ip, intf) for intf in ports]
+        else:
+            rows = _run_tdr_batch_and_collect_table(jump, ports, sw_ip)
 
         # Exit back to jump host
         send_cmd_timing(jump, "exit")
         print(f"Completed {sw_ip}")
         _activity_log(f"Completed {sw_ip}")
+        return rows
+
+def run_tdr_via_jump():
+    print(f"Testing {len(switch_list)} switches via jump host {jump_host['host']}, {MAX_WORKERS} at a time...")
+
+    # Up to MAX_WORKERS jump host sessions, each reused for switch after switch;
+    # the whole floor takes about as long as its slowest switches. Tables print once all are done
+    with Pool(_open_jump, lambda jump: jump.disconnect(), MAX_WORKERS, reusable=_on_jump) as pool:
+        results = run_parallel(lambda sw_ip: _test_switch_via_jump(pool, sw_ip), switch_list, MAX_WORKERS)
+
+    for sw_ip, rows in results.items():
+        print("\n" + "="*74)
+        if isinstance(rows, Exception):
+            print(f"FAILED {sw_ip}: {rows}")
+        elif rows:
+            _print_switch_table(sw_ip, rows)
 
-    jump.disconnect()
     print("\nAll switches completed.")
     _activity_log("All switches completed.")
 
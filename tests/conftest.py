@@ -0,0 +1,38 @@
+"""Simulated fleet and session broker on localhost, for tests that need a real SSH session"""
+import os
+import tempfile
+import threading
+
+import pytest
+
+from netlib.broker import BROKER_ENV, Broker, _Handler, _Server
+from netlib.simulator import SIMULATOR_ENV, Fleet, Simulator
+
+# Seconds before a simulated TDR test has results
+TDR_SECONDS = 0.2
+
+
+@pytest.fixture
+def simulator(tmp_path, monkeypatch):
+    """Simulator on free ports, with $NETLIB_SIMULATOR pointing at it"""
+    with Simulator(Fleet(tdr_seconds=TDR_SECONDS), port=0) as sim:
+        monkeypatch.setenv(SIMULATOR_ENV, sim.write_map(str(tmp_path / "simulator.json")))
+        yield sim
+
+
+@pytest.fixture
+def broker(simulator, monkeypatch):
+    """Broker serving the simulator, with $NETLIB_BROKER pointing at it"""
+    # Unix socket paths are limited to ~100 bytes, too short for tmp_path
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "broker.sock")
+        server = _Server(path, _Handler)
+        server.broker = Broker()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        monkeypatch.setenv(BROKER_ENV, path)
+        try:
+            yield server.broker
+        finally:
+            server.shutdown()
+            server.server_close()
+            server.broker.close()
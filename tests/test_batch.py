@@ -0,0 +1,54 @@
+"""netlib.batch without a device: a shell that never shows a prompt"""
+import pytest
+
+from netlib.batch import learn_prompt, push_config, send_batch
+from netlib.expect import ExpectResult
+from netlib.showcache import ShowCache
+
+
+class SilentShell:
+    """Shell stand-in whose reads time out without a prompt"""
+
+    def __init__(self, prompt_after=None):
+        self.host = "10.20.39.21"
+        self.echo = False
+        self.prompt = None
+        self.show_cache = ShowCache()
+        self.sent = []
+        # Number of probes after which the device answers with 'SW01#' (None = never)
+        self.prompt_after = prompt_after
+
+    def send(self, data):
+        self.sent.append(data)
+
+    def expect(self, prompts=None, timeout=None):
+        if self.prompt_after is not None and len(self.sent) >= self.prompt_after:
+            self.prompt = "SW01#"
+            return ExpectResult("\r\nSW01#", "device", [], 0.0)
+        return ExpectResult("", None, [], timeout or 0.0)
+
+
+def test_learn_prompt_raises_without_prompt():
+    shell = SilentShell()
+    with pytest.raises(ConnectionError, match="10.20.39.21: no prompt"):
+        learn_prompt(shell, timeout=0.01)
+    assert shell.sent == ["\n", "\n"]
+
+
+def test_learn_prompt_probes_again():
+    shell = SilentShell(prompt_after=2)
+    assert learn_prompt(shell, timeout=0.01) == "SW01#"
+
+
+def test_learn_prompt_known_prompt_sends_nothing():
+    shell = SilentShell()
+    shell.prompt = "SW01#"
+    assert learn_prompt(shell) == "SW01#"
+    assert shell.sent == []
+
+
+def test_send_batch_and_push_config_fail_clearly_without_prompt():
+    with pytest.raises(ConnectionError, match="no prompt"):
+        send_batch(SilentShell(), ["show version"], timeout=0.01)
+    with pytest.raises(ConnectionError, match="no prompt"):
+        push_config(SilentShell(), ["interface Gi1/0/1", "shutdown"], timeout=0.01)
@@ -0,0 +1,35 @@
+"""netlib.broker against the simulator"""
+import paramiko
+import pytest
+
+from netlib.broker import Broker
+from netlib.simulator import ENTRY_HOSTS, PASSWORD, USERNAME
+
+CORE = ENTRY_HOSTS[0]
+
+
+def request(password, host=None):
+    return {"core": CORE, "username": USERNAME, "password": password, "host": host}
+
+
+def test_mistyped_password_does_not_stick(simulator):
+    broker = Broker()
+    try:
+        with pytest.raises(paramiko.AuthenticationException):
+            broker.borrow(request("typo"))
+        key, shell = broker.borrow(request(PASSWORD))
+        assert shell.prompt
+        broker.give_back(key, shell)
+    finally:
+        broker.close()
+
+
+def test_other_password_refused_once_logged_in(simulator):
+    broker = Broker()
+    try:
+        key, shell = broker.borrow(request(PASSWORD))
+        broker.give_back(key, shell)
+        with pytest.raises(PermissionError):
+            broker.borrow(request("typo"))
+    finally:
+        broker.close()
@@ -0,0 +1,100 @@
+"""netlib.facts: when cached facts still describe the switch"""
+import time
+
+import pytest
+
+from netlib.expect import ExpectResult
+from netlib.facts import FactsCache, device_facts, parse_uptime
+from netlib.latency import LatencyModel
+from netlib.showcache import ShowCache
+
+VERSION = """\
+Cisco IOS XE Software, Version 17.06.05
+Cisco IOS Software [Bengaluru], Catalyst L3 Switch Software (CAT9K_IOSXE), Version 17.6.5
+SW01 uptime is {uptime}
+Uptime for this control processor is {uptime}
+System returned to ROM by Reload Command
+cisco C9300-48P (X86) processor with 1343576K/6147K bytes of memory.
+Model Number                       : C9300-48P
+System Serial Number               : {serial}
+"""
+
+STATUS = """\
+Port         Name               Status       Vlan       Duplex  Speed Type
+Gi1/0/1      AP lobby           connected    10         a-full a-1000 10/100/1000BaseTX
+Gi1/0/2                         notconnect   1            auto   auto 10/100/1000BaseTX
+Te1/1/1      to core            connected    trunk        full    10G SFP-10GBase-SR
+Po11         to core            connected    trunk      a-full  a-10G
+"""
+
+
+class SwitchShell:
+    """Shell stand-in answering 'show version' and 'show interfaces status'"""
+
+    def __init__(self, serial="FOC2233X0AB", uptime="2 weeks, 3 days, 4 hours, 5 minutes"):
+        self.host = "10.20.39.21"
+        self.echo = False
+        self.latency = LatencyModel()
+        self.show_cache = ShowCache()
+        self.serial = serial
+        self.uptime = uptime
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data.strip())
+
+    def expect(self, prompts=None, timeout=None):
+        output = VERSION.format(serial=self.serial, uptime=self.uptime) if self.sent[-1] == "show version" else STATUS
+        return ExpectResult(f"{self.sent[-1]}\n{output}SW01#", "device", [], 0.0)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FactsCache(str(tmp_path / "facts.json"))
+
+
+def test_parse_uptime():
+    assert parse_uptime("SW01 uptime is 1 year, 2 weeks, 4 hours, 5 minutes") == \
+        365 * 86400 + 14 * 86400 + 4 * 3600 + 5 * 60
+    assert parse_uptime("no uptime here") is None
+
+
+def test_discover_then_reuse(cache):
+    shell = SwitchShell()
+    facts = device_facts(shell, cache)
+    assert shell.sent == ["show version", "show interfaces status"]
+    assert (facts["serial"], facts["platform"], facts["naming"]) == ("FOC2233X0AB", "C9300-48P", ["Gi", "Te"])
+    assert facts["ports"] == {"Gi1/0/1": "10/100/1000BaseTX", "Gi1/0/2": "10/100/1000BaseTX",
+                              "Te1/1/1": "SFP-10GBase-SR"}
+
+    shell = SwitchShell()
+    assert device_facts(shell, FactsCache(cache.path)) == facts
+    assert shell.sent == ["show version"]
+
+
+@pytest.mark.parametrize("changed", [
+    {"serial": "FOC2301Y1CD"},        # another box behind the same IP
+    {"uptime": "5 minutes"},          # reloaded since the facts were taken
+])
+def test_serial_or_reload_rediscovers(cache, changed):
+    device_facts(SwitchShell(), cache)
+    shell = SwitchShell(**changed)
+    facts = device_facts(shell, cache)
+    assert shell.sent == ["show version", "show interfaces status"]
+    assert facts["serial"] == changed.get("serial", "FOC2233X0AB")
+    assert cache.get(shell.host)["boot"] == facts["boot"]
+
+
+def test_expired_or_invalidated_rediscovers(cache):
+    device_facts(SwitchShell(), cache)
+    cache.invalidate("10.20.39.21")
+    shell = SwitchShell()
+    device_facts(shell, cache)
+    assert shell.sent == ["show version", "show interfaces status"]
+
+    cache.ttl = 0
+    assert cache.get(shell.host) is None
+    shell = SwitchShell()
+    device_facts(shell, cache)
+    assert shell.sent == ["show version", "show interfaces status"]
+    assert time.time() - cache.hosts()[shell.host]["collected"] < 60
@@ -0,0 +1,67 @@
+"""netlib.latency: command classes and learned deadlines"""
+import pytest
+
+from netlib.expect import COMMAND_TIMEOUT, ExpectResult
+from netlib.latency import MIN_SAMPLES, LatencyModel, command_class
+from netlib.showcache import ShowCache
+from netlib.transport import SAVE_TIMEOUT, send_command
+
+HOST = "10.20.39.21"
+
+
+@pytest.mark.parametrize("command, name", [
+    ("show interfaces Gi1/0/1 status", "show interfaces status"),
+    ("show  interfaces status", "show interfaces status"),
+    ("show interfaces", "show interfaces"),
+    ("show interfaces GigabitEthernet1/0/1", "show interfaces"),
+    ("show running-config", "show running-config"),
+    ("show running-config interface Po11", "show running-config interface"),
+    ("show cable-diagnostics tdr interface Gi1/0/7", "show cable-diagnostics tdr interface"),
+    ("show etherchannel 11 summary", "show etherchannel 11 summary"),
+])
+def test_command_class(command, name):
+    assert command_class(command) == name
+
+
+def test_status_and_full_show_learn_apart():
+    model = LatencyModel()
+    for _ in range(MIN_SAMPLES):
+        model.record(HOST, "show interfaces status", 0.05)
+        model.record(HOST, "show interfaces", 20.0)
+    assert model.deadline(HOST, "show interfaces Gi1/0/1 status", 10) < model.deadline(HOST, "show interfaces", 10)
+    assert model.deadline(HOST, "show running-config", 10) == 10
+
+
+def test_learned_deadline_never_below_caller_timeout():
+    model = LatencyModel()
+    for _ in range(MIN_SAMPLES):
+        model.record(HOST, "write memory", 0.5)
+    assert model.deadline(HOST, "write memory", 10) < 10
+    assert model.deadline(HOST, "write memory", 30, minimum=30) == 30
+
+
+class TimedShell:
+    """Shell stand-in that answers at once and remembers each read's timeout"""
+
+    def __init__(self):
+        self.host = HOST
+        self.echo = False
+        self.latency = LatencyModel()
+        self.show_cache = ShowCache()
+        self.timeouts = []
+
+    def send(self, data):
+        pass
+
+    def expect(self, prompts=None, timeout=None):
+        self.timeouts.append(timeout)
+        return ExpectResult("\r\nSW01#", "device", [], 0.5)
+
+
+def test_send_command_keeps_caller_timeout():
+    shell = TimedShell()
+    for _ in range(MIN_SAMPLES + 1):
+        send_command(shell, "write memory")
+        send_command(shell, "write memory", timeout=SAVE_TIMEOUT)
+    assert shell.timeouts[-2] < COMMAND_TIMEOUT
+    assert shell.timeouts[-1] == SAVE_TIMEOUT
@@ -0,0 +1,34 @@
+"""netlib/__init__.py: lazy exports"""
+import importlib
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+import netlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_every_export_resolves():
+    for name in netlib.__all__:
+        assert getattr(netlib, name) is not None
+
+
+@pytest.mark.parametrize("name", ["expect", "query", "reconcile"])
+def test_function_wins_over_its_submodule(name):
+    # Loading the submodule (as netlib.tdr loads netlib.query) must not shadow the function
+    importlib.import_module(f"netlib.{name}")
+    importlib.import_module("netlib.tdr")
+    value = getattr(netlib, name)
+    assert callable(value) and not isinstance(value, types.ModuleType)
+
+
+@pytest.mark.parametrize("module", ["broker", "facts", "simulator", "tdr_store", "transcript"])
+def test_run_as_main_without_double_import(module):
+    result = subprocess.run([sys.executable, "-W", "error::RuntimeWarning", "-m", f"netlib.{module}", "--help"],
+                            cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert "RuntimeWarning" not in result.stderr
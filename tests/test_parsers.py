@@ -0,0 +1,214 @@
+"""netlib.parsers on IOS output as Catalyst 9300 / IOS-XE 17 prints it"""
+import pytest
+
+from netlib.parsers import (
+    Clock,
+    EtherChannelMember,
+    InterfaceStatus,
+    VtpStatus,
+    parse,
+    parse_cable_diagnostics_tdr,
+    parse_clock,
+    parse_etherchannel_summary,
+    parse_interfaces,
+    parse_interfaces_status,
+    parse_vtp_status,
+    parser_for,
+)
+
+INTERFACES_STATUS = """\
+show interfaces status
+
+Port         Name               Status       Vlan       Duplex  Speed Type
+Gi1/0/1      AP connected lobby connected    10         a-full a-1000 10/100/1000BaseTX
+Gi1/0/2                         notconnect   1            auto   auto 10/100/1000BaseTX
+Gi1/0/3      Printer 2nd floor  disabled     20           auto   auto 10/100/1000BaseTX
+Gi1/0/4      not connected yet  err-disabled 1            auto   auto 10/100/1000BaseTX
+Te1/1/1      to SW02            connected    trunk        full    10G SFP-10GBase-SR
+Te1/1/2                         notconnect   1            full    10G Not Present
+Po11         to core            connected    trunk      a-full  a-10G
+SW01#"""
+
+ETHERCHANNEL_SUMMARY = """\
+Flags:  D - down        P - bundled in port-channel
+        I - stand-alone s - suspended
+        H - Hot-standby (LACP only)
+        R - Layer3      S - Layer2
+        U - in use      f - failed to allocate aggregator
+
+        M - not in use, minimum links not met
+        u - unsuitable for bundling
+        w - waiting to be aggregated
+        d - default port
+
+        A - formed by Auto LAG
+
+
+Number of channel-groups in use: 3
+Number of aggregators:           3
+
+Group  Port-channel  Protocol    Ports
+------+-------------+-----------+-----------------------------------------------
+1      Po1(SU)         LACP        Gi1/0/47(P)     Gi1/0/48(P)
+11     Po11(SD)        -
+12     Po12(SU)        LACP        Gi1/0/1(P)      Gi1/0/2(P)      Gi1/0/3(P)
+                                   Gi1/0/4(D)
+"""
+
+CABLE_DIAGNOSTICS_TDR = """\
+TDR test last run on: March 04 10:15:31
+
+Interface Speed Local pair Pair length        Remote pair Pair status
+--------- ----- ---------- ------------------ ----------- --------------------
+Gi1/0/1   1000M Pair A     37   +/- 5  meters Pair A      Normal
+                Pair B     37   +/- 5  meters Pair B      Normal
+                Pair C     38   +/- 5  meters Pair C      Normal
+                Pair D     37   +/- 5  meters Pair D      Normal
+Gi1/0/2   auto  Pair A     5    +/- 5  meters N/A         Open
+                Pair B     0    +/- 5  meters N/A         Short
+                Pair C     N/A                N/A         Not Completed
+                Pair D     N/A                N/A         Not Completed
+"""
+
+INTERFACES = """\
+GigabitEthernet1/0/1 is up, line protocol is up (connected)
+  Hardware is Gigabit Ethernet, address is 7018.a7e4.2a81 (bia 7018.a7e4.2a81)
+  Description: AP lobby
+  MTU 1500 bytes, BW 1000000 Kbit/sec, DLY 10 usec,
+     reliability 255/255, txload 1/255, rxload 1/255
+  Encapsulation ARPA, loopback not set
+  Keepalive set (10 sec)
+  Full-duplex, 1000Mb/s, media type is 10/100/1000BaseTX
+  input flow-control is on, output flow-control is unsupported
+  Last input 00:00:01, output 00:00:00, output hang never
+     1523 packets input, 234567 bytes, 0 no buffer
+     Received 120 broadcasts (100 multicasts)
+     0 runts, 0 giants, 0 throttles
+     12 input errors, 3 CRC, 0 frame, 0 overrun, 0 ignored
+     0 watchdog, 100 multicast, 0 pause input
+     4567 packets output, 345678 bytes, 0 underruns
+     0 output errors, 0 collisions, 2 interface resets
+GigabitEthernet1/0/2 is down, line protocol is down (notconnect)
+  Hardware is Gigabit Ethernet, address is 7018.a7e4.2a82 (bia 7018.a7e4.2a82)
+  MTU 1500 bytes, BW 10000 Kbit/sec, DLY 1000 usec,
+  Auto-duplex, Auto-speed, media type is 10/100/1000BaseTX
+     0 input errors, 0 CRC, 0 frame, 0 overrun, 0 ignored
+     0 output errors, 0 collisions, 0 interface resets
+Port-channel11 is administratively down, line protocol is down (disabled)
+  Hardware is EtherChannel, address is 7018.a7e4.2ab0 (bia 7018.a7e4.2ab0)
+  Description: to core
+  MTU 1500 bytes, BW 20000000 Kbit/sec, DLY 10 usec,
+  Full-duplex, 10Gb/s, link type is auto, media type is N/A
+     0 input errors, 0 CRC, 0 frame, 0 overrun, 0 ignored
+     1 output errors, 0 collisions, 0 interface resets
+"""
+
+VTP_STATUS = """\
+VTP Version capable             : 1 to 3
+VTP version running             : 2
+VTP Domain Name                 : CAMPUS
+VTP Pruning Mode                : Disabled
+VTP Traps Generation            : Disabled
+Device ID                       : 7018.a7e4.2a80
+Configuration last modified by 10.20.39.21 at 3-4-26 10:15:31
+Local updater ID is 10.20.39.21 on interface Vl10 (lowest numbered VLAN interface found)
+
+Feature VLAN:
+--------------
+VTP Operating Mode                : Client
+Maximum VLANs supported locally   : 1005
+Number of existing VLANs          : 12
+Configuration Revision            : 7
+MD5 digest                        : 0x3D 0x05 0xEE 0x1F 0x35 0xCC 0x7C 0x74
+                                    0x41 0x7A 0xB2 0x1F 0xE9 0x77 0x9A 0xCD
+"""
+
+
+@pytest.mark.parametrize("command, func", [
+    ("show interfaces status", parse_interfaces_status),
+    ("sh int status | include connected", parse_interfaces_status),
+    ("show interfaces Gi1/0/1 status", parse_interfaces_status),
+    ("sh etherchannel summ", parse_etherchannel_summary),
+    ("show cable-diagnostics tdr interface Gi1/0/1", parse_cable_diagnostics_tdr),
+    ("show interfaces", parse_interfaces),
+    ("show interfaces GigabitEthernet1/0/1", parse_interfaces),
+    ("show vtp status", parse_vtp_status),
+    ("sh clock", parse_clock),
+])
+def test_registry(command, func):
+    assert parser_for(command) is func
+
+
+def test_registry_unknown_command():
+    assert parser_for("show version") is None
+    with pytest.raises(KeyError):
+        parse("show version", "")
+
+
+def test_interfaces_status():
+    rows = {row.port: row for row in parse("show interfaces status", INTERFACES_STATUS)}
+    assert list(rows) == ["Gi1/0/1", "Gi1/0/2", "Gi1/0/3", "Gi1/0/4", "Te1/1/1", "Te1/1/2", "Po11"]
+    assert rows["Gi1/0/1"] == InterfaceStatus("Gi1/0/1", "AP connected lobby", "connected", "10", "a-full",
+                                              "a-1000", "10/100/1000BaseTX")
+    assert rows["Gi1/0/2"].name == ""
+    assert rows["Gi1/0/4"][1:3] == ("not connected yet", "err-disabled")
+    assert rows["Te1/1/2"].type == "Not Present"
+    assert rows["Po11"] == InterfaceStatus("Po11", "to core", "connected", "trunk", "a-full", "a-10G", "")
+
+
+def test_etherchannel_summary():
+    channels = parse("show etherchannel summary", ETHERCHANNEL_SUMMARY)
+    assert [(c.group, c.port_channel, c.flags, c.protocol) for c in channels] == [
+        (1, "Po1", "SU", "LACP"), (11, "Po11", "SD", "-"), (12, "Po12", "SU", "LACP"),
+    ]
+    assert channels[1].members == []
+    assert channels[2].members == [EtherChannelMember("Gi1/0/1", "P"), EtherChannelMember("Gi1/0/2", "P"),
+                                   EtherChannelMember("Gi1/0/3", "P"), EtherChannelMember("Gi1/0/4", "D")]
+
+
+def test_cable_diagnostics_tdr():
+    pairs = parse("show cable-diagnostics tdr interface Gi1/0/1", CABLE_DIAGNOSTICS_TDR)
+    assert [(p.interface, p.speed, p.pair, p.length, p.status) for p in pairs] == [
+        ("Gi1/0/1", "1000M", "A", 37, "Normal"),
+        ("Gi1/0/1", "1000M", "B", 37, "Normal"),
+        ("Gi1/0/1", "1000M", "C", 38, "Normal"),
+        ("Gi1/0/1", "1000M", "D", 37, "Normal"),
+        ("Gi1/0/2", "auto", "A", 5, "Open"),
+        ("Gi1/0/2", "auto", "B", 0, "Short"),
+        ("Gi1/0/2", "auto", "C", None, "Not Completed"),
+        ("Gi1/0/2", "auto", "D", None, "Not Completed"),
+    ]
+    assert pairs[0].tolerance == 5 and pairs[0].remote_pair == "Pair A"
+    assert pairs[6].tolerance is None and pairs[6].remote_pair == "N/A"
+
+
+def test_cable_diagnostics_tdr_not_supported():
+    assert parse("show cable-diagnostics tdr interface Te1/1/1",
+                 "% TDR test is not supported on this interface Te1/1/1") == []
+
+
+def test_interfaces():
+    gi1, gi2, po11 = parse("show interfaces", INTERFACES)
+    assert gi1.name == "GigabitEthernet1/0/1"
+    assert (gi1.admin_status, gi1.protocol, gi1.description) == ("up", "up", "AP lobby")
+    assert (gi1.duplex, gi1.speed, gi1.media) == ("Full", "1000Mb/s", "10/100/1000BaseTX")
+    assert (gi1.input_errors, gi1.crc, gi1.output_errors, gi1.resets) == (12, 3, 0, 2)
+    assert (gi2.admin_status, gi2.protocol, gi2.description) == ("up", "down", "")
+    assert (gi2.duplex, gi2.speed) == ("Auto", "Auto-speed")
+    assert (po11.name, po11.admin_status, po11.description) == ("Port-channel11", "down", "to core")
+    assert (po11.duplex, po11.speed, po11.media, po11.output_errors) == ("Full", "10Gb/s", "N/A", 1)
+
+
+def test_vtp_status():
+    assert parse("show vtp status", VTP_STATUS) == VtpStatus("2", "CAMPUS", "client", False, 7, 12)
+    assert parse("show vtp status", "% Invalid input detected at '^' marker.") is None
+
+
+@pytest.mark.parametrize("output, clock", [
+    ("*10:15:30.123 UTC Wed Mar 4 2026", Clock("10:15:30.123", "UTC", "Wed", "Mar", 4, 2026, False)),
+    ("10:15:30.123 AST Wed Mar 4 2026", Clock("10:15:30.123", "AST", "Wed", "Mar", 4, 2026, True)),
+    (".10:15:30.123 AST Wed Mar 4 2026", Clock("10:15:30.123", "AST", "Wed", "Mar", 4, 2026, False)),
+])
+def test_clock(output, clock):
+    assert parse("show clock", f"show clock\n{output}\nSW01#") == clock
+    assert parse("show clock", "SW01#") is None
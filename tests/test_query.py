@@ -0,0 +1,94 @@
+"""netlib.query: what goes to the device, what is filtered locally, and broker-backed shells"""
+import importlib
+
+import pytest
+
+from netlib.broker import BrokerClient, core_session
+from netlib.query import begin, exclude, include, pushdown, query, section, select
+from netlib.simulator import ENTRY_HOSTS, PASSWORD, USERNAME
+from netlib.transport import send_command
+
+CORE = ENTRY_HOSTS[0]
+SWITCH = "10.20.39.21"
+
+# 'netlib.query' the module; the package's query is the function
+query_module = importlib.import_module("netlib.query")
+
+RUNNING = """\
+interface GigabitEthernet1/0/1
+ description AP lobby
+ switchport mode access
+interface GigabitEthernet1/0/2
+ shutdown
+line vty 0 4
+ transport input ssh"""
+
+
+class NoSectionSwitch:
+    """netmiko-style connection to a switch whose IOS has no '| section'"""
+
+    host = SWITCH
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, command):
+        self.sent.append(command)
+        if "| section" in command:
+            return f"{command}\n                                   ^\n% Invalid input detected at '^' marker.\n"
+        return RUNNING
+
+
+@pytest.fixture(autouse=True)
+def unsupported(monkeypatch):
+    """Each test starts without any filter learned as refused"""
+    monkeypatch.setattr(query_module, "_unsupported", set())
+
+
+def test_pushdown():
+    assert pushdown("show run", [section("^interface"), include("mode")]) == \
+        ("show run | section ^interface", [include("mode")])
+    assert pushdown("show run", [begin("^line")]) == ("show run | begin ^line", [])
+    # '_' means a delimiter to IOS but a literal to Python, so it stays local
+    assert pushdown("show run", [include("a_b")]) == ("show run", [include("a_b")])
+    assert pushdown("show run", []) == ("show run", [])
+
+
+def test_refused_pipe_falls_back_to_local_filter():
+    device = NoSectionSwitch()
+    text = query(device, "show running-config", section("shutdown"), send=device.send)
+    assert text == "interface GigabitEthernet1/0/2\n shutdown"
+    assert device.sent == ["show running-config | section shutdown", "show running-config"]
+    assert (SWITCH, "section") in query_module._unsupported
+
+    # The refusal is remembered: the next '| section' is filtered locally from the start
+    device.sent = []
+    text = query(device, "show running-config", section("vty"), send=device.send)
+    assert text == "line vty 0 4\n transport input ssh"
+    assert device.sent == ["show running-config"]
+
+    # Other filters still go to the device
+    assert pushdown("show running-config", [exclude("shutdown")], SWITCH)[0] == \
+        "show running-config | exclude shutdown"
+
+
+def test_select_through_broker_shell(broker):
+    core = core_session(CORE, USERNAME, PASSWORD, echo=False)
+    assert isinstance(core, BrokerClient)
+    with core.hop(SWITCH) as shell:
+        rows = select(shell, "show interfaces status", include("connected"))
+    assert rows
+    assert all(row.status == "connected" for row in rows)
+
+
+def test_query_uses_show_cache_of_broker_shell(broker, simulator):
+    core = core_session(CORE, USERNAME, PASSWORD, echo=False)
+    with core.hop(SWITCH) as shell:
+        full = send_command(shell, "show interfaces status")
+        commands = simulator.fleet.commands
+        text = query(shell, "show interfaces status", include("connected"))
+        assert simulator.fleet.commands == commands
+    assert text
+    assert all("connected" in line for line in text.splitlines())
+    assert len(text.splitlines()) < len(full.splitlines())
+
@@ -0,0 +1,110 @@
+"""netlib.reconcile: what plan() and reconcile() send to bring a port-channel to its intent"""
+import re
+
+import pytest
+
+from netlib.reconcile import ALL_VLANS, Delta, PortChannelIntent, allowed_vlans, expand_vlans, plan, reconcile
+from netlib.runconfig import RunningConfig, running_config
+from netlib.simulator import ENTRY_HOSTS, PASSWORD, USERNAME
+from netlib.transport import connect, hop
+
+VLANS = "1-16,28,50,90-92,100"
+
+
+def config(po_lines, member_lines):
+    """Running config with Port-channel11 and member Gi1/0/1"""
+    lines = ["hostname SW01", "!", "interface Port-channel11"] + [f" {line}" for line in po_lines]
+    lines += ["!", "interface GigabitEthernet1/0/1"] + [f" {line}" for line in member_lines] + ["!", "end"]
+    return RunningConfig("\n".join(lines))
+
+
+def intent(vlans=VLANS):
+    return PortChannelIntent(11, ["Gi1/0/1"], vlans, member_description="Po11 member")
+
+
+def compliant(vlans=VLANS):
+    po = ["description CONFIGURED-BY-SCRIPT", f"switchport trunk allowed vlan {vlans}", "switchport mode trunk",
+          "spanning-tree link-type point-to-point"]
+    member = ["description Po11 member", f"switchport trunk allowed vlan {vlans}", "switchport mode trunk",
+              "channel-group 11 mode active", "spanning-tree link-type point-to-point"]
+    return po, member
+
+
+def test_expand_vlans():
+    assert expand_vlans("1-3,10") == {1, 2, 3, 10}
+    assert expand_vlans("90-92, 100") == {90, 91, 92, 100}
+    assert expand_vlans("") == set()
+
+
+@pytest.mark.parametrize("lines, vlans", [
+    ([], ALL_VLANS),
+    (["switchport trunk allowed vlan all"], ALL_VLANS),
+    (["switchport trunk allowed vlan none"], set()),
+    (["switchport trunk allowed vlan 1-10", "switchport trunk allowed vlan add 20-22"], expand_vlans("1-10,20-22")),
+    (["switchport trunk allowed vlan none", "switchport trunk allowed vlan add 5"], {5}),
+    (["switchport trunk allowed vlan remove 2-4094"], {1}),
+    (["switchport trunk allowed vlan except 2-4094"], {1}),
+    (["switchport mode trunk"], ALL_VLANS),
+])
+def test_allowed_vlans(lines, vlans):
+    assert allowed_vlans(lines) == vlans
+
+
+def test_compliant_sends_nothing():
+    assert plan(config(*compliant()), intent()) == []
+
+
+def test_only_missing_or_wrong_lines():
+    po, member = compliant()
+    po[1] = "switchport trunk allowed vlan 1-16"
+    member = [line for line in member if not line.startswith("channel-group")] + ["shutdown"]
+    assert plan(config(po, member), intent()) == [
+        Delta("Port-channel11", [f"switchport trunk allowed vlan {VLANS}"]),
+        Delta("Gi1/0/1", ["channel-group 11 mode active", "no shutdown"]),
+    ]
+
+
+def test_same_vlans_written_differently():
+    po, member = compliant("1-16,28,50,90,91,92,100")
+    member[1:2] = ["switchport trunk allowed vlan 1-16,28", "switchport trunk allowed vlan add 50,90-92,100"]
+    assert plan(config(po, member), intent()) == []
+
+
+@pytest.mark.parametrize("wanted, existing, complies", [
+    ("none", "switchport trunk allowed vlan none", True),
+    ("none", "switchport trunk allowed vlan 10", False),
+    ("all", None, True),
+    ("1-4094", "switchport trunk allowed vlan all", True),
+    ("10", "switchport trunk allowed vlan none", False),
+    ("10", None, False),
+])
+def test_allowed_vlan_none_and_all(wanted, existing, complies):
+    po, member = compliant(wanted)
+    for lines in (po, member):
+        lines[1:2] = [existing] if existing else []
+    deltas = plan(config(po, member), intent(wanted))
+    assert deltas == ([] if complies else [
+        Delta("Port-channel11", [f"switchport trunk allowed vlan {wanted}"]),
+        Delta("Gi1/0/1", [f"switchport trunk allowed vlan {wanted}"]),
+    ])
+
+
+def test_rejected_lines_are_returned(simulator):
+    simulator.fleet.reject = re.compile(r"^spanning-tree link-type")
+    ssh, shell = connect(ENTRY_HOSTS[0], USERNAME, PASSWORD, echo=False)
+    try:
+        assert hop(shell, "10.20.39.21", USERNAME, PASSWORD)
+        wanted = PortChannelIntent(11, ["Gi1/0/1", "Gi1/0/2"], VLANS)
+        result = reconcile(shell, wanted)
+        assert [delta.interface for delta in result.deltas] == ["Port-channel11", "Gi1/0/1", "Gi1/0/2"]
+        assert [line for line, _ in result.errors] == ["spanning-tree link-type point-to-point"] * 3
+        remaining = plan(running_config(shell), wanted)
+        assert [delta.lines for delta in remaining] == [["spanning-tree link-type point-to-point"]] * 3
+
+        simulator.fleet.reject = None
+        result = reconcile(shell, wanted)
+        assert result.errors == [] and len(result.deltas) == 3
+        assert reconcile(shell, wanted) == ([], [])
+    finally:
+        shell.close()
+        ssh.close()
@@ -0,0 +1,72 @@
+"""netlib.runconfig: local answers out of one 'show running-config'"""
+from netlib.runconfig import RunningConfig
+
+CONFIG = """\
+Building configuration...
+
+Current configuration : 1024 bytes
+!
+version 17.6
+hostname SW01
+!
+vtp domain CAMPUS
+vtp mode client
+ip domain name corp.example.com
+!
+interface Port-channel11
+ description to core
+ switchport trunk allowed vlan 10,20
+ switchport mode trunk
+!
+interface GigabitEthernet1/0/1
+ description AP lobby
+ switchport access vlan 10
+ switchport mode access
+!
+interface GigabitEthernet1/0/2
+ shutdown
+!
+interface Vlan10
+ ip address 10.20.10.1 255.255.255.0
+!
+line vty 0 4
+ transport input ssh
+!
+banner motd ^C
+Authorized access only
+Disconnect now
+^C
+!
+end
+"""
+
+
+def test_interface_by_any_name():
+    config = RunningConfig(CONFIG)
+    text = "interface GigabitEthernet1/0/1\n description AP lobby\n switchport access vlan 10\n" \
+           " switchport mode access\nend"
+    assert config.interface("Gi1/0/1") == text
+    assert config.interface("GigabitEthernet1/0/1") == text
+    assert config.interface("GigabitEthernet 1/0/1") == text
+    assert config.interface("Po11").startswith("interface Port-channel11\n description to core")
+    assert config.interface("Vlan10").splitlines()[1] == " ip address 10.20.10.1 255.255.255.0"
+    assert config.interface("Gi1/0/48") == ""
+
+
+def test_include_has_and_sections():
+    config = RunningConfig(CONFIG)
+    assert config.include("^vtp ") == "vtp domain CAMPUS\nvtp mode client"
+    assert config.include("switchport mode") == " switchport mode trunk\n switchport mode access"
+    assert config.has("ip domain name corp.example.com")
+    assert config.has("shutdown")
+    assert not config.has("ip domain name other.example.com")
+    assert config.section("line vty 0 4") == ["transport input ssh"]
+    assert config.section("router ospf 1") == []
+    assert "hostname SW01" in config.global_lines
+    assert "Building configuration..." not in config.lines
+
+
+def test_multiline_banner():
+    config = RunningConfig(CONFIG)
+    assert config.banner("motd") == "Authorized access only\nDisconnect now"
+    assert config.banner("login") == ""
@@ -0,0 +1,63 @@
+"""netlib.showcache: which interfaces a show command names, and what a push drops"""
+import pytest
+
+from netlib.showcache import ShowCache, interfaces_in
+
+HOST = "10.20.39.21"
+
+
+@pytest.mark.parametrize("text, names", [
+    ("show interfaces Gi1/0/1 status", {"gi1/0/1"}),
+    ("show run interface GigabitEthernet1/0/1", {"gi1/0/1"}),
+    ("interface GigabitEthernet 1/0/1", {"gi1/0/1"}),
+    ("int vlan 10", {"vl10"}),
+    ("show interfaces Port-channel11", {"po11"}),
+    ("show run int Po11", {"po11"}),
+    ("Vlan10", {"vl10"}),
+    ("Te1/1/4", {"te1/1/4"}),
+    ("Po11(SU)         LACP      Gi1/0/47(P) Gi1/0/48(P)", {"po11", "gi1/0/47", "gi1/0/48"}),
+])
+def test_interfaces_in_names(text, names):
+    assert interfaces_in(text) == names
+
+
+@pytest.mark.parametrize("text", [
+    "show etherchannel 11 summary",
+    "show spanning-tree vlan 10",
+    "show vlan id 10",
+    "show interfaces status",
+    "show ip int brief",
+    "etherchannel11",
+])
+def test_interfaces_in_command_words(text):
+    assert interfaces_in(text) == set()
+
+
+@pytest.mark.parametrize("command", ["show etherchannel 11 summary", "show spanning-tree vlan 10"])
+def test_device_wide_show_dropped_by_any_push(command):
+    cache = ShowCache()
+    cache.put(HOST, command, "output")
+    cache.put(HOST, "show interfaces Gi1/0/2 status", "Gi1/0/2")
+    cache.configured(HOST, ["interface Gi1/0/1", " description uplink", "exit"])
+    assert cache.get(HOST, command) is None
+    assert cache.get(HOST, "show interfaces Gi1/0/2 status") == "Gi1/0/2"
+
+
+def test_push_drops_shows_of_configured_interface():
+    cache = ShowCache()
+    cache.put(HOST, "show interfaces Gi1/0/1 status", "Gi1/0/1")
+    cache.put(HOST, "show interfaces Po11", "Po11")
+    cache.configured(HOST, ["interface GigabitEthernet1/0/1", " channel-group 11 mode active", "exit"])
+    assert cache.get(HOST, "show interfaces Gi1/0/1 status") is None
+    assert cache.get(HOST, "show interfaces Po11") is None
+
+
+def test_port_channel_push_drops_member_shows():
+    cache = ShowCache()
+    cache.put(HOST, "show running-config interface Gi1/0/1", "interface GigabitEthernet1/0/1")
+    cache.put(HOST, "show interfaces Gi1/0/2 status", "Gi1/0/2")
+    cache.put(HOST, "show interfaces Vlan10", "Vlan10")
+    cache.configured(HOST, ["interface Port-channel11", " switchport mode trunk", "exit"])
+    assert cache.get(HOST, "show running-config interface Gi1/0/1") is None
+    assert cache.get(HOST, "show interfaces Gi1/0/2 status") is None
+    assert cache.get(HOST, "show interfaces Vlan10") == "Vlan10"
@@ -0,0 +1,70 @@
+"""netlib.tdr: polling until each port is final, and broker-backed shells (netlib.broker)"""
+from collections import Counter
+
+from netlib.broker import core_session
+from netlib.simulator import ENTRY_HOSTS, PASSWORD, USERNAME
+from netlib.tdr import run_tdr
+
+CORE = ENTRY_HOSTS[0]
+SWITCH = "10.20.39.21"
+
+DONE = """\
+TDR test last run on: March 04 10:15:31
+
+Interface Speed Local pair Pair length        Remote pair Pair status
+--------- ----- ---------- ------------------ ----------- --------------------
+{0:<9} 1000M Pair A     37   +/- 5  meters Pair A      Normal
+                Pair B     37   +/- 5  meters Pair B      Normal
+                Pair C     38   +/- 5  meters Pair C      Normal
+                Pair D     37   +/- 5  meters Pair D      Normal
+"""
+
+
+class TdrSwitch:
+    """send() stand-in: each port's test finishes after a number of polls (None = never)"""
+
+    def __init__(self, polls):
+        self.polls = polls
+        self.sent = []
+
+    def send(self, command):
+        self.sent.append(command)
+        interface = command.split()[-1]
+        if command.startswith("test "):
+            return ""
+        if interface.startswith("Te"):
+            return f"% TDR test is not supported on this interface {interface}"
+        polled = sum(1 for sent in self.sent if sent.startswith("show ") and sent.endswith(f" {interface}"))
+        needed = self.polls[interface]
+        if needed is None or polled < needed:
+            return f"TDR test is in progress on interface {interface}"
+        return DONE.format(interface)
+
+
+def test_each_port_polled_until_final():
+    switch = TdrSwitch({"Gi1/0/1": 1, "Gi1/0/2": 3, "Gi1/0/3": None})
+    ports = ["Gi1/0/3", "Gi1/0/2", "Te1/1/1", "Gi1/0/1"]
+    results = run_tdr(None, ports, send=switch.send, first_poll=0.01, max_poll=0.02, timeout=0.3)
+    assert list(results) == ports
+    assert switch.sent[:4] == [f"test cable-diagnostics tdr interface {port}" for port in ports]
+
+    # A port leaves the poll list as soon as its result is final
+    polls = Counter(command.split()[-1] for command in switch.sent if command.startswith("show "))
+    assert (polls["Gi1/0/1"], polls["Gi1/0/2"], polls["Te1/1/1"]) == (1, 3, 1)
+    assert polls["Gi1/0/3"] > 3
+
+    assert results["Gi1/0/1"].final and [pair.length for pair in results["Gi1/0/1"].pairs] == [37, 37, 38, 37]
+    assert results["Te1/1/1"].final and not results["Te1/1/1"].supported and results["Te1/1/1"].pairs == []
+    # Gave up after timeout; the last output is kept
+    assert not results["Gi1/0/3"].final and "in progress" in results["Gi1/0/3"].output
+    assert results["Gi1/0/3"].seconds >= 0.3
+
+
+def test_run_tdr_through_broker_shell(broker):
+    core = core_session(CORE, USERNAME, PASSWORD, echo=False)
+    with core.hop(SWITCH) as shell:
+        results = run_tdr(shell, ["Gi1/0/1", "Gi1/0/2"], first_poll=0.1, max_poll=0.2, timeout=10)
+    assert list(results) == ["Gi1/0/1", "Gi1/0/2"]
+    for result in results.values():
+        assert result.final
+        assert [pair.pair for pair in result.pairs] == ["A", "B", "C", "D"]
@@ -0,0 +1,112 @@
+"""netlib.tdr_store: what record() counts as a change, and which ports an audit tests again"""
+import pytest
+
+from netlib.parsers import Interface, TdrPair
+from netlib.tdr import TdrResult
+from netlib.tdr_store import DAY, TdrStore
+
+SWITCH = "10.20.39.21"
+# When the baseline run happened
+T0 = 1_790_000_000
+
+
+def result(interface, statuses=("Normal",) * 4, speed="1000M", final=True, supported=True, lengths=(37,) * 4):
+    pairs = [TdrPair(interface, speed, pair, length, 5, f"Pair {pair}", status)
+             for pair, status, length in zip("ABCD", statuses, lengths)] if supported else []
+    return TdrResult(interface, "", pairs, supported, final, 5.0)
+
+
+def counters(speed="1000Mb/s", resets=2, input_errors=12, crc=3):
+    return Interface("GigabitEthernet1/0/1", "up", "up", "", "Full", speed, "10/100/1000BaseTX",
+                     input_errors, crc, 0, resets)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TdrStore(str(tmp_path / "tdr.sqlite"))
+    store.record(SWITCH, {"Gi1/0/1": result("Gi1/0/1")}, tested=T0, counters={"Gi1/0/1": counters()})
+    yield store
+    store.close()
+
+
+def test_changes_against_baseline(store):
+    # Within the '+/- 5 meters' the switch printed: jitter, not a change
+    assert store.record(SWITCH, {"Gi1/0/1": result("Gi1/0/1", lengths=(40, 37, 33, 37))}, tested=T0 + DAY) == []
+    # An unfinished test says nothing about the cable
+    assert store.record(SWITCH, {"Gi1/0/1": result("Gi1/0/1", ("Open",) * 4, final=False)},
+                        tested=T0 + 2 * DAY) == []
+    # Pair C drifts 2 m a night: only the third night is past the tolerance of the baseline
+    for night, length in ((3, 39), (4, 41), (5, 43)):
+        changes = store.record(SWITCH, {"Gi1/0/1": result("Gi1/0/1", lengths=(37, 37, length, 37))},
+                               tested=T0 + night * DAY)
+    assert [(c.pair, c.field, c.old, c.new) for c in changes] == [("C", "length", "37", "43")]
+    changes = store.record(SWITCH, {"Gi1/0/1": result("Gi1/0/1", ("Normal", "Short", "Normal", "Normal"),
+                                                      speed="100M", lengths=(37, 37, 43, 37))},
+                           tested=T0 + 6 * DAY)
+    assert [(c.pair, c.field, c.old, c.new) for c in changes] == [
+        ("", "speed", "1000M", "100M"), ("B", "status", "Normal", "Short"),
+    ]
+    assert [(c.interface, c.tested) for c in store.changes("length", pair="C")] == [("Gi1/0/1", T0 + 5 * DAY)]
+    assert store.changes("status", switch="10.20.39.22") == []
+
+
+def test_history_and_latest(store):
+    store.record(SWITCH, {"Gi1/0/1": result("Gi1/0/1", ("Normal", "Open", "Normal", "Normal"))}, tested=T0 + DAY)
+    history = store.history(SWITCH, "Gi1/0/1")
+    assert [record.tested for record in history] == [T0, T0 + DAY]
+    assert history[0].pairs == {pair: ("Normal", 37) for pair in "ABCD"}
+    assert store.latest(SWITCH, "Gi1/0/1") == history[1]
+    assert store.history(SWITCH, "Gi1/0/1", since=T0 + 1) == history[1:]
+    assert store.latest(SWITCH, "Gi1/0/48") is None
+    # The last good result is kept while the latest is not good
+    assert store.ports(SWITCH)["Gi1/0/1"] == (T0 + DAY, T0, "1000M")
+
+
+def due(store, current, days=1):
+    return store.due_ports(SWITCH, ["Gi1/0/1"], {"Gi1/0/1": current}, now=T0 + days * DAY).get("Gi1/0/1")
+
+
+def test_unchanged_port_is_not_due(store):
+    assert due(store, counters()) is None
+    assert store.ports(SWITCH)["Gi1/0/1"].good == T0
+
+
+@pytest.mark.parametrize("current, reason", [
+    (counters(speed="100Mb/s"), "speed 1000Mb/s -> 100Mb/s"),
+    (counters(resets=4), "flapped (2 resets)"),
+    (counters(input_errors=17, crc=4), "errors (+5 input, +1 CRC)"),
+    (counters(resets=0, input_errors=0, crc=0), "counters cleared"),
+    (None, "no counters"),
+])
+def test_counters_make_a_port_due(store, current, reason):
+    assert due(store, current) == reason
+
+
+def test_old_result_is_due(store):
+    assert due(store, counters(), days=29) is None
+    assert due(store, counters(), days=31) == "last tested over 30 days ago"
+    assert store.due_ports(SWITCH, ["Gi1/0/1"], {"Gi1/0/1": counters()}, max_age_days=7,
+                           now=T0 + 8 * DAY) == {"Gi1/0/1": "last tested over 7 days ago"}
+
+
+def test_new_or_not_good_port_is_due(store):
+    store.record(SWITCH, {"Gi1/0/2": result("Gi1/0/2", ("Normal", "Open", "Normal", "Normal"))}, tested=T0)
+    store.record(SWITCH, {"Gi1/0/3": result("Gi1/0/3", final=False)}, tested=T0)
+    store.record(SWITCH, {"Te1/1/1": result("Te1/1/1", supported=False)}, tested=T0,
+                 counters={"Te1/1/1": counters()})
+    ports = ["Gi1/0/4", "Gi1/0/3", "Gi1/0/2", "Gi1/0/1", "Te1/1/1"]
+    current = {port: counters() for port in ports}
+    assert store.due_ports(SWITCH, ports, current, now=T0 + DAY) == {
+        "Gi1/0/4": "new",
+        "Gi1/0/3": "last result not good",
+        "Gi1/0/2": "last result not good",
+    }
+
+
+def test_good_result_after_a_bad_one(store):
+    store.record(SWITCH, {"Gi1/0/1": result("Gi1/0/1", ("Short",) * 4)}, tested=T0 + DAY)
+    assert due(store, counters(), days=2) == "last result not good"
+    store.record(SWITCH, {"Gi1/0/1": result("Gi1/0/1")}, tested=T0 + 2 * DAY,
+                 counters={"Gi1/0/1": counters(resets=3)})
+    # The counters to compare against are the ones of the new good result
+    assert due(store, counters(resets=3), days=3) is None
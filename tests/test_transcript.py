@@ -0,0 +1,51 @@
+"""netlib.transcript: record a session on the simulator, then replay it without a network"""
+import gzip
+
+from netlib import transcript
+from netlib.simulator import ENTRY_HOSTS, PASSWORD, SIMULATOR_ENV, USERNAME
+from netlib.transport import connect, hop, send_command
+
+CORE = ENTRY_HOSTS[0]
+SWITCH = "10.20.39.21"
+SECRET = "S3cretValue"
+COMMANDS = [
+    "terminal length 0",
+    "show interfaces status",
+    "configure terminal",
+    f"username admin privilege 15 secret {SECRET}",
+    "end",
+    "show running-config | include username",
+    "show vtp status",
+]
+
+
+def session():
+    """Outputs of one visit: log in to the core, hop to SWITCH, run COMMANDS"""
+    ssh, shell = connect(CORE, USERNAME, PASSWORD, echo=False)
+    try:
+        assert hop(shell, SWITCH, USERNAME, PASSWORD)
+        return [send_command(shell, command) for command in COMMANDS]
+    finally:
+        shell.close()
+        ssh.close()
+
+
+def test_record_then_replay(simulator, tmp_path, monkeypatch):
+    path = str(tmp_path / "run.transcript.gz")
+    recorder = transcript.Recorder(path)
+    monkeypatch.setattr(transcript, "_shared", recorder)
+    recorded = session()
+    recorder.save()
+    assert SECRET in recorded[5]
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        saved = f.read()
+    assert SECRET not in saved
+    assert PASSWORD not in saved
+
+    # No simulator to fall back on: every answer has to come from the transcript
+    monkeypatch.delenv(SIMULATOR_ENV)
+    monkeypatch.setattr(transcript, "_shared", transcript.Replayer(path))
+    replayed = session()
+    assert replayed == [transcript.mask(output) for output in recorded]
+    assert transcript.MISSING not in "".join(replayed)
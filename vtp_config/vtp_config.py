@@ -4,8 +4,11 @@ Simple VTP Auto-Configuration
 SSH to Core Switch, then to each Access Switch, run VTP commands
 """
 
-import paramiko
-import time
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netlib import SAVE_TIMEOUT, core_session, push_config, run_parallel, send_command, show
 
 # Configuration - CHANGE NOTHING HERE
 CORE_IP = "192.168.100.110"
@@ -19,94 +22,80 @@ ACCESS_SWITCHES = [
     "10.20.39.25"   # NSPC-AccSW-4B
 ]
 
-print("=" * 60)
-print("VTP AUTO-CONFIGURATION SCRIPT")
-print("=" * 60)
-print(f"Core Switch: {CORE_IP}")
-print(f"Username: {USERNAME}")
-print(f"Access Switches: {len(ACCESS_SWITCHES)}")
-print("=" * 60)
+# What 'show vtp status' should report afterwards
+VTP_DOMAIN = "nadec.com.sa"
+VTP_MODE = "client"
 
-try:
-    # Step 1: Connect to Core Switch
-    print(f"\n[1] Connecting to Core Switch {CORE_IP}...")
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh.connect(CORE_IP, username=USERNAME, password=PASSWORD, timeout=15)
-    print("✓ Connected to Core Switch")
-    
-    # Step 2: Open interactive shell on Core
-    shell = ssh.invoke_shell()
-    time.sleep(2)
-    
-    # Clear any initial output
-    if shell.recv_ready():
-        shell.recv(4096)
-    
-    # Step 3: Configure each Access Switch
-    print(f"\n[2] Configuring {len(ACCESS_SWITCHES)} Access Switches...")
-    print("-" * 60)
-    
-    for i, switch_ip in enumerate(ACCESS_SWITCHES, 1):
-        print(f"\nSwitch {i}/{len(ACCESS_SWITCHES)}: {switch_ip}")
-        
-        # SSH from Core to Access Switch
-        shell.send(f"ssh -l {USERNAME} {switch_ip}\n")
-        time.sleep(3)
-        
-        # Send password
-        shell.send(f"{PASSWORD}\n")
-        time.sleep(2)
-        
-        # Send VTP configuration commands
+# How many switches to configure at the same time (1 = one after another)
+MAX_WORKERS = 4
+
+def configure_vtp(core, switch_ip):
+    """Send the VTP configuration to one access switch on its own core channel"""
+    # SSH from Core to Access Switch
+    with core.hop(switch_ip) as shell:
+        # Send VTP configuration commands (vtp is global config, not exec)
         vtp_commands = [
             "vtp version 3",
-            "vtp domain nadec.com.sa", 
-            "vtp mode client",
+            f"vtp domain {VTP_DOMAIN}", 
+            f"vtp mode {VTP_MODE}",
             "vtp password Cisco1234 hidden",
             "vtp pruning",
-            "end",
-            "wr"
         ]
         
-        for cmd in vtp_commands:
-            shell.send(f"{cmd}\n")
-            time.sleep(1.5)
+        push_config(shell, vtp_commands)
+        send_command(shell, "wr", timeout=SAVE_TIMEOUT)
         
         # Verify
-        shell.send("show vtp status\n")
-        time.sleep(2)
-        
-        # Exit back to Core Switch
-        shell.send("exit\n")
-        time.sleep(2)
-        
-        print(f"  ✓ Configuration sent to {switch_ip}")
-        
-        # Small delay before next switch
-        if i < len(ACCESS_SWITCHES):
-            print("  Waiting 5 seconds...")
-            time.sleep(5)
-    
-    # Step 4: Close connection
-    shell.close()
-    ssh.close()
+        status = show(shell, "show vtp status")
     
-    print("\n" + "=" * 60)
-    print("SCRIPT COMPLETED SUCCESSFULLY!")
+    if status is None or status.domain != VTP_DOMAIN or status.mode != VTP_MODE:
+        print(f"  ⚠️ {switch_ip}: VTP reports domain {status and status.domain}, mode {status and status.mode}")
+        return False
+    print(f"  ✓ Configuration sent to {switch_ip} (VTP v{status.version}, domain {status.domain}, {status.mode})")
+    return True
+
+def main():
     print("=" * 60)
-    print("\nManual verification (optional):")
-    for switch_ip in ACCESS_SWITCHES:
-        print(f"  ssh -l {USERNAME} {switch_ip}")
-        print(f"  show vtp status")
-        print(f"  exit")
+    print("VTP AUTO-CONFIGURATION SCRIPT")
     print("=" * 60)
-    
-except Exception as e:
-    print(f"\n❌ ERROR: {str(e)}")
-    print("\nTroubleshooting:")
-    print("1. Check if Core Switch is reachable: ping 192.168.100.110")
-    print("2. Check credentials (cisco/Cisco1234)")
-    print("3. Install paramiko: pip install paramiko")
+    print(f"Core Switch: {CORE_IP}")
+    print(f"Username: {USERNAME}")
+    print(f"Access Switches: {len(ACCESS_SWITCHES)}")
+    print("=" * 60)
+        
+    try:
+        # One Core Switch login (or warm broker sessions); each Access Switch gets its own channel, MAX_WORKERS at a time
+        print(f"\n[1] Configuring {len(ACCESS_SWITCHES)} Access Switches via Core Switch {CORE_IP}...")
+        print("-" * 60)
+        
+        with core_session(CORE_IP, USERNAME, PASSWORD, max_channels=MAX_WORKERS, echo=False) as core:
+            results = run_parallel(lambda switch_ip: configure_vtp(core, switch_ip), ACCESS_SWITCHES, MAX_WORKERS)
+        
+        for i, switch_ip in enumerate(ACCESS_SWITCHES, 1):
+            if results[switch_ip] is not True:
+                print(f"  ❌ Switch {i}/{len(ACCESS_SWITCHES)}: could not configure {switch_ip}")
+        
+        print("\n" + "=" * 60)
+        if all(result is True for result in results.values()):
+            print("SCRIPT COMPLETED SUCCESSFULLY!")
+        else:
+            print("SCRIPT COMPLETED WITH ERRORS")
+        print("=" * 60)
+        print("\nManual verification (optional):")
+        for switch_ip in ACCESS_SWITCHES:
+            print(f"  ssh -l {USERNAME} {switch_ip}")
+            print(f"  show vtp status")
+            print(f"  exit")
+        print("=" * 60)
+        
+    except Exception as e:
+        print(f"\n❌ ERROR: {str(e)}")
+        print("\nTroubleshooting:")
+        print("1. Check if Core Switch is reachable: ping 192.168.100.110")
+        print("2. Check credentials (cisco/Cisco1234)")
+        print("3. Install paramiko: pip install paramiko")
+
+    input("\nPress Enter to exit...")
 
-input("\nPress Enter to exit...")
+if __name__ == "__main__":
+    main()